@@ -0,0 +1,185 @@
+"""
+Vectorized evaluation of many positions at once with NumPy.
+Positions are rows of an N x 64 int8 array holding the piece codes of
+``compact``: positive for white pieces, negative for black ones and 0 for
+empty squares, indexed with square numbers (rank * 8 + file).
+"""
+
+from array import array
+from collections import namedtuple
+
+import numpy as np
+
+from compact import CompactPosition, TYPE_CODES
+from evaluation import PIECE_VALUES, PIECE_SQUARE_TABLES
+from locals import *
+from tables import KNIGHT_FIELDS, KING_FIELDS
+
+
+# index of each color in the results
+COLOR_INDEX = {WHITE: 0, BLACK: 1}
+
+BatchResult = namedtuple(
+    'BatchResult', 'material piece_square attacked in_check'
+)
+
+# values indexed with a piece code + 6, negative for black pieces
+_MATERIAL = np.zeros(13, dtype=np.int32)
+# piece-square bonuses indexed with a piece code + 6 and a square
+_PIECE_SQUARE = np.zeros((13, 64), dtype=np.int32)
+for _piece_type, _code in TYPE_CODES.items():
+    _MATERIAL[6 + _code] = PIECE_VALUES[_piece_type]
+    _MATERIAL[6 - _code] = -PIECE_VALUES[_piece_type]
+    _PIECE_SQUARE[6 + _code] = PIECE_SQUARE_TABLES[WHITE][_piece_type]
+    _PIECE_SQUARE[6 - _code] = np.negative(
+        PIECE_SQUARE_TABLES[BLACK][_piece_type]
+    )
+_SQUARES = np.arange(64)
+
+# (file, rank) steps of the pieces, taken from the tables of a central
+# square
+_KNIGHT_STEPS = [(x - 3, y - 3) for x, y in KNIGHT_FIELDS[27]]
+_KING_STEPS = [(x - 3, y - 3) for x, y in KING_FIELDS[27]]
+_ROOK_STEPS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+_BISHOP_STEPS = [(1, 1), (-1, 1), (-1, -1), (1, -1)]
+
+
+def from_boards(boards):
+    """
+    Encodes the positions on the boards.
+    :param boards: boards to encode
+    :return: N x 64 array of piece codes
+    :rtype: numpy.ndarray
+    """
+    return np.array(
+        [np.frombuffer(CompactPosition.from_board(board).squares,
+                       dtype=np.int8) for board in boards],
+        dtype=np.int8
+    ).reshape(-1, 64)
+
+
+def to_boards(squares, sides=None, backend='list'):
+    """
+    Builds boards with the encoded pieces. Castling and en passant are not
+    encoded, so the boards have none.
+    :param squares: N x 64 array of piece codes
+    :param sides: side to move of every position, 1 for white and -1 for
+        black, white if not given
+    :param backend: name of the board implementation
+    :rtype: list[board.Board]
+    """
+    squares = np.asarray(squares, dtype=np.int8)
+    if sides is None:
+        sides = np.ones(len(squares), dtype=np.int8)
+    return [
+        CompactPosition(array('b', row.tobytes()), int(side), 0)
+        .to_board(backend)
+        for row, side in zip(squares, sides)
+    ]
+
+
+def material(squares):
+    """
+    Sums the material of white minus the material of black.
+    :param squares: N x 64 array of piece codes
+    :return: N scores in centipawns
+    """
+    return _MATERIAL[np.asarray(squares) + 6].sum(axis=1)
+
+
+def piece_square(squares):
+    """
+    Sums the piece-square bonuses of white minus those of black.
+    :param squares: N x 64 array of piece codes
+    :return: N scores in centipawns
+    """
+    return _PIECE_SQUARE[np.asarray(squares) + 6, _SQUARES].sum(axis=1)
+
+
+def evaluate(squares, sides=None):
+    """
+    Evaluates the positions like ``evaluation.evaluate``.
+    :param squares: N x 64 array of piece codes
+    :param sides: side to move of every position, 1 for white and -1 for
+        black; scores are from the point of view of white if not given
+    :return: N scores in centipawns
+    """
+    scores = material(squares) + piece_square(squares)
+    return scores if sides is None else scores * np.asarray(sides)
+
+
+def _shift(mask, dx, dy):
+    """
+    Moves the (N, 8, 8) boolean mask by dx files and dy ranks, dropping
+    what falls off the board.
+    """
+    result = np.zeros_like(mask)
+    result[:, max(dy, 0):8 + min(dy, 0), max(dx, 0):8 + min(dx, 0)] = \
+        mask[:, max(-dy, 0):8 + min(-dy, 0), max(-dx, 0):8 + min(-dx, 0)]
+    return result
+
+
+def attacks(squares, color):
+    """
+    Finds the squares attacked by the pieces of the color, whatever stands
+    on them.
+    :param squares: N x 64 array of piece codes
+    :param color: color of the attacking pieces
+    :return: N x 64 boolean array
+    """
+    board = np.asarray(squares).reshape(-1, 8, 8)
+    sign = 1 if color == WHITE else -1
+    empty = board == 0
+    result = np.zeros(board.shape, dtype=bool)
+    pawns = board == sign * TYPE_CODES[PAWN]
+    result |= _shift(pawns, 1, sign) | _shift(pawns, -1, sign)
+    for code, steps in [(TYPE_CODES[KNIGHT], _KNIGHT_STEPS),
+                        (TYPE_CODES[KING], _KING_STEPS)]:
+        pieces = board == sign * code
+        for dx, dy in steps:
+            result |= _shift(pieces, dx, dy)
+    queens = board == sign * TYPE_CODES[QUEEN]
+    for code, steps in [(TYPE_CODES[ROOK], _ROOK_STEPS),
+                        (TYPE_CODES[BISHOP], _BISHOP_STEPS)]:
+        sliders = (board == sign * code) | queens
+        for dx, dy in steps:
+            ray = _shift(sliders, dx, dy)
+            while ray.any():
+                result |= ray
+                ray = _shift(ray & empty, dx, dy)
+    return result.reshape(-1, 64)
+
+
+def in_check(squares, color, attacked=None):
+    """
+    Tells which kings of the color are attacked.
+    :param squares: N x 64 array of piece codes
+    :param color: color of the kings
+    :param attacked: squares attacked by the other color, computed if not
+        given
+    :return: N booleans
+    """
+    sign = 1 if color == WHITE else -1
+    if attacked is None:
+        attacked = attacks(squares, BLACK if color == WHITE else WHITE)
+    kings = np.asarray(squares) == sign * TYPE_CODES[KING]
+    return (kings & attacked).any(axis=1)
+
+
+def evaluate_batch(squares):
+    """
+    Computes everything for the positions at once.
+    :param squares: N x 64 array of piece codes
+    :return: material and piece-square scores of white minus black, the
+        squares attacked by each color as an N x 2 x 64 array and whether
+        each king is in check as an N x 2 array, colors indexed with
+        ``COLOR_INDEX``
+    :rtype: BatchResult
+    """
+    squares = np.asarray(squares, dtype=np.int8)
+    attacked = np.stack([attacks(squares, WHITE), attacks(squares, BLACK)],
+                        axis=1)
+    checks = np.stack([in_check(squares, WHITE, attacked[:, 1]),
+                       in_check(squares, BLACK, attacked[:, 0])], axis=1)
+    return BatchResult(material(squares), piece_square(squares), attacked,
+                       checks)
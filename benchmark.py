@@ -0,0 +1,214 @@
+"""
+Benchmarks of the board implementations and of the search.
+Usage: python benchmark.py backends [--repeat N]
+       python benchmark.py scaling [--workers N [N ...]] [--depth N]
+       python benchmark.py memory [--count N]
+       python benchmark.py batch [--count N]
+       python benchmark.py startup [--repeat N] [--modules M [M ...]]
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+from board import BOARD_BACKENDS
+from locals import *
+
+
+def _attack_scan(board):
+    for x, y in itertools.product(range(8), repeat=2):
+        board.is_field_attacked(WHITE, fields=[(x, y)])
+        board.is_field_attacked(BLACK, fields=[(x, y)])
+
+
+def _between_scan(board):
+    for x, y in itertools.product(range(8), repeat=2):
+        board.any_piece_between(0, 0, x, y)
+        board.any_piece_between(7, 7, x, y)
+
+
+def bench_backends(repeat):
+    """
+    Times the occupancy and attack queries on the starting position for
+    every board backend.
+    :param repeat: number of full board scans per measurement
+    """
+    for name, board_cls in sorted(BOARD_BACKENDS.items()):
+        board = board_cls()
+        for label, scan in [('attacks', _attack_scan),
+                            ('between', _between_scan)]:
+            elapsed = timeit.timeit(lambda: scan(board), number=repeat)
+            print('%-10s %-8s %8.2f ms/scan' %
+                  (name, label, elapsed * 1000 / repeat))
+
+
+def bench_scaling(worker_counts, depth, fens):
+    """
+    Measures the time the parallel search needs to reach the depth on
+    each position for every worker count and reports the speedup over the
+    first worker count.
+    :param worker_counts: numbers of worker processes to compare
+    :param depth: depth every search has to complete
+    :param fens: positions to search
+    """
+    from parallel import ParallelSearch
+
+    baseline = None
+    for workers in worker_counts:
+        elapsed, nodes = 0, 0
+        with ParallelSearch(workers) as search:
+            for fen in fens:
+                search.table.clear()
+                board = BOARD_BACKENDS['list'].from_fen(fen)
+                result = search.search(board, depth)
+                elapsed += result.elapsed
+                nodes += result.nodes
+        baseline = baseline or elapsed
+        print('workers %3i  time %7.2f s  nodes %9i  nps %8.0f  '
+              'speedup %.2f' % (workers, elapsed, nodes, nodes / elapsed,
+                                baseline / elapsed))
+
+
+def bench_memory(count):
+    """
+    Compares the memory taken by positions held as boards of piece objects
+    and as compact positions.
+    :param count: number of positions held at once
+    """
+    from compact import CompactPosition
+
+    tracemalloc.start()
+    boards = [BOARD_BACKENDS['list']() for _ in range(count)]
+    board_bytes = tracemalloc.get_traced_memory()[0]
+    positions = [CompactPosition.from_board(board) for board in boards]
+    compact_bytes = tracemalloc.get_traced_memory()[0] - board_bytes
+    tracemalloc.stop()
+    print('board    %8.0f bytes/position' % (board_bytes / count))
+    print('compact  %8.0f bytes/position' % (compact_bytes / len(positions)))
+
+
+def bench_batch(count):
+    """
+    Compares scoring, attack maps and check detection of the positions one
+    by one with the vectorized batch functions.
+    :param count: number of positions
+    """
+    import random
+
+    from batch import evaluate_batch, from_boards
+    from evaluation import evaluate
+
+    rng = random.Random(0)
+    board_cls = BOARD_BACKENDS['bitboard']
+    board, boards = board_cls(), []
+    while len(boards) < count:
+        moves = list(board.generate_legal_moves(board.side_to_move))
+        if not moves or len(board.undo_stack) > 100:
+            board = board_cls()
+            continue
+        board.make_move(rng.choice(moves))
+        boards.append(board_cls.from_fen(board.to_fen()))
+
+    def scalar():
+        for board in boards:
+            evaluate(board)
+            board.attack_mask(WHITE)
+            board.attack_mask(BLACK)
+            board.is_king_in_check(WHITE)
+            board.is_king_in_check(BLACK)
+
+    squares = from_boards(boards)
+    for label, func in [('scalar', scalar),
+                        ('batch', lambda: evaluate_batch(squares))]:
+        elapsed = timeit.timeit(func, number=1)
+        print('%-8s %10.0f positions/s' % (label, count / elapsed))
+
+
+# run in a fresh interpreter, prints the import time of the module and the
+# time of the first move in seconds
+_STARTUP_CODE = """
+import time
+start = time.perf_counter()
+import %s
+from board import BoardManager
+imported = time.perf_counter()
+BoardManager().move_piece(4, 1, 4, 3)
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def bench_startup(repeat, modules):
+    """
+    Starts cold processes which import the module and play one move, and
+    reports the median import time, first move latency and the wall time
+    of the whole process.
+    :param repeat: number of processes started for every module
+    :param modules: names of the modules imported
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    environment = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    for module in modules:
+        imports, moves, walls = [], [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = subprocess.check_output(
+                [sys.executable, '-c', _STARTUP_CODE % module], cwd=root,
+                env=environment
+            )
+            walls.append(time.perf_counter() - start)
+            import_time, move_time = map(float, output.split()[-2:])
+            imports.append(import_time)
+            moves.append(move_time)
+        print('%-10s import %7.1f ms  first move %6.2f ms  process %7.1f ms'
+              % (module, statistics.median(imports) * 1000,
+                 statistics.median(moves) * 1000,
+                 statistics.median(walls) * 1000))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command')
+    backends = commands.add_parser('backends', help='compare board backends')
+    backends.add_argument('--repeat', type=int, default=20)
+    scaling = commands.add_parser(
+        'scaling', help='parallel search speedup per worker count'
+    )
+    scaling.add_argument('--workers', type=int, nargs='+',
+                         default=[1, 2, 4, 8])
+    scaling.add_argument('--depth', type=int, default=4)
+    memory = commands.add_parser('memory', help='memory per position')
+    memory.add_argument('--count', type=int, default=1000)
+    batch = commands.add_parser('batch', help='batch evaluation speed')
+    batch.add_argument('--count', type=int, default=10000)
+    startup = commands.add_parser(
+        'startup', help='import time and first move of a cold process'
+    )
+    startup.add_argument('--repeat', type=int, default=5)
+    startup.add_argument('--modules', nargs='+',
+                         default=['board', 'server', 'chess'])
+    args = parser.parse_args(argv)
+    if args.command == 'backends':
+        bench_backends(args.repeat)
+    elif args.command == 'scaling':
+        from perft import REFERENCE_POSITIONS
+
+        fens = [fen for _, fen, _ in REFERENCE_POSITIONS]
+        bench_scaling(args.workers, args.depth, fens)
+    elif args.command == 'memory':
+        bench_memory(args.count)
+    elif args.command == 'batch':
+        bench_batch(args.count)
+    elif args.command == 'startup':
+        bench_startup(args.repeat, args.modules)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
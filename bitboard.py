@@ -0,0 +1,105 @@
+"""
+Helpers for the 64-bit board representation.
+Fields are numbered from 0 to 63 rank by rank, so the field (x, y) has
+the number ``y * 8 + x`` and is represented by the bit ``1 << (y * 8 + x)``.
+"""
+
+from locals import *
+
+
+KNIGHT_OFFSETS = ((1, 2), (2, 1), (2, -1), (1, -2),
+                  (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+KING_OFFSETS = ((1, 0), (1, 1), (0, 1), (-1, 1),
+                (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+def square(x, y):
+    """
+    Converts field coordinates to the number of the square.
+    :param x: file of the field
+    :param y: rank of the field
+    :return: number of the square
+    """
+    return y * 8 + x
+
+
+def square_coords(sq):
+    """
+    Converts the number of the square to the field coordinates.
+    :param sq: number of the square
+    :return: tuple of file and rank of the field
+    """
+    return sq & 7, sq >> 3
+
+
+def iter_squares(bb):
+    """
+    Iterates over the numbers of the squares set in the bitboard, starting
+    from the lowest one.
+    :param bb: bitboard to iterate over
+    """
+    while bb:
+        lowest = bb & -bb
+        yield lowest.bit_length() - 1
+        bb ^= lowest
+
+
+def popcount(bb):
+    """
+    Counts squares set in the bitboard.
+    """
+    return bin(bb).count('1')
+
+
+def _offsets_mask(sq, offsets):
+    x, y = square_coords(sq)
+    mask = 0
+    for dx, dy in offsets:
+        if 0 <= x + dx < 8 and 0 <= y + dy < 8:
+            mask |= 1 << square(x + dx, y + dy)
+    return mask
+
+
+def knight_attacks(sq):
+    """
+    Returns the bitboard of fields attacked by a knight from the square.
+    """
+    return _offsets_mask(sq, KNIGHT_OFFSETS)
+
+
+def king_attacks(sq):
+    """
+    Returns the bitboard of fields attacked by a king from the square.
+    """
+    return _offsets_mask(sq, KING_OFFSETS)
+
+
+def pawn_attacks(color, sq):
+    """
+    Returns the bitboard of fields attacked by a pawn of the given color
+    standing on the square.
+    """
+    forward = 1 if color == WHITE else -1
+    return _offsets_mask(sq, ((-1, forward), (1, forward)))
+
+
+def between(sq1, sq2):
+    """
+    Returns the bitboard of the squares lying strictly between two squares
+    sharing a rank, a file or a diagonal. For other pairs of squares the
+    result is empty.
+    """
+    x1, y1 = square_coords(sq1)
+    x2, y2 = square_coords(sq2)
+    dx, dy = x2 - x1, y2 - y1
+    if not (dx == 0 or dy == 0 or abs(dx) == abs(dy)) or sq1 == sq2:
+        return 0
+    step_x = (dx > 0) - (dx < 0)
+    step_y = (dy > 0) - (dy < 0)
+    mask = 0
+    x, y = x1 + step_x, y1 + step_y
+    while (x, y) != (x2, y2):
+        mask |= 1 << square(x, y)
+        x, y = x + step_x, y + step_y
+    return mask
+
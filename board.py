@@ -1,21 +1,63 @@
-import colorama
 import sys
+from collections import namedtuple
 
-from exceptions import InvalidFieldError, NoPieceError, InvalidPieceError
+from bitboard import square, iter_squares
+from exceptions import (
+    InvalidFieldError, NoPieceError, InvalidPieceError, IllegalMoveError,
+    InvalidFenError
+)
 from locals import *
-from pieces import Piece, King, Queen, Knight, Rook, Bishop, Pawn
+from moves import FILE_NAMES
+from pieces import (
+    Piece, King, Queen, Knight, Rook, Bishop, Pawn, PhantomPawn,
+    PIECE_CLASSES
+)
+from zobrist import (
+    PIECE_KEYS, LONG_CASTLE_KEYS, SHORT_CASTLE_KEYS, EN_PASSANT_KEYS,
+    BLACK_TO_MOVE_KEY
+)
+from tables import (
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, BETWEEN_FIELDS,
+    KNIGHT_FIELDS, PAWN_FIELDS, RAY_FIELDS, RAY_MASKS, ROOK_DIRECTIONS,
+    BISHOP_DIRECTIONS, SLIDER_DIRECTIONS, DIRECTION_SLIDERS, DIRECTION,
+    first_blocker
+)
 
 
-colorama.init(autoreset=True)
+ALL_FIELDS = (1 << 64) - 1
+
+# colorama module, imported and initialized when a board is first printed
+# so that headless users of the board don't need it
+_colorama = None
+
+
+def _init_colorama():
+    global _colorama
+    if _colorama is None:
+        import colorama
+
+        colorama.init(autoreset=True)
+        _colorama = colorama
+    return _colorama
 
 
 class BoardManager(object):
 
-    def __init__(self):
-        self.board = Board()
-        self.player_to_move = WHITE
+    def __init__(self, backend='list', fen=None):
+        """
+        :param backend: name of the board implementation to use, one of the
+            keys of ``BOARD_BACKENDS``
+        :param fen: position to start from, the starting position if not
+            given
+        """
+        board_cls = BOARD_BACKENDS[backend]
+        self.board = board_cls.from_fen(fen) if fen else board_cls()
+
+    @property
+    def player_to_move(self):
+        return self.board.side_to_move
 
-    def move_piece(self, from_x, from_y, to_x, to_y):
+    def move_piece(self, from_x, from_y, to_x, to_y, promotion=QUEEN):
         """
         Takes two pairs of tuples with fields coordinates and move the piece
         from one square to another.
@@ -23,40 +65,332 @@ class BoardManager(object):
         :param from_y: coordinates where piece is picked from
         :param to_x: coordinate where the piece is moved to
         :param to_y: coordinates where the piece is moved to
+        :param promotion: type of the piece a pawn is promoted to
+        :return: the move played
+        :rtype: moves.Move
         :raises InvalidFieldError: one of the fields does not exist
         :raises InvalidPieceError: selected piece cannot be picked
         :raises NoPieceError: there is no piece on the origin square
         :raises IllegalMoveError: specified move is not valid
         """
         piece = self.board.get_piece(from_x, from_y)
+        self.board.get_piece(to_x, to_y)
         if piece is None:
             raise NoPieceError("There is no piece here")
         if piece.color != self.player_to_move:
             raise InvalidPieceError("You don't own this piece")
-        piece.move_piece(to_x, to_y)
-        self.switch_player()
+        for move in self.board.generate_legal_moves(piece.color):
+            if ((move.from_x, move.from_y, move.to_x, move.to_y) ==
+                    (from_x, from_y, to_x, to_y) and
+                    move.promotion in (None, promotion)):
+                self.board.make_move(move)
+                return move
+        raise IllegalMoveError("Can't move the piece there")
+
+    def undo(self):
+        """
+        Takes back the last move played.
+        :return: the move taken back
+        :rtype: moves.Move
+        :raises IllegalMoveError: there is no move to take back
+        """
+        if not self.board.undo_stack:
+            raise IllegalMoveError("There is no move to undo")
+        return self.board.unmake_move()
+
+    def generate_moves(self):
+        """
+        Lazily generates pseudo-legal moves of the player to move, captures
+        first. See ``Board.generate_moves``.
+        """
+        return self.board.generate_moves(self.player_to_move)
+
+    def generate_legal_moves(self):
+        """
+        Lazily generates legal moves of the player to move, captures first.
+        See ``Board.generate_legal_moves``.
+        """
+        return self.board.generate_legal_moves(self.player_to_move)
 
     def switch_player(self):
-        self.player_to_move = WHITE if self.player_to_move == BLACK else BLACK
+        self.board.switch_side()
+
+    def outcome(self):
+        """
+        Tells whether the game is over: by checkmate, stalemate, the
+        fifty-move rule, threefold repetition or insufficient material.
+        :return: result and reason, None while the game goes on
+        :rtype: Outcome
+        """
+        board = self.board
+        color = board.side_to_move
+        if next(iter(board.generate_legal_moves(color)), None) is None:
+            if board.is_king_in_check(color):
+                return Outcome('0-1' if color == WHITE else '1-0',
+                               'checkmate')
+            return Outcome('1/2-1/2', 'stalemate')
+        if board.halfmove_clock >= 100:
+            return Outcome('1/2-1/2', 'fifty moves')
+        if board.repetition_count() >= 3:
+            return Outcome('1/2-1/2', 'repetition')
+        if board.is_insufficient_material():
+            return Outcome('1/2-1/2', 'insufficient material')
+        return None
+
+
+_TYPE_ORDER = {piece_type: i for i, piece_type in enumerate(PIECE_TYPES)}
+
+# Castling rights lost when a piece moves from or to the field, as tuples
+# of (long castle, color) where long castle is False for the short castle.
+_CASTLING_FIELDS = {
+    (4, 0): ((True, WHITE), (False, WHITE)),
+    (0, 0): ((True, WHITE),),
+    (7, 0): ((False, WHITE),),
+    (4, 7): ((True, BLACK), (False, BLACK)),
+    (0, 7): ((True, BLACK),),
+    (7, 7): ((False, BLACK),),
+}
+
+# Record of everything make_move changes which can't be recovered from
+# the move itself.
+_Undo = namedtuple(
+    '_Undo',
+    'move piece captured castling en_passant rook promoted halfmove_clock '
+    'hash_key'
+)
+
+# Result of a finished game and the reason it ended.
+Outcome = namedtuple('Outcome', 'result reason')
+
+# FEN letters of each color and piece type, and the piece classes and
+# colors of the letters.
+_FEN_CHARS = {}
+for _piece_type in PIECE_TYPES:
+    _char = 'P' if _piece_type == PAWN else _piece_type
+    _FEN_CHARS[WHITE, _piece_type] = _char
+    _FEN_CHARS[BLACK, _piece_type] = _char.lower()
+_FEN_PIECES = {
+    char: (PIECE_CLASSES[piece_type], color)
+    for (color, piece_type), char in _FEN_CHARS.items()
+}
+
+
+class CastlingRights(dict):
+    """
+    Castling rights of both colors, which keep the position key of their
+    board up to date when changed.
+    """
+
+    def __init__(self, board, keys):
+        """
+        :param board: board the rights belong to
+        :param keys: Zobrist keys of the rights of each color
+        """
+        super().__init__({WHITE: False, BLACK: False})
+        self._board = board
+        self._keys = keys
+
+    def __setitem__(self, color, allowed):
+        allowed = bool(allowed)
+        if self[color] != allowed:
+            self._board.hash_key ^= self._keys[color]
+        super().__setitem__(color, allowed)
 
 
 class Board(object):
 
-    def __init__(self):
+    def __init__(self, fill=True):
+        """
+        :param fill: whether to set up the starting position, otherwise
+            the board is left empty and without castling rights
+        """
+        # Zobrist key of the position, updated with every change
+        self.hash_key = 0
+        self._long_castle_allowed = CastlingRights(self, LONG_CASTLE_KEYS)
+        self._short_castle_allowed = CastlingRights(self, SHORT_CASTLE_KEYS)
+        self._en_passant = None
+        self._side_to_move = WHITE
         self.fields = [[None for _ in range(8)] for _ in range(8)]
         self.black_pieces = set()
         self.white_pieces = set()
         self.white_king = None
         self.black_king = None
-        self._fill_starting_board()
-        self.long_castle_allowed = {
-            WHITE: True,
-            BLACK: True
+        # plies since the last capture or pawn move, and the number of the
+        # move starting at 1 and growing after every black move
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        if fill:
+            self._fill_starting_board()
+            self.long_castle_allowed = {
+                WHITE: True,
+                BLACK: True
+            }
+            self.short_castle_allowed = {
+                WHITE: True,
+                BLACK: True
+            }
+        self.undo_stack = []
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Sets up a board in the position described by the FEN string. Only
+        the pieces of the position are created. The move counters may be
+        left out.
+        :param fen: position in Forsyth-Edwards Notation
+        :rtype: Board
+        :raises InvalidFenError: if the string doesn't describe a position
+        """
+        parts = fen.split()
+        if len(parts) not in (4, 6):
+            raise InvalidFenError(fen)
+        placement, side, castling, en_passant = parts[:4]
+        ranks = placement.split('/')
+        if len(ranks) != 8 or side not in ('w', 'b'):
+            raise InvalidFenError(fen)
+        board = cls(fill=False)
+        for y, rank in zip(range(7, -1, -1), ranks):
+            x = 0
+            for char in rank:
+                if char.isdigit():
+                    x += int(char)
+                    continue
+                if char not in _FEN_PIECES or x >= 8:
+                    raise InvalidFenError(fen)
+                piece_cls, color = _FEN_PIECES[char]
+                piece = piece_cls(board, x, y, color)
+                board.add_piece(piece, x, y)
+                if piece.type == KING:
+                    if color == WHITE:
+                        board.white_king = piece
+                    else:
+                        board.black_king = piece
+                x += 1
+            if x != 8:
+                raise InvalidFenError(fen)
+        if board.white_king is None or board.black_king is None:
+            raise InvalidFenError(fen)
+        board.side_to_move = WHITE if side == 'w' else BLACK
+        if castling != '-' and not set(castling) <= set('KQkq'):
+            raise InvalidFenError(fen)
+        # rights whose king or rook is not in place are dropped, castling
+        # relies on both of them standing on their initial fields
+        board.long_castle_allowed = {
+            WHITE: 'Q' in castling and board._castling_pieces(WHITE, 0),
+            BLACK: 'q' in castling and board._castling_pieces(BLACK, 0)
         }
-        self.short_castle_allowed = {
-            WHITE: True,
-            BLACK: True
+        board.short_castle_allowed = {
+            WHITE: 'K' in castling and board._castling_pieces(WHITE, 7),
+            BLACK: 'k' in castling and board._castling_pieces(BLACK, 7)
         }
+        if en_passant != '-':
+            if (len(en_passant) != 2 or en_passant[0] not in FILE_NAMES or
+                    en_passant[1] not in '36'):
+                raise InvalidFenError(fen)
+            x, y = FILE_NAMES.index(en_passant[0]), int(en_passant[1]) - 1
+            color = BLACK if y == 5 else WHITE
+            pawn = board.fields[y - 1 if color == BLACK else y + 1][x]
+            if pawn is None or pawn.type != PAWN or pawn.color != color:
+                raise InvalidFenError(fen)
+            board.en_passant = PhantomPawn(board, x, y, color, pawn)
+        if len(parts) == 6:
+            if not (parts[4].isdigit() and parts[5].isdigit()):
+                raise InvalidFenError(fen)
+            board.halfmove_clock = int(parts[4])
+            board.fullmove_number = int(parts[5])
+        return board
+
+    def _castling_pieces(self, color, rook_x):
+        y = 0 if color == WHITE else 7
+        king, rook = self.fields[y][4], self.fields[y][rook_x]
+        return (king is not None and king.type == KING and
+                king.color == color and rook is not None and
+                rook.type == ROOK and rook.color == color)
+
+    def to_fen(self):
+        """
+        Describes the position in Forsyth-Edwards Notation.
+        :rtype: str
+        """
+        ranks = []
+        for rank in reversed(self.fields):
+            text, empty = '', 0
+            for piece in rank:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text, empty = text + str(empty), 0
+                text += _FEN_CHARS[piece.color, piece.type]
+            ranks.append(text + (str(empty) if empty else ''))
+        castling = ''.join(
+            char for char, allowed in [
+                ('K', self.short_castle_allowed[WHITE]),
+                ('Q', self.long_castle_allowed[WHITE]),
+                ('k', self.short_castle_allowed[BLACK]),
+                ('q', self.long_castle_allowed[BLACK])
+            ] if allowed
+        )
+        en_passant = self.en_passant
+        return '%s %s %s %s %i %i' % (
+            '/'.join(ranks), 'w' if self.side_to_move == WHITE else 'b',
+            castling or '-',
+            '%s%i' % (FILE_NAMES[en_passant.x], en_passant.y + 1)
+            if en_passant else '-',
+            self.halfmove_clock, self.fullmove_number
+        )
+
+    @property
+    def long_castle_allowed(self):
+        """
+        Whether each color may still castle on the queen's side.
+        :rtype: CastlingRights
+        """
+        return self._long_castle_allowed
+
+    @long_castle_allowed.setter
+    def long_castle_allowed(self, rights):
+        for color, allowed in rights.items():
+            self._long_castle_allowed[color] = allowed
+
+    @property
+    def short_castle_allowed(self):
+        """
+        Whether each color may still castle on the king's side.
+        :rtype: CastlingRights
+        """
+        return self._short_castle_allowed
+
+    @short_castle_allowed.setter
+    def short_castle_allowed(self, rights):
+        for color, allowed in rights.items():
+            self._short_castle_allowed[color] = allowed
+
+    @property
+    def en_passant(self):
+        """
+        Phantom pawn left on the field skipped by a double pawn step.
+        :rtype: PhantomPawn
+        """
+        return self._en_passant
+
+    @en_passant.setter
+    def en_passant(self, phantom):
+        if self._en_passant is not None:
+            self.hash_key ^= EN_PASSANT_KEYS[self._en_passant.x]
+        if phantom is not None:
+            self.hash_key ^= EN_PASSANT_KEYS[phantom.x]
+        self._en_passant = phantom
+
+    @property
+    def side_to_move(self):
+        return self._side_to_move
+
+    @side_to_move.setter
+    def side_to_move(self, color):
+        if color != self._side_to_move:
+            self.hash_key ^= BLACK_TO_MOVE_KEY
+        self._side_to_move = color
 
     def _fill_starting_board(self):
         """
@@ -68,20 +402,20 @@ class Board(object):
             if piece_cls == King:
                 self.white_king = piece
             self.white_pieces.add(piece)
-            self.fields[0][x] = piece
+            self.put_piece(piece, x, 0)
 
             piece = Pawn(self, x, 1, WHITE)
-            self.fields[1][x] = piece
+            self.put_piece(piece, x, 1)
             self.white_pieces.add(piece)
 
             piece = piece_cls(self, x, 7, BLACK)
             if piece_cls == King:
-                self.black_king == piece
-            self.fields[7][x] = piece
+                self.black_king = piece
+            self.put_piece(piece, x, 7)
             self.black_pieces.add(piece)
 
             piece = Pawn(self, x, 6, BLACK)
-            self.fields[6][x] = piece
+            self.put_piece(piece, x, 6)
             self.black_pieces.add(piece)
 
     def get_piece(self, x, y):
@@ -102,6 +436,7 @@ class Board(object):
         :param piece: piece to be picked
         """
         x, y = piece.x, piece.y
+        self.hash_key ^= PIECE_KEYS[piece.color][piece.type][y * 8 + x]
         self.fields[y][x] = None
 
     def put_piece(self, piece, x, y):
@@ -112,8 +447,21 @@ class Board(object):
         :param y: rank of the field
         """
         piece.x, piece.y = (x, y)
+        self.hash_key ^= PIECE_KEYS[piece.color][piece.type][y * 8 + x]
         self.fields[y][x] = piece
 
+    def add_piece(self, piece, x, y):
+        """
+        Adds a piece which is not on the board to the field.
+        :param piece: piece to be added
+        :param x: file of the field
+        :param y: rank of the field
+        """
+        pieces_set = self.white_pieces \
+            if piece.color == WHITE else self.black_pieces
+        pieces_set.add(piece)
+        self.put_piece(piece, x, y)
+
     def remove_piece(self, piece):
         """
         Removes the piece from the board.
@@ -124,23 +472,383 @@ class Board(object):
         pieces_set = self.white_pieces \
             if piece.color == WHITE else self.black_pieces
         pieces_set.remove(piece)
+        self.hash_key ^= \
+            PIECE_KEYS[piece.color][piece.type][piece.y * 8 + piece.x]
         self.fields[piece.y][piece.x] = None
 
+    def switch_side(self):
+        """
+        Passes the move to the other side.
+        """
+        self.side_to_move = WHITE if self.side_to_move == BLACK else BLACK
+
+    def make_move(self, move):
+        """
+        Plays the move on the board and passes the move to the other side.
+        The move is not validated, it should come from the move generator.
+        Everything needed to take it back is pushed to the undo stack.
+        :param move: move to be played
+        :type move: moves.Move
+        """
+        fields = self.fields
+        piece = fields[move.from_y][move.from_x]
+        captured = fields[move.to_y][move.to_x]
+        if (captured is None and piece.type == PAWN and
+                move.from_x != move.to_x):
+            captured = self.en_passant.linked_pawn
+        undo = _Undo(
+            move, piece, captured,
+            (self.long_castle_allowed[WHITE], self.long_castle_allowed[BLACK],
+             self.short_castle_allowed[WHITE],
+             self.short_castle_allowed[BLACK]),
+            self.en_passant, None, None, self.halfmove_clock, self.hash_key
+        )
+        if captured is not None:
+            self.remove_piece(captured)
+        if move.promotion is not None:
+            promoted = PIECE_CLASSES[move.promotion](
+                self, move.to_x, move.to_y, piece.color
+            )
+            self.remove_piece(piece)
+            self.add_piece(promoted, move.to_x, move.to_y)
+            undo = undo._replace(promoted=promoted)
+        else:
+            self.pick_piece(piece)
+            self.put_piece(piece, move.to_x, move.to_y)
+        if piece.type == KING and abs(move.to_x - move.from_x) == 2:
+            rook_x = 0 if move.to_x < move.from_x else 7
+            rook = fields[move.from_y][rook_x]
+            self.pick_piece(rook)
+            self.put_piece(rook, (move.from_x + move.to_x) // 2, move.to_y)
+            undo = undo._replace(rook=(rook, rook_x))
+        for field in ((move.from_x, move.from_y), (move.to_x, move.to_y)):
+            for long_castle, color in _CASTLING_FIELDS.get(field, ()):
+                if long_castle:
+                    self.long_castle_allowed[color] = False
+                else:
+                    self.short_castle_allowed[color] = False
+        if piece.type == PAWN and abs(move.to_y - move.from_y) == 2:
+            self.en_passant = PhantomPawn(
+                self, move.from_x, (move.from_y + move.to_y) // 2,
+                piece.color, piece
+            )
+        else:
+            self.en_passant = None
+        if piece.type == PAWN or captured is not None:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if piece.color == BLACK:
+            self.fullmove_number += 1
+        self.undo_stack.append(undo)
+        self.switch_side()
+
+    def unmake_move(self):
+        """
+        Takes back the last move played with ``make_move`` restoring the
+        previous position.
+        :return: the move taken back
+        :rtype: moves.Move
+        """
+        undo = self.undo_stack.pop()
+        move, piece = undo.move, undo.piece
+        self.switch_side()
+        self.halfmove_clock = undo.halfmove_clock
+        if piece.color == BLACK:
+            self.fullmove_number -= 1
+        self.en_passant = undo.en_passant
+        (self.long_castle_allowed[WHITE], self.long_castle_allowed[BLACK],
+         self.short_castle_allowed[WHITE],
+         self.short_castle_allowed[BLACK]) = undo.castling
+        if undo.rook is not None:
+            rook, rook_x = undo.rook
+            self.pick_piece(rook)
+            self.put_piece(rook, rook_x, move.from_y)
+        if undo.promoted is not None:
+            self.remove_piece(undo.promoted)
+            self.add_piece(piece, move.from_x, move.from_y)
+        else:
+            self.pick_piece(piece)
+            self.put_piece(piece, move.from_x, move.from_y)
+        if undo.captured is not None:
+            captured = undo.captured
+            self.add_piece(captured, captured.x, captured.y)
+        return move
+
+    def repetition_count(self):
+        """
+        Counts the occurrences of the current position, looking back to
+        the last capture or pawn move.
+        :rtype: int
+        """
+        key = self.hash_key
+        reversible = min(self.halfmove_clock, len(self.undo_stack))
+        return 1 + sum(
+            undo.hash_key == key
+            for undo in self.undo_stack[len(self.undo_stack) - reversible:]
+        )
+
+    def is_insufficient_material(self):
+        """
+        Tells whether neither side can mate: only the kings are left, with
+        at most one knight or bishop, or with bishops on fields of one
+        color.
+        """
+        pieces = [piece for piece in self.white_pieces | self.black_pieces
+                  if piece.type != KING]
+        if any(piece.type in (PAWN, ROOK, QUEEN) for piece in pieces):
+            return False
+        if len(pieces) <= 1:
+            return True
+        return (all(piece.type == BISHOP for piece in pieces) and
+                len({(piece.x + piece.y) % 2 for piece in pieces}) == 1)
+
+    def any_piece_between(self, from_x, from_y, to_x, to_y):
+        """
+        Tells whether any piece stands between two fields lying on the same
+        rank, file or diagonal. Both end fields are excluded.
+        :param from_x: file of the first field
+        :param from_y: rank of the first field
+        :param to_x: file of the second field
+        :param to_y: rank of the second field
+        :return: whether the way between the fields is blocked
+        """
+        fields = BETWEEN_FIELDS[square(from_x, from_y)][square(to_x, to_y)]
+        for x, y in fields:
+            if self.fields[y][x] is not None:
+                return True
+        return False
+
+    def generate_moves(self, color):
+        """
+        Lazily generates pseudo-legal moves of the pieces of the color in
+        two stages: captures and promotions first, then the quiet moves.
+        The quiet moves are not generated until the captures are consumed.
+        :param color: color of the pieces to move
+        :rtype: collections.Iterable[moves.Move]
+        """
+        yield from self.generate_captures(color)
+        yield from self.generate_quiet_moves(color)
+
+    def generate_captures(self, color):
+        """
+        Lazily generates pseudo-legal captures and promotions of the pieces
+        of the color.
+        :param color: color of the pieces to move
+        """
+        for piece in self._pieces_by_type(color):
+            yield from piece.generate_moves(True)
+
+    def generate_quiet_moves(self, color):
+        """
+        Lazily generates pseudo-legal moves of the pieces of the color which
+        neither capture nor promote.
+        :param color: color of the pieces to move
+        """
+        for piece in self._pieces_by_type(color):
+            yield from piece.generate_moves(False)
+
+    def _pieces_by_type(self, color):
+        """
+        Returns a snapshot of the pieces of the color, ordered by their
+        type, so that the board may change while the moves are generated.
+        """
+        pieces = self.white_pieces if color == WHITE else self.black_pieces
+        return sorted(pieces, key=lambda piece: _TYPE_ORDER[piece.type])
+
+    def get_king(self, color):
+        """
+        Returns the king of the specified color.
+        :rtype: King
+        """
+        return self.white_king if color == WHITE else self.black_king
+
+    def attack_mask(self, color, ignore=None):
+        """
+        Computes the fields attacked by the pieces of the specified color,
+        including the fields occupied by pieces of that color.
+        :param color: color of the attacking pieces
+        :param ignore: piece treated as absent, so that rays pass through it
+        :return: bitboard of attacked fields
+        """
+        fields = self.fields
+        pieces = self.white_pieces if color == WHITE else self.black_pieces
+        mask = 0
+        for piece in pieces:
+            sq = square(piece.x, piece.y)
+            if piece.type == PAWN:
+                mask |= PAWN_ATTACKS[color][sq]
+            elif piece.type == KNIGHT:
+                mask |= KNIGHT_ATTACKS[sq]
+            elif piece.type == KING:
+                mask |= KING_ATTACKS[sq]
+            else:
+                rays = RAY_FIELDS[sq]
+                for direction in SLIDER_DIRECTIONS[piece.type]:
+                    for x, y in rays[direction]:
+                        mask |= 1 << (y * 8 + x)
+                        target = fields[y][x]
+                        if target is not None and target is not ignore:
+                            break
+        return mask
+
+    def find_checks_and_pins(self, color):
+        """
+        Looks outward from the king of the specified color for the pieces
+        giving check and for the pieces pinned to the king.
+        :param color: color of the king
+        :return: tuple of three elements: bitboard of the checking pieces,
+            bitboard of the fields where a piece other than the king may
+            move to (all fields if there is no check, capturing the checker
+            or blocking the check when there is one, none in double check)
+            and dictionary mapping pinned pieces to bitboards of the fields
+            along the pin they may still move to
+        """
+        king = self.get_king(color)
+        king_sq = square(king.x, king.y)
+        fields = self.fields
+        checkers = 0
+        for x, y in KNIGHT_FIELDS[king_sq]:
+            piece = fields[y][x]
+            if (piece is not None and piece.type == KNIGHT and
+                    piece.color != color):
+                checkers |= 1 << (y * 8 + x)
+        for x, y in PAWN_FIELDS[color][king_sq]:
+            piece = fields[y][x]
+            if (piece is not None and piece.type == PAWN and
+                    piece.color != color):
+                checkers |= 1 << (y * 8 + x)
+        pins = {}
+        for direction, ray in enumerate(RAY_FIELDS[king_sq]):
+            pinned = None
+            for x, y in ray:
+                piece = fields[y][x]
+                if piece is None:
+                    continue
+                if piece.color == color:
+                    if pinned is not None:
+                        break
+                    pinned = piece
+                    continue
+                if piece.type in DIRECTION_SLIDERS[direction]:
+                    slider_sq = y * 8 + x
+                    if pinned is None:
+                        checkers |= 1 << slider_sq
+                    else:
+                        pins[pinned] = (BETWEEN[king_sq][slider_sq] |
+                                        1 << slider_sq)
+                break
+        if not checkers:
+            check_mask = ALL_FIELDS
+        elif checkers & (checkers - 1):
+            check_mask = 0
+        else:
+            checker_sq = checkers.bit_length() - 1
+            check_mask = checkers | BETWEEN[king_sq][checker_sq]
+        return checkers, check_mask, pins
+
+    def generate_legal_moves(self, color, quiet=True):
+        """
+        Lazily generates legal moves of the pieces of the color, captures
+        and promotions first. Checks and pins are found once per position
+        and every pseudo-legal move is filtered with bitboard masks, so no
+        move is played on the board. The board must not change until the
+        generator is exhausted.
+        :param color: color of the pieces to move
+        :param quiet: False to stop after the captures and promotions
+        :rtype: collections.Iterable[moves.Move]
+        """
+        king = self.get_king(color)
+        opp_color = WHITE if color == BLACK else BLACK
+        checkers, check_mask, pins = self.find_checks_and_pins(color)
+        # fields attacked behind the king are unsafe as well
+        danger = self.attack_mask(opp_color, ignore=king)
+        fields = self.fields
+        for captures in ((True, False) if quiet else (True,)):
+            if check_mask:
+                moves = (self.generate_captures(color)
+                         if captures else self.generate_quiet_moves(color))
+            else:
+                # double check, only the king can move
+                moves = king.generate_moves(captures)
+            for move in moves:
+                piece = fields[move.from_y][move.from_x]
+                to_bit = 1 << (move.to_y * 8 + move.to_x)
+                if piece is king:
+                    if danger & to_bit:
+                        continue
+                    if abs(move.to_x - move.from_x) == 2:
+                        passed_x = (move.from_x + move.to_x) // 2
+                        if (checkers or
+                                danger >> square(passed_x, move.to_y) & 1):
+                            continue
+                    yield move
+                    continue
+                en_passant = (piece.type == PAWN and
+                              move.from_x != move.to_x and
+                              fields[move.to_y][move.to_x] is None)
+                if not check_mask & to_bit:
+                    # the pawn captured en passant may be the checker
+                    if not (en_passant and
+                            checkers >> square(move.to_x, move.from_y) & 1):
+                        continue
+                if piece in pins and not pins[piece] & to_bit:
+                    continue
+                if en_passant and self._en_passant_exposes_king(color, move):
+                    continue
+                yield move
+
+    def _en_passant_exposes_king(self, color, move):
+        """
+        En passant removes two pieces from the king's lines at once, which
+        the pin detection cannot see. The capture is tried out on the fields
+        only, which is cheap as the move is rare.
+        """
+        fields = self.fields
+        pawn = fields[move.from_y][move.from_x]
+        captured = fields[move.from_y][move.to_x]
+        fields[move.from_y][move.from_x] = None
+        fields[move.from_y][move.to_x] = None
+        fields[move.to_y][move.to_x] = pawn
+        try:
+            return bool(self.find_checks_and_pins(color)[0])
+        finally:
+            fields[move.to_y][move.to_x] = None
+            fields[move.from_y][move.to_x] = captured
+            fields[move.from_y][move.from_x] = pawn
+
     def is_king_in_check(self, color):
         """
         Tells whether the king of the specified color is in check.
-        Checks all opponent's pieces performing check of attack on king's
-        field.
+        Looks outward from the king's field: at the knight and pawn fields
+        and at the first piece along each of the eight rays, so the cost
+        doesn't depend on the number of pieces on the board.
         :param color: piece color to be checked
         :return: whether the king is checked
         """
         assert color in {WHITE, BLACK}
-        pieces_color, king = (
-            (BLACK, self.white_king)
-            if color == WHITE
-            else (self.white_pieces, self.black_king)
-        )
-        return self.is_field_attacked(pieces_color, king.x, king.y)
+        king = self.get_king(color)
+        king_sq = square(king.x, king.y)
+        fields = self.fields
+        for x, y in KNIGHT_FIELDS[king_sq]:
+            piece = fields[y][x]
+            if (piece is not None and piece.type == KNIGHT and
+                    piece.color != color):
+                return True
+        for x, y in PAWN_FIELDS[color][king_sq]:
+            piece = fields[y][x]
+            if (piece is not None and piece.type == PAWN and
+                    piece.color != color):
+                return True
+        for direction, ray in enumerate(RAY_FIELDS[king_sq]):
+            for x, y in ray:
+                piece = fields[y][x]
+                if piece is not None:
+                    if (piece.color != color and
+                            piece.type in DIRECTION_SLIDERS[direction]):
+                        return True
+                    break
+        return False
 
     def is_field_attacked(self, color, x=None, y=None, fields=None):
         """
@@ -167,22 +875,287 @@ class Board(object):
 
     def print(self):
         """
-        Print the board to console output.
+        Print the board to console output, written at once.
         """
-        print('  |  0 1 2 3 4 5 6 7')
-        print('--+-----------------')
+        colorama = _init_colorama()
+        lines = ['  |  0 1 2 3 4 5 6 7', '--+-----------------']
         for y, rank in zip(range(7, -1, -1), reversed(self.fields)):
-            sys.stdout.write('%i |  ' % y)
+            line = ['%i |  ' % y]
             for x, piece in enumerate(rank):
                 back_color = (colorama.Back.RED
                               if (x + y) % 2 == 0
                               else colorama.Back.LIGHTYELLOW_EX)
                 if piece is None:
-                    sys.stdout.write(back_color + '  ')
+                    line.append(back_color + '  ')
                 else:
                     front_color = (colorama.Fore.BLACK
                                    if piece.color == BLACK
                                    else colorama.Fore.WHITE)
-                    sys.stdout.write(back_color + front_color +
-                                     piece.type + ' ')
-            sys.stdout.write('\n')
+                    line.append(back_color + front_color + piece.type + ' ')
+            lines.append(''.join(line) + colorama.Style.RESET_ALL)
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+class BitBoard(Board):
+    """
+    Board backend which, next to the fields, keeps a 64-bit occupancy
+    integer for every piece type and color. Occupancy and attack queries
+    are answered with bitwise operations instead of walking the fields.
+    """
+
+    def __init__(self, fill=True):
+        self.bitboards = {
+            WHITE: dict.fromkeys(PIECE_TYPES, 0),
+            BLACK: dict.fromkeys(PIECE_TYPES, 0)
+        }
+        self.occupied = {
+            WHITE: 0,
+            BLACK: 0
+        }
+        super().__init__(fill)
+
+    @property
+    def occupancy(self):
+        """
+        Returns the bitboard of all occupied fields.
+        """
+        return self.occupied[WHITE] | self.occupied[BLACK]
+
+    def pick_piece(self, piece):
+        mask = ~(1 << square(piece.x, piece.y))
+        self.bitboards[piece.color][piece.type] &= mask
+        self.occupied[piece.color] &= mask
+        super().pick_piece(piece)
+
+    def put_piece(self, piece, x, y):
+        mask = 1 << square(x, y)
+        self.bitboards[piece.color][piece.type] |= mask
+        self.occupied[piece.color] |= mask
+        super().put_piece(piece, x, y)
+
+    def remove_piece(self, piece):
+        mask = ~(1 << square(piece.x, piece.y))
+        self.bitboards[piece.color][piece.type] &= mask
+        self.occupied[piece.color] &= mask
+        super().remove_piece(piece)
+
+    def is_occupied(self, x, y):
+        """
+        Tells whether any piece stands on the field.
+        """
+        return bool(self.occupancy >> square(x, y) & 1)
+
+    def any_piece_between(self, from_x, from_y, to_x, to_y):
+        mask = BETWEEN[square(from_x, from_y)][square(to_x, to_y)]
+        return bool(mask & self.occupancy)
+
+    def attackers(self, color, x, y):
+        """
+        Finds the pieces of the given color attacking the field, whatever
+        stands on it.
+        :param color: color of the attacking pieces
+        :param x: file of the attacked field
+        :param y: rank of the attacked field
+        :return: bitboard of the squares of the attacking pieces
+        """
+        sq = square(x, y)
+        pieces = self.bitboards[color]
+        opp_color = WHITE if color == BLACK else BLACK
+        result = (
+            (KNIGHT_ATTACKS[sq] & pieces[KNIGHT]) |
+            (KING_ATTACKS[sq] & pieces[KING]) |
+            (PAWN_ATTACKS[opp_color][sq] & pieces[PAWN])
+        )
+        occupancy = self.occupancy
+        for directions, sliders in [
+                (ROOK_DIRECTIONS, pieces[ROOK] | pieces[QUEEN]),
+                (BISHOP_DIRECTIONS, pieces[BISHOP] | pieces[QUEEN])]:
+            if not sliders:
+                continue
+            for direction in directions:
+                blocker = first_blocker(sq, direction, occupancy)
+                if blocker is not None and sliders >> blocker & 1:
+                    result |= 1 << blocker
+        return result
+
+    def attack_mask(self, color, ignore=None):
+        pieces = self.bitboards[color]
+        occupancy = self.occupancy
+        if ignore is not None:
+            occupancy &= ~(1 << square(ignore.x, ignore.y))
+        mask = 0
+        for sq in iter_squares(pieces[PAWN]):
+            mask |= PAWN_ATTACKS[color][sq]
+        for sq in iter_squares(pieces[KNIGHT]):
+            mask |= KNIGHT_ATTACKS[sq]
+        for sq in iter_squares(pieces[KING]):
+            mask |= KING_ATTACKS[sq]
+        for piece_type in (ROOK, BISHOP, QUEEN):
+            for sq in iter_squares(pieces[piece_type]):
+                rays = RAY_MASKS[sq]
+                for direction in SLIDER_DIRECTIONS[piece_type]:
+                    ray = rays[direction]
+                    blocker = first_blocker(sq, direction, occupancy)
+                    if blocker is not None:
+                        ray &= ~RAY_MASKS[blocker][direction]
+                    mask |= ray
+        return mask
+
+    def is_king_in_check(self, color):
+        assert color in {WHITE, BLACK}
+        king = self.get_king(color)
+        opp_color = WHITE if color == BLACK else BLACK
+        return bool(self.attackers(opp_color, king.x, king.y))
+
+    def is_field_attacked(self, color, x=None, y=None, fields=None):
+        """
+        Tells whether the field is attacked by the pieces of the specified
+        color. Unlike the list-based board, a field is attacked also when it
+        is occupied by a piece of the attacking color.
+        :param color: color of pieces to examine
+        :param x: file of the examined field
+        :param y: rank of the examined field
+        :param fields: list of tuple containing coordinates of fields to check
+        :return: whether the field is under attack
+        """
+        assert color in (WHITE, BLACK)
+        if fields is None:
+            fields = [(x, y)]
+        return any(self.attackers(color, x, y) for x, y in fields)
+
+
+class AttackMapBoard(BitBoard):
+    """
+    Bitboard backend which also keeps, for each color, the number of its
+    pieces attacking every field. The counts are updated whenever a piece
+    is put or picked: only the attacks of that piece and of the sliders
+    whose rays pass through the changed field are recomputed. Telling
+    whether a field is attacked is a single lookup.
+    """
+
+    def __init__(self, fill=True):
+        self.attack_counts = {
+            WHITE: [0] * 64,
+            BLACK: [0] * 64
+        }
+        # bitboards of the fields with non-zero counts
+        self.attacked = {
+            WHITE: 0,
+            BLACK: 0
+        }
+        # fields attacked by each piece on the board, and by each slider
+        self._piece_attacks = {}
+        self._slider_attacks = {}
+        super().__init__(fill)
+
+    def _compute_attacks(self, piece):
+        sq = square(piece.x, piece.y)
+        if piece.type == PAWN:
+            return PAWN_ATTACKS[piece.color][sq]
+        if piece.type == KNIGHT:
+            return KNIGHT_ATTACKS[sq]
+        if piece.type == KING:
+            return KING_ATTACKS[sq]
+        occupancy = self.occupancy
+        mask = 0
+        rays = RAY_MASKS[sq]
+        for direction in SLIDER_DIRECTIONS[piece.type]:
+            ray = rays[direction]
+            blocker = first_blocker(sq, direction, occupancy)
+            if blocker is not None:
+                ray &= ~RAY_MASKS[blocker][direction]
+            mask |= ray
+        return mask
+
+    def _add_attacks(self, color, mask):
+        counts = self.attack_counts[color]
+        for sq in iter_squares(mask):
+            if not counts[sq]:
+                self.attacked[color] |= 1 << sq
+            counts[sq] += 1
+
+    def _remove_attacks(self, color, mask):
+        counts = self.attack_counts[color]
+        for sq in iter_squares(mask):
+            counts[sq] -= 1
+            if not counts[sq]:
+                self.attacked[color] &= ~(1 << sq)
+
+    def _attach(self, piece):
+        mask = self._compute_attacks(piece)
+        self._piece_attacks[piece] = mask
+        if piece.type in SLIDER_DIRECTIONS:
+            self._slider_attacks[piece] = mask
+        self._add_attacks(piece.color, mask)
+
+    def _detach(self, piece):
+        mask = self._piece_attacks.pop(piece)
+        self._slider_attacks.pop(piece, None)
+        self._remove_attacks(piece.color, mask)
+
+    def _update_sliders(self, sq):
+        """
+        Recomputes the attacks of the sliders reaching the field whose
+        occupancy has just changed.
+        """
+        bit = 1 << sq
+        for slider, mask in list(self._slider_attacks.items()):
+            if mask & bit:
+                new_mask = self._compute_attacks(slider)
+                self._remove_attacks(slider.color, mask & ~new_mask)
+                self._add_attacks(slider.color, new_mask & ~mask)
+                self._slider_attacks[slider] = new_mask
+                self._piece_attacks[slider] = new_mask
+
+    def pick_piece(self, piece):
+        super().pick_piece(piece)
+        self._detach(piece)
+        self._update_sliders(square(piece.x, piece.y))
+
+    def put_piece(self, piece, x, y):
+        super().put_piece(piece, x, y)
+        self._update_sliders(square(x, y))
+        self._attach(piece)
+
+    def remove_piece(self, piece):
+        super().remove_piece(piece)
+        self._detach(piece)
+        self._update_sliders(square(piece.x, piece.y))
+
+    def attack_mask(self, color, ignore=None):
+        mask = self.attacked[color]
+        if ignore is None:
+            return mask
+        # extend the rays of the sliders hitting the ignored piece
+        ignored_sq = square(ignore.x, ignore.y)
+        occupancy = self.occupancy & ~(1 << ignored_sq)
+        for slider, slider_mask in self._slider_attacks.items():
+            if slider.color != color or not slider_mask >> ignored_sq & 1:
+                continue
+            direction = DIRECTION[square(slider.x, slider.y)][ignored_sq]
+            ray = RAY_MASKS[ignored_sq][direction]
+            blocker = first_blocker(ignored_sq, direction, occupancy)
+            if blocker is not None:
+                ray &= ~RAY_MASKS[blocker][direction]
+            mask |= ray
+        return mask
+
+    def is_king_in_check(self, color):
+        assert color in {WHITE, BLACK}
+        king = self.get_king(color)
+        opp_color = WHITE if color == BLACK else BLACK
+        return self.attack_counts[opp_color][square(king.x, king.y)] > 0
+
+    def is_field_attacked(self, color, x=None, y=None, fields=None):
+        assert color in (WHITE, BLACK)
+        if fields is None:
+            return self.attack_counts[color][square(x, y)] > 0
+        counts = self.attack_counts[color]
+        return any(counts[square(x, y)] for x, y in fields)
+
+
+BOARD_BACKENDS = {
+    'list': Board,
+    'bitboard': BitBoard,
+    'attackmap': AttackMapBoard
+}
@@ -1,68 +1,154 @@
+import argparse
 import sys
+import threading
 
 import itertools
 import pygame
 from pygame import Rect
 
-from board import BoardManager
+from board import Board, BoardManager
 from locals import *
 from panel import Panel
+from search import Search
+from sprites import SpriteCache
+from transposition import TranspositionTable
 
 
+# initial size of the window, which can be resized
 WINDOW_SIZE = 480, 480
 BLACK_FIELD = [0x88, 0x66, 0x33]
 WHITE_FIELD = [0xFF, 0xFF, 0xEE]
 SELECTED_FIELD_COLOR = [0xEE, 0xEE, 0x55]
-BOARD_POSITION = Rect(48, 48, 384, 384)
-
-
-pygame.init()
-screen = pygame.display.set_mode(WINDOW_SIZE)
-clock = pygame.time.Clock()
-pygame.display.set_caption('Chess Game')
+BACKGROUND_COLOR = [0x00, 0x00, 0x00]
+# posted by the engine thread when it has chosen its move
+ENGINE_MOVE_EVENT = pygame.USEREVENT + 1
+# longest wait for an event, in milliseconds, so that clocks and animations
+# get a chance to run
+EVENT_TIMEOUT = 1000
+
+
+def board_rect(window_size):
+    """
+    Places the board in the middle of the window, leaving the width of
+    a field free around it.
+    :rtype: pygame.Rect
+    """
+    field_size = max(min(window_size) // 10, 1)
+    rect = Rect(0, 0, 8 * field_size, 8 * field_size)
+    rect.center = (window_size[0] // 2, window_size[1] // 2)
+    return rect
 
 
 class WindowPanel(Panel):
-    pass
+
+    def paint(self, surface):
+        surface.fill(BACKGROUND_COLOR)
+
+
+class Engine(object):
+    """
+    Plays one side of the game. The search runs in a background thread and
+    the chosen move is posted to the event queue as ENGINE_MOVE_EVENT.
+    """
+
+    def __init__(self, color, depth, time_limit=None, hash_mb=16):
+        self.color = color
+        self.depth = depth
+        self.time_limit = time_limit
+        self.table = TranspositionTable(hash_mb)
+        self.thinking = False
+
+    def start(self, manager):
+        """
+        Starts searching the current position of the game.
+        :type manager: board.BoardManager
+        """
+        board = manager.board
+        history_keys = [undo.hash_key for undo in board.undo_stack]
+        # the search makes moves on its own copy, while the window keeps
+        # painting the board of the game
+        position = Board.from_fen(board.to_fen())
+        self.thinking = True
+        threading.Thread(target=self._search, args=(position, history_keys),
+                         daemon=True).start()
+
+    def _search(self, board, history_keys):
+        result = Search(board, self.table, history_keys).search(
+            self.depth, self.time_limit
+        )
+        pygame.event.post(pygame.event.Event(ENGINE_MOVE_EVENT,
+                                             move=result.best_move))
 
 
 class BoardPanel(Panel):
 
-    _sprites = pygame.image.load('ChessPiecesSprite.png').convert_alpha(screen)
-    _piece_sprite_rects = {
-        color: {
-            piece: Rect(left, top, 48, 48)
-            for piece, left in zip(
-                [KING, QUEEN, BISHOP, KNIGHT, ROOK, PAWN], range(0, 288, 48)
-            )
-        }
-        for color, top in [(WHITE, 0), (BLACK, 48)]
-    }
-
-    def __init__(self):
-        super(BoardPanel, self).__init__(BOARD_POSITION)
+    _sprites = SpriteCache()
+
+    def __init__(self, rect):
+        super(BoardPanel, self).__init__(rect)
         self._selected_field = None
+        self.resize(rect)
+
+    def resize(self, rect):
+        """
+        Moves the board to the rect and scales it to its width.
+        """
+        self.rect = rect
+        self.surface = pygame.Surface(rect.size)
+        self._field_size = rect.width // 8
+        self._background = self._render_background()
+        self.redraw()
+
+    def redraw(self):
+        """
+        Draws every field again on the next repaint.
+        """
+        # piece and highlight drawn on every field by the last paint
+        self._drawn = {}
+        self.invalidate()
+
+    def _render_background(self):
+        size = self._field_size
+        background = pygame.Surface(self.rect.size).convert()
+        background.fill(WHITE_FIELD)
+        for (x, y) in itertools.product(range(8), repeat=2):
+            if (x + y) % 2:
+                background.fill(BLACK_FIELD,
+                                Rect(x * size, y * size, size, size))
+        return background
 
     def paint(self, surface):
-        surface.fill(WHITE_FIELD)
+        """
+        Redraws only the fields whose piece or highlight changed since the
+        last paint.
+        :return: rects of the redrawn fields
+        """
+        rects = []
+        size = self._field_size
+        fields = bm.board.fields
         for (x, y) in itertools.product(range(8), repeat=2):
-            if (x + y) % 2:
-                field_rect = Rect(x * 48, y * 48, 48, 48)
-                surface.fill(BLACK_FIELD, rect=field_rect)
-        if self._selected_field:
-            field_rect = Rect(self._selected_field[0] * 48,
-                              (7 - self._selected_field[1]) * 48,
-                              48, 48)
-            surface.fill(SELECTED_FIELD_COLOR, field_rect)
-        for piece in bm.board.white_pieces | bm.board.black_pieces:
-            pos_x, pos_y = piece.x * 48, (7 - piece.y) * 48
-            surface.blit(
-                self._sprites, (pos_x, pos_y),
-                self._piece_sprite_rects[piece.color][piece.type]
-            )
+            piece = fields[y][x]
+            state = ((piece.color, piece.type) if piece else None,
+                     (x, y) == self._selected_field)
+            if self._drawn.get((x, y)) == state:
+                continue
+            self._drawn[(x, y)] = state
+            field_rect = Rect(x * size, (7 - y) * size, size, size)
+            surface.blit(self._background, field_rect, field_rect)
+            if state[1]:
+                surface.fill(SELECTED_FIELD_COLOR, field_rect)
+            if piece:
+                surface.blit(
+                    self._sprites.get(piece.type, piece.color, size),
+                    field_rect
+                )
+            rects.append(field_rect)
+        return rects
 
     def on_click(self, x, y):
-        clicked_field = (x // 48, 7 - y // 48)
+        if engine is not None and engine.thinking:
+            return
+        clicked_field = (x // self._field_size, 7 - y // self._field_size)
         if self._selected_field is None:
             self._selected_field = clicked_field
         else:
@@ -72,24 +158,92 @@ class BoardPanel(Panel):
             except Exception as e:
                 print(e)
             self._selected_field = None
+        self.invalidate()
 
 
-window_panel = WindowPanel(Rect((0, 0), WINDOW_SIZE), screen)
-window_panel.add_component(BoardPanel())
-
 bm = BoardManager()
-
-
-def main():
+engine = None
+# panels of the window, created when the window opens
+window_panel = None
+board_panel = None
+
+
+def open_window(size=WINDOW_SIZE):
+    """
+    Initializes pygame and opens the window with the board. Nothing of it
+    happens on import, so the module can be imported without a display.
+    """
+    global window_panel, board_panel
+
+    pygame.init()
+    screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+    pygame.display.set_caption('Chess Game')
+    window_panel = WindowPanel(Rect((0, 0), size), screen)
+    board_panel = BoardPanel(board_rect(size))
+    window_panel.add_component(board_panel)
+
+
+def start_engine():
+    """
+    Lets the engine search its move when it is to move in a game which is
+    not over yet.
+    """
+    if (engine is not None and not engine.thinking and
+            bm.player_to_move == engine.color and bm.outcome() is None):
+        engine.start(bm)
+
+
+def handle_event(event):
+    if event.type == pygame.QUIT:
+        sys.exit()
+    elif event.type == pygame.MOUSEBUTTONUP:
+        window_panel.clicked(*event.pos)
+        start_engine()
+    elif event.type == ENGINE_MOVE_EVENT:
+        engine.thinking = False
+        move = event.move
+        if move is not None:
+            bm.move_piece(move.from_x, move.from_y, move.to_x, move.to_y,
+                          move.promotion or QUEEN)
+            board_panel.invalidate()
+        start_engine()
+    elif event.type == pygame.VIDEORESIZE:
+        window_panel.rect = Rect((0, 0), event.size)
+        window_panel.surface = pygame.display.get_surface()
+        board_panel.resize(board_rect(event.size))
+        window_panel.invalidate()
+    elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+        board_panel.redraw()
+        window_panel.invalidate()
+
+
+def main(argv=None):
+    global engine
+
+    parser = argparse.ArgumentParser(description='Chess game')
+    parser.add_argument('--engine', choices=['white', 'black'],
+                        help='side played by the engine')
+    parser.add_argument('--depth', type=int, default=3,
+                        help='search depth of the engine')
+    parser.add_argument('--time', type=float,
+                        help='time limit of the engine per move in seconds')
+    args = parser.parse_args(argv)
+    if args.engine:
+        engine = Engine(WHITE if args.engine == 'white' else BLACK,
+                        args.depth, args.time)
+    open_window()
+    start_engine()
     while True:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONUP:
-                window_panel.clicked(*event.pos)
-
-        window_panel.repaint()
-        pygame.display.flip()
-        clock.tick(30)
-
-main()
+        # sleeps until there is input, an engine move or the timeout, and
+        # then handles everything that is queued before painting once
+        event = pygame.event.wait(EVENT_TIMEOUT)
+        while event.type != pygame.NOEVENT:
+            handle_event(event)
+            event = pygame.event.poll()
+        rects = window_panel.repaint()
+        if rects:
+            pygame.display.update(rects)
+
+
+if __name__ == '__main__':
+    main()
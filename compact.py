@@ -0,0 +1,388 @@
+"""
+Compact position representation for holding many positions at once.
+A position is an array of 64 signed bytes, one per square numbered as in
+``bitboard.square``, with small integer piece codes: positive for white
+pieces, negative for black ones and 0 for empty squares. Movement rules
+live in stateless flyweight objects shared by all positions, and moves
+are the 16-bit codes of ``moves.encode_move``.
+"""
+
+from array import array
+
+from bitboard import iter_squares
+from locals import *
+from moves import PROMOTION_TYPES
+from pieces import PIECE_CLASSES, PhantomPawn
+from tables import (
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, RAYS, ROOK_DIRECTIONS,
+    BISHOP_DIRECTIONS, QUEEN_DIRECTIONS
+)
+
+
+EMPTY = 0
+TYPE_CODES = {PAWN: 1, KNIGHT: 2, BISHOP: 3, ROOK: 4, QUEEN: 5, KING: 6}
+CODE_TYPES = {code: piece_type for piece_type, code in TYPE_CODES.items()}
+SIGNS = {WHITE: 1, BLACK: -1}
+
+WHITE_SHORT = 1
+WHITE_LONG = 2
+BLACK_SHORT = 4
+BLACK_LONG = 8
+ALL_CASTLING = 15
+
+# castling rights kept when a piece moves from or to the square
+_CASTLING_MASKS = [ALL_CASTLING] * 64
+_CASTLING_MASKS[0] = ALL_CASTLING & ~WHITE_LONG
+_CASTLING_MASKS[7] = ALL_CASTLING & ~WHITE_SHORT
+_CASTLING_MASKS[4] = ALL_CASTLING & ~(WHITE_SHORT | WHITE_LONG)
+_CASTLING_MASKS[56] = ALL_CASTLING & ~BLACK_LONG
+_CASTLING_MASKS[63] = ALL_CASTLING & ~BLACK_SHORT
+_CASTLING_MASKS[60] = ALL_CASTLING & ~(BLACK_SHORT | BLACK_LONG)
+
+_KNIGHT_SQUARES = [tuple(iter_squares(mask)) for mask in KNIGHT_ATTACKS]
+_KING_SQUARES = [tuple(iter_squares(mask)) for mask in KING_ATTACKS]
+_PAWN_SQUARES = {
+    SIGNS[color]: [tuple(iter_squares(mask)) for mask in masks]
+    for color, masks in PAWN_ATTACKS.items()
+}
+_PROMOTION_CODES = [TYPE_CODES[piece_type] for piece_type in PROMOTION_TYPES]
+
+
+def piece_code(color, piece_type):
+    """
+    Returns the code of the piece of the color and type.
+    """
+    return TYPE_CODES[piece_type] * SIGNS[color]
+
+
+class Movement(object):
+    """
+    Stateless movement rules of one piece type, shared by all positions.
+    """
+
+    __slots__ = ()
+
+    def generate(self, position, sq, sign, captures):
+        """
+        Generates pseudo-legal move codes of the piece on the square.
+        :param position: position the piece stands in
+        :type position: CompactPosition
+        :param sq: square of the piece
+        :param sign: 1 for a white piece, -1 for a black one
+        :param captures: True for captures and promotions, False for the
+            remaining moves
+        """
+        raise NotImplementedError
+
+
+class StepMovement(Movement):
+
+    __slots__ = ('targets',)
+
+    def __init__(self, targets):
+        """
+        :param targets: tuple of target squares for each square
+        """
+        self.targets = targets
+
+    def generate(self, position, sq, sign, captures):
+        squares = position.squares
+        for target in self.targets[sq]:
+            piece = squares[target]
+            if captures:
+                if piece * sign < 0:
+                    yield sq | target << 6
+            elif not piece:
+                yield sq | target << 6
+
+
+class KingMovement(StepMovement):
+
+    __slots__ = ()
+
+    def generate(self, position, sq, sign, captures):
+        yield from super().generate(position, sq, sign, captures)
+        if captures:
+            return
+        # castling rights imply the king and the rook stand on their fields
+        squares = position.squares
+        short, long = ((WHITE_SHORT, WHITE_LONG) if sign > 0
+                       else (BLACK_SHORT, BLACK_LONG))
+        if (position.castling & short and
+                not squares[sq + 1] and not squares[sq + 2]):
+            yield sq | (sq + 2) << 6
+        if (position.castling & long and not squares[sq - 1] and
+                not squares[sq - 2] and not squares[sq - 3]):
+            yield sq | (sq - 2) << 6
+
+
+class SlideMovement(Movement):
+
+    __slots__ = ('directions',)
+
+    def __init__(self, directions):
+        """
+        :param directions: indices of the directions the piece slides along
+        """
+        self.directions = directions
+
+    def generate(self, position, sq, sign, captures):
+        squares = position.squares
+        rays = RAYS[sq]
+        for direction in self.directions:
+            for target in rays[direction]:
+                piece = squares[target]
+                if not piece:
+                    if not captures:
+                        yield sq | target << 6
+                    continue
+                if captures and piece * sign < 0:
+                    yield sq | target << 6
+                break
+
+
+class PawnMovement(Movement):
+
+    __slots__ = ()
+
+    def generate(self, position, sq, sign, captures):
+        squares = position.squares
+        target = sq + 8 * sign
+        promotes = target < 8 or target >= 56
+        if captures:
+            for capture in _PAWN_SQUARES[sign][sq]:
+                if (squares[capture] * sign < 0 or
+                        capture == position.en_passant):
+                    yield from self._moves(sq, capture, promotes)
+            if promotes and not squares[target]:
+                yield from self._moves(sq, target, promotes)
+        elif not promotes and not squares[target]:
+            yield sq | target << 6
+            start_rank = 1 if sign > 0 else 6
+            if sq >> 3 == start_rank and not squares[target + 8 * sign]:
+                yield sq | (target + 8 * sign) << 6
+
+    @staticmethod
+    def _moves(sq, target, promotes):
+        if promotes:
+            for promotion in range(1, len(PROMOTION_TYPES) + 1):
+                yield sq | target << 6 | promotion << 12
+        else:
+            yield sq | target << 6
+
+
+# movement rules indexed with the absolute value of the piece code
+MOVEMENTS = (
+    None,
+    PawnMovement(),
+    StepMovement(_KNIGHT_SQUARES),
+    SlideMovement(BISHOP_DIRECTIONS),
+    SlideMovement(ROOK_DIRECTIONS),
+    SlideMovement(QUEEN_DIRECTIONS),
+    KingMovement(_KING_SQUARES),
+)
+
+
+class CompactPosition(object):
+    """
+    Position kept as 64 piece codes with the side to move (1 for white,
+    -1 for black), castling right bits and the en passant square (-1 if
+    there is none). Positions are treated as values: playing a move
+    returns a new position.
+    """
+
+    __slots__ = ('squares', 'side', 'castling', 'en_passant')
+
+    def __init__(self, squares=None, side=1, castling=ALL_CASTLING,
+                 en_passant=-1):
+        """
+        :param squares: array of 64 piece codes, empty board if not given
+        :type squares: array.array
+        """
+        self.squares = squares if squares is not None else array('b',
+                                                                  bytes(64))
+        self.side = side
+        self.castling = castling
+        self.en_passant = en_passant
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Encodes the position on the board.
+        :type board: board.Board
+        :rtype: CompactPosition
+        """
+        squares = array('b', bytes(64))
+        for y, rank in enumerate(board.fields):
+            for x, piece in enumerate(rank):
+                if piece is not None:
+                    squares[y * 8 + x] = piece_code(piece.color, piece.type)
+        castling = (
+            board.short_castle_allowed[WHITE] * WHITE_SHORT |
+            board.long_castle_allowed[WHITE] * WHITE_LONG |
+            board.short_castle_allowed[BLACK] * BLACK_SHORT |
+            board.long_castle_allowed[BLACK] * BLACK_LONG
+        )
+        en_passant = board.en_passant
+        return cls(squares, SIGNS[board.side_to_move], castling,
+                   en_passant.y * 8 + en_passant.x if en_passant else -1)
+
+    def to_board(self, backend='list'):
+        """
+        Builds a board with piece objects in this position.
+        :param backend: name of the board implementation
+        :rtype: board.Board
+        """
+        from board import BOARD_BACKENDS
+
+        board = BOARD_BACKENDS[backend](fill=False)
+        for sq, code in enumerate(self.squares):
+            if code:
+                color = WHITE if code > 0 else BLACK
+                piece = PIECE_CLASSES[CODE_TYPES[abs(code)]](
+                    board, sq & 7, sq >> 3, color
+                )
+                board.add_piece(piece, sq & 7, sq >> 3)
+                if abs(code) == TYPE_CODES[KING]:
+                    if color == WHITE:
+                        board.white_king = piece
+                    else:
+                        board.black_king = piece
+        board.long_castle_allowed = {
+            WHITE: bool(self.castling & WHITE_LONG),
+            BLACK: bool(self.castling & BLACK_LONG)
+        }
+        board.short_castle_allowed = {
+            WHITE: bool(self.castling & WHITE_SHORT),
+            BLACK: bool(self.castling & BLACK_SHORT)
+        }
+        board.side_to_move = WHITE if self.side > 0 else BLACK
+        if self.en_passant >= 0:
+            x, y = self.en_passant & 7, self.en_passant >> 3
+            pawn_y = y - self.side
+            board.en_passant = PhantomPawn(
+                board, x, y, BLACK if self.side > 0 else WHITE,
+                board.get_piece(x, pawn_y)
+            )
+        return board
+
+    def copy(self):
+        return CompactPosition(array('b', self.squares), self.side,
+                               self.castling, self.en_passant)
+
+    def king_square(self, sign):
+        """
+        Finds the square of the king of the side given by its sign.
+        """
+        return self.squares.index(TYPE_CODES[KING] * sign)
+
+    def is_attacked(self, sq, by_sign):
+        """
+        Tells whether the square is attacked by the pieces of the side,
+        looking outward from the square.
+        :param sq: examined square
+        :param by_sign: 1 for white attackers, -1 for black ones
+        """
+        squares = self.squares
+        knight, king = 2 * by_sign, 6 * by_sign
+        for target in _KNIGHT_SQUARES[sq]:
+            if squares[target] == knight:
+                return True
+        for target in _KING_SQUARES[sq]:
+            if squares[target] == king:
+                return True
+        for target in _PAWN_SQUARES[-by_sign][sq]:
+            if squares[target] == by_sign:
+                return True
+        rays = RAYS[sq]
+        for direction in range(8):
+            # rooks and queens on straight rays, bishops and queens on
+            # diagonal ones
+            slider = (4 if direction % 2 == 0 else 3) * by_sign
+            queen = 5 * by_sign
+            for target in rays[direction]:
+                piece = squares[target]
+                if piece:
+                    if piece == slider or piece == queen:
+                        return True
+                    break
+        return False
+
+    def in_check(self):
+        """
+        Tells whether the side to move is in check.
+        """
+        return self.is_attacked(self.king_square(self.side), -self.side)
+
+    def generate_moves(self):
+        """
+        Lazily generates pseudo-legal move codes of the side to move,
+        captures and promotions first.
+        """
+        squares = self.squares
+        side = self.side
+        for captures in (True, False):
+            for sq in range(64):
+                piece = squares[sq]
+                if piece * side > 0:
+                    yield from MOVEMENTS[abs(piece)].generate(
+                        self, sq, side, captures
+                    )
+
+    def play(self, code):
+        """
+        Plays the move on a copy of the position.
+        :param code: 16-bit move code
+        :return: the position after the move
+        :rtype: CompactPosition
+        """
+        squares = array('b', self.squares)
+        from_sq, to_sq, promotion = code & 63, code >> 6 & 63, code >> 12
+        piece = squares[from_sq]
+        side = self.side
+        squares[from_sq] = EMPTY
+        if abs(piece) == 1 and to_sq == self.en_passant:
+            squares[to_sq - 8 * side] = EMPTY
+        if promotion:
+            piece = _PROMOTION_CODES[promotion - 1] * side
+        squares[to_sq] = piece
+        if abs(piece) == 6 and abs(to_sq - from_sq) == 2:
+            rook_sq = from_sq + 3 if to_sq > from_sq else from_sq - 4
+            squares[(from_sq + to_sq) // 2] = squares[rook_sq]
+            squares[rook_sq] = EMPTY
+        en_passant = -1
+        if abs(piece) == 1 and abs(to_sq - from_sq) == 16:
+            en_passant = (from_sq + to_sq) // 2
+        castling = (self.castling & _CASTLING_MASKS[from_sq] &
+                    _CASTLING_MASKS[to_sq])
+        return CompactPosition(squares, -side, castling, en_passant)
+
+    def legal_moves(self):
+        """
+        Lists the legal move codes of the side to move, captures first.
+        """
+        side = self.side
+        in_check = None
+        result = []
+        for code in self.generate_moves():
+            from_sq, to_sq = code & 63, code >> 6 & 63
+            if abs(self.squares[from_sq]) == 6 and abs(to_sq - from_sq) == 2:
+                if in_check is None:
+                    in_check = self.in_check()
+                if (in_check or
+                        self.is_attacked((from_sq + to_sq) // 2, -side)):
+                    continue
+            after = self.play(code)
+            if not after.is_attacked(after.king_square(side), -side):
+                result.append(code)
+        return result
+
+
+def perft(position, depth):
+    """
+    Counts the leaf nodes of the legal move tree of the compact position.
+    """
+    moves = position.legal_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+    return sum(perft(position.play(code), depth - 1) for code in moves)
@@ -0,0 +1,120 @@
+"""
+Static evaluation of positions: material and piece-square tables.
+Scores are given in centipawns.
+"""
+
+from locals import *
+
+
+PIECE_VALUES = {
+    PAWN: 100,
+    KNIGHT: 320,
+    BISHOP: 330,
+    ROOK: 500,
+    QUEEN: 900,
+    KING: 0
+}
+
+# Bonuses for pieces standing on each field, as seen by white with the
+# eighth rank on top.
+_PIECE_SQUARE_TABLES = {
+    PAWN: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    ROOK: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    QUEEN: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+# Piece-square tables indexed with square numbers, for each color.
+PIECE_SQUARE_TABLES = {
+    WHITE: {
+        piece_type: [table[(7 - (sq >> 3)) * 8 + (sq & 7)]
+                     for sq in range(64)]
+        for piece_type, table in _PIECE_SQUARE_TABLES.items()
+    },
+    BLACK: {
+        piece_type: list(table)
+        for piece_type, table in _PIECE_SQUARE_TABLES.items()
+    }
+}
+
+# Value of a piece standing on the square, material included.
+_SQUARE_VALUES = {
+    color: {
+        piece_type: [PIECE_VALUES[piece_type] + bonus for bonus in table]
+        for piece_type, table in tables.items()
+    }
+    for color, tables in PIECE_SQUARE_TABLES.items()
+}
+
+
+def evaluate(board):
+    """
+    Evaluates the position from the point of view of the side to move.
+    :param board: position to evaluate
+    :type board: board.Board
+    :return: score in centipawns, positive if the side to move is better
+    """
+    white_values = _SQUARE_VALUES[WHITE]
+    black_values = _SQUARE_VALUES[BLACK]
+    score = 0
+    for piece in board.white_pieces:
+        score += white_values[piece.type][piece.y * 8 + piece.x]
+    for piece in board.black_pieces:
+        score -= black_values[piece.type][piece.y * 8 + piece.x]
+    return score if board.side_to_move == WHITE else -score
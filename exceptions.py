@@ -14,3 +14,7 @@ class NoPieceError(Exception):
 
 class InvalidPieceError(Exception):
     pass
+
+
+class InvalidFenError(Exception):
+    pass
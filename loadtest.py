@@ -0,0 +1,134 @@
+"""
+Load generator for the game server: plays random games over many
+connections at once and measures the move rate and latency.
+Usage: python loadtest.py [--host HOST] [--port PORT] [--local]
+                          [--connections N] [--games N] [--plies N]
+                          [--watch]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections import namedtuple
+
+
+LoadResult = namedtuple('LoadResult', 'moves elapsed moves_per_second p50 p99')
+
+
+def percentile(values, fraction):
+    """
+    Returns the value below which the fraction of the values lies.
+    :param values: sorted values
+    :param fraction: number between 0 and 1
+    """
+    if not values:
+        return 0.0
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def _request(reader, writer, line):
+    writer.write(line.encode() + b'\n')
+    await writer.drain()
+    while True:
+        reply = await reader.readline()
+        if not reply:
+            raise ConnectionError('Connection closed')
+        words = reply.decode().split()
+        # updates of watched games arrive between the replies
+        if words and words[0] in ('OK', 'ERR'):
+            return words
+
+
+async def _play(host, port, connection, games, plies, watch, rng,
+                latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for game in range(games):
+        game_id = 'load-%i-%i' % (connection, game)
+        await _request(reader, writer, 'NEW %s' % game_id)
+        if watch:
+            await _request(reader, writer, 'SUB %s' % game_id)
+        for _ in range(plies):
+            moves = (await _request(reader, writer,
+                                    'MOVES %s' % game_id))[1:]
+            if not moves:
+                break
+            start = time.perf_counter()
+            reply = await _request(reader, writer, 'MOVE %s %s' % (
+                game_id, rng.choice(moves)
+            ))
+            latencies.append(time.perf_counter() - start)
+            if reply[0] != 'OK':
+                raise RuntimeError(' '.join(reply))
+    writer.write(b'QUIT\n')
+    await writer.drain()
+    writer.close()
+
+
+async def run_load(host, port, connections=10, games=5, plies=40,
+                   watch=False, seed=0):
+    """
+    Plays random games on the server over many connections at once.
+    :param connections: number of concurrent connections
+    :param games: number of games played one after another on each
+        connection
+    :param plies: maximal length of each game
+    :param watch: whether every connection subscribes to its games
+    :return: number of moves, time, moves per second and the median and
+        99th percentile of the move latency in seconds
+    :rtype: LoadResult
+    """
+    rng = random.Random(seed)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _play(host, port, connection, games, plies, watch,
+              random.Random(rng.random()), latencies)
+        for connection in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return LoadResult(len(latencies), elapsed,
+                      len(latencies) / elapsed if elapsed else 0.0,
+                      percentile(latencies, 0.5), percentile(latencies, 0.99))
+
+
+async def _run(args):
+    server = None
+    port = args.port
+    if args.local:
+        from server import GameServer
+
+        server = GameServer()
+        port = await server.start(args.host, 0)
+    try:
+        return await run_load(args.host, port, args.connections, args.games,
+                              args.plies, args.watch)
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7000)
+    parser.add_argument('--local', action='store_true',
+                        help='start a server in this process')
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--games', type=int, default=5,
+                        help='games played on each connection')
+    parser.add_argument('--plies', type=int, default=40,
+                        help='maximal length of each game')
+    parser.add_argument('--watch', action='store_true',
+                        help='subscribe to the played games')
+    args = parser.parse_args(argv)
+    result = asyncio.run(_run(args))
+    print('moves %i  time %.2f s  moves/s %.0f  p50 %.2f ms  p99 %.2f ms' % (
+        result.moves, result.elapsed, result.moves_per_second,
+        result.p50 * 1000, result.p99 * 1000
+    ))
+
+
+if __name__ == '__main__':
+    main()
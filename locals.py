@@ -6,3 +6,4 @@ KNIGHT = 'N'
 BISHOP = 'B'
 KING = 'K'
 QUEEN = 'Q'
+PIECE_TYPES = (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING)
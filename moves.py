@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+from exceptions import IllegalMoveError
+from locals import *
+
+
+PROMOTION_TYPES = (QUEEN, ROOK, BISHOP, KNIGHT)
+FILE_NAMES = 'abcdefgh'
+
+
+class Move(namedtuple('Move', 'from_x from_y to_x to_y promotion')):
+    """
+    Single move of a piece from one field to another.
+    :type from_x: int
+    :type from_y: int
+    :type to_x: int
+    :type to_y: int
+    :type promotion: str
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, from_x, from_y, to_x, to_y, promotion=None):
+        """
+        :param from_x: file the piece is moved from
+        :param from_y: rank the piece is moved from
+        :param to_x: file the piece is moved to
+        :param to_y: rank the piece is moved to
+        :param promotion: type of the piece a pawn is promoted to
+        """
+        return super().__new__(cls, from_x, from_y, to_x, to_y, promotion)
+
+    def __str__(self):
+        """
+        Returns the move in coordinate notation, e.g. e2e4 or e7e8Q.
+        """
+        return '%s%i%s%i%s' % (
+            FILE_NAMES[self.from_x], self.from_y + 1,
+            FILE_NAMES[self.to_x], self.to_y + 1,
+            self.promotion or ''
+        )
+
+
+def encode_move(move):
+    """
+    Packs the move into a 16-bit integer: the origin square in the lowest
+    6 bits, the target square in the next 6 and the promotion in the
+    highest 4 bits. None is encoded as 0, which is not a valid move.
+    :type move: Move
+    :rtype: int
+    """
+    if move is None:
+        return 0
+    promotion = (PROMOTION_TYPES.index(move.promotion) + 1
+                 if move.promotion else 0)
+    return ((move.from_y * 8 + move.from_x) |
+            (move.to_y * 8 + move.to_x) << 6 |
+            promotion << 12)
+
+
+def decode_move(code):
+    """
+    Unpacks the move packed with ``encode_move``.
+    :type code: int
+    :rtype: Move
+    """
+    if not code:
+        return None
+    from_sq, to_sq, promotion = code & 63, code >> 6 & 63, code >> 12
+    return Move(from_sq & 7, from_sq >> 3, to_sq & 7, to_sq >> 3,
+                PROMOTION_TYPES[promotion - 1] if promotion else None)
+
+
+def parse_move(text):
+    """
+    Reads a move in coordinate notation, as written by ``Move.__str__`` or
+    by UCI, e.g. e2e4, e7e8Q or e7e8q.
+    :type text: str
+    :rtype: Move
+    :raises IllegalMoveError: the text is not a move
+    """
+    promotion = text[4:].upper() or None
+    if (len(text) not in (4, 5) or
+            text[0] not in FILE_NAMES or text[2] not in FILE_NAMES or
+            text[1] not in '12345678' or text[3] not in '12345678' or
+            promotion not in (None,) + PROMOTION_TYPES):
+        raise IllegalMoveError("Invalid move %s" % text)
+    return Move(FILE_NAMES.index(text[0]), int(text[1]) - 1,
+                FILE_NAMES.index(text[2]), int(text[3]) - 1, promotion)
@@ -16,12 +16,34 @@ class Panel:
             surface = pygame.Surface((rect.width, rect.height))
         self.surface = surface
         self._child_components = []
+        self._parent = None
+        # the panel itself has to be painted again
+        self._dirty = True
+        # some of the child components have to be painted again
+        self._dirty_children = False
     
     def add_component(self, panel):
         """
         Adds component to the panel.
         """
         self._child_components.append(panel)
+        panel._parent = self
+        if panel._dirty or panel._dirty_children:
+            self._invalidate_children()
+
+    def invalidate(self):
+        """
+        Marks the panel to be painted again on the next repaint.
+        """
+        self._dirty = True
+        if self._parent is not None:
+            self._parent._invalidate_children()
+
+    def _invalidate_children(self):
+        panel = self
+        while panel is not None and not panel._dirty_children:
+            panel._dirty_children = True
+            panel = panel._parent
     
     def paint_after(self, surface):
         """
@@ -37,19 +59,53 @@ class Panel:
         Method that should be overwritten in order to draw on top of the panel
         :param surface: current surface you can draw on
         :type surface: pygame.Surface
+        :return: rects of the surface which were drawn on, None if the whole
+            surface may have changed
         """
     
     def repaint(self):
         """
-        Call paint functions of the panel and all children components.
-        Surfaces of each component is then blitted to the panel at their
-        location.
+        Call paint functions of the panel and of the child components marked
+        as invalid. Changed parts of the child surfaces are then blitted to
+        the panel at their location. Clean subtrees are skipped entirely and
+        child components are assumed not to overlap.
+        :return: changed rects relative to the panel
+        :rtype: list[pygame.Rect]
         """
-        self.paint(self.surface)
+        if not self._dirty and not self._dirty_children:
+            return []
+        rects = []
+        painted = []
+        repainted = False
+        if self._dirty:
+            painted = self.paint(self.surface)
+            repainted = painted is None
+            painted = [self.surface.get_rect()] if repainted else list(painted)
+            rects = list(painted)
         for child in self._child_components:
-            child.repaint()
-            self.surface.blit(child.surface, child.rect)
-        self.paint_after(self.surface)
+            child_rects = child.repaint()
+            if repainted:
+                # the child was painted over, its cached surface is blitted
+                # whether it changed or not
+                self.surface.blit(child.surface, child.rect)
+                continue
+            # parts of the child the panel painted over are restored from
+            # its cached surface
+            for rect in painted:
+                overlap = rect.clip(child.rect)
+                if overlap.width and overlap.height:
+                    self.surface.blit(
+                        child.surface, overlap,
+                        overlap.move(-child.rect.left, -child.rect.top)
+                    )
+            for rect in child_rects:
+                self.surface.blit(child.surface, rect.move(child.rect.topleft),
+                                  rect)
+                rects.append(rect.move(child.rect.topleft))
+        if rects:
+            self.paint_after(self.surface)
+        self._dirty = self._dirty_children = False
+        return rects
     
     def clicked(self, x, y):
         """
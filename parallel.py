@@ -0,0 +1,128 @@
+"""
+Parallel search running Lazy SMP helper searches in worker processes.
+Every worker searches the same position on its own board, and all of them
+share one transposition table kept in a shared memory block, so the work
+done by one worker is found by the others without pickling any boards.
+"""
+
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+from board import Board
+from search import Search, MAX_PLY
+from transposition import TranspositionTable, buffer_size
+
+
+# transposition table of the worker process, attached to the shared block,
+# and the flag telling the helpers to stop
+_worker_table = None
+_worker_memory = None
+_worker_stop_flag = None
+
+
+def _init_worker(memory_name, stop_flag):
+    global _worker_table, _worker_memory, _worker_stop_flag
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_table = TranspositionTable(buffer=_worker_memory.buf)
+    _worker_stop_flag = stop_flag
+
+
+def _search_task(fen, history_keys, generation, worker, max_depth,
+                 time_limit, node_limit):
+    """
+    Runs one search in a worker process. The search of the worker 0 is the
+    main one, the others are helpers stopped when it finishes. Helpers
+    differ in the order of the root moves and odd helpers search one ply
+    deeper, so that they fill the shared table with different parts of the
+    tree.
+    """
+    board = Board.from_fen(fen)
+    root_moves = list(board.generate_legal_moves(board.side_to_move))
+    if root_moves and worker:
+        shift = worker % len(root_moves)
+        root_moves = root_moves[shift:] + root_moves[:shift]
+    search = Search(board, _worker_table, history_keys,
+                    stop_flag=_worker_stop_flag if worker else None)
+    # the search starts a new generation itself
+    _worker_table.generation = (generation - 1) & 0xFF
+    return search.search(min(max_depth + worker % 2, MAX_PLY - 1),
+                         time_limit, node_limit, root_moves)
+
+
+class ParallelSearch(object):
+    """
+    Pool of worker processes searching positions together.
+    """
+
+    def __init__(self, workers=None, hash_mb=16):
+        """
+        :param workers: number of worker processes, the number of CPUs if
+            not given
+        :param hash_mb: size of the shared transposition table in MB
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=buffer_size(hash_mb)
+        )
+        self.table = TranspositionTable(buffer=self._memory.buf)
+        self._stop_flag = multiprocessing.RawValue('b', 0)
+        self._pool = multiprocessing.Pool(
+            self.workers, initializer=_init_worker,
+            initargs=(self._memory.name, self._stop_flag)
+        )
+
+    def search(self, board, max_depth=MAX_PLY - 1, time_limit=None,
+               node_limit=None, history_keys=()):
+        """
+        Searches the position with all the workers.
+        :param board: position to search, which is not changed
+        :param max_depth: depth of the last iteration
+        :param time_limit: hard limit of the search time in seconds
+        :param node_limit: hard limit of the number of nodes searched by
+            all the workers together
+        :param history_keys: position keys of the game before the position
+        :return: result of the worker which got deepest, with the nodes of
+            all the workers
+        :rtype: search.SearchResult
+        """
+        start = time.perf_counter()
+        self.table.new_search()
+        fen = board.to_fen()
+        worker_nodes = node_limit // self.workers if node_limit else None
+        tasks = [
+            (fen, list(history_keys), self.table.generation, worker,
+             max_depth, time_limit, worker_nodes)
+            for worker in range(self.workers)
+        ]
+        self._stop_flag.value = 0
+        pending = [self._pool.apply_async(_search_task, task)
+                   for task in tasks]
+        main_result = pending[0].get()
+        self._stop_flag.value = 1
+        results = [main_result] + [result.get() for result in pending[1:]]
+        # results carry the depth of their last completed iteration, the
+        # main worker wins ties since it searched every root move in order
+        best = max(enumerate(results),
+                   key=lambda item: (item[1].depth, -item[0]))[1]
+        nodes = sum(result.nodes for result in results)
+        elapsed = time.perf_counter() - start
+        return best._replace(nodes=nodes, elapsed=elapsed,
+                             nps=int(nodes / elapsed) if elapsed else 0)
+
+    def close(self):
+        """
+        Stops the workers and frees the shared table.
+        """
+        self._pool.terminate()
+        self._pool.join()
+        self.table.release()
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,124 @@
+"""
+Counts the leaf nodes of the legal move tree to a fixed depth.
+Usage: python perft.py [--fen FEN] [--backend NAME] [--divide] DEPTH
+       python perft.py --suite [--backend NAME] [DEPTH]
+"""
+
+import argparse
+import time
+
+from board import BOARD_BACKENDS
+
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# Standard perft positions with node counts at depths 1, 2, 3...
+REFERENCE_POSITIONS = [
+    ('start', START_FEN, [20, 400, 8902, 197281]),
+    ('kiwipete',
+     'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     [48, 2039, 97862, 4085603]),
+    ('position 3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     [14, 191, 2812, 43238]),
+    ('position 4',
+     'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     [6, 264, 9467, 422333]),
+    ('position 5',
+     'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     [44, 1486, 62379, 2103487]),
+]
+
+
+def perft(board, depth):
+    """
+    Counts the leaf nodes of the legal move tree of the given depth.
+    :param board: position to start from, restored when finished
+    :param depth: number of plies to look ahead
+    :return: number of leaf nodes
+    """
+    moves = board.generate_legal_moves(board.side_to_move)
+    if depth <= 1:
+        return sum(1 for _ in moves) if depth == 1 else 1
+    nodes = 0
+    for move in list(moves):
+        board.make_move(move)
+        nodes += perft(board, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Counts the leaf nodes separately for every root move.
+    :return: list of tuples of the root move and its number of leaf nodes
+    """
+    result = []
+    for move in list(board.generate_legal_moves(board.side_to_move)):
+        board.make_move(move)
+        result.append((move, perft(board, depth - 1)))
+        board.unmake_move()
+    return result
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _report(nodes, elapsed):
+    print('nodes %i  time %.3f s  nps %.0f' %
+          (nodes, elapsed, nodes / elapsed if elapsed else 0))
+
+
+def run_suite(depth, backend):
+    """
+    Runs perft on every reference position up to the depth (or the deepest
+    known count) and compares the results with the expected counts.
+    :return: whether all counts matched
+    """
+    passed = True
+    total_nodes, total_time = 0, 0
+    for name, fen, counts in REFERENCE_POSITIONS:
+        position_depth = min(depth, len(counts))
+        board = BOARD_BACKENDS[backend].from_fen(fen)
+        nodes, elapsed = _timed(perft, board, position_depth)
+        expected = counts[position_depth - 1]
+        status = 'ok' if nodes == expected else 'FAIL (%i)' % expected
+        passed = passed and nodes == expected
+        total_nodes += nodes
+        total_time += elapsed
+        print('%-12s depth %i  %10i  %s' % (name, position_depth, nodes,
+                                             status))
+    _report(total_nodes, total_time)
+    return passed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('depth', type=int, nargs='?', default=3)
+    parser.add_argument('--fen', default=START_FEN)
+    parser.add_argument('--backend', default='list',
+                        choices=sorted(BOARD_BACKENDS))
+    parser.add_argument('--divide', action='store_true',
+                        help='print the node count of every root move')
+    parser.add_argument('--suite', action='store_true',
+                        help='run the reference positions')
+    args = parser.parse_args(argv)
+    if args.suite:
+        return 0 if run_suite(args.depth, args.backend) else 1
+    board = BOARD_BACKENDS[args.backend].from_fen(args.fen)
+    if args.divide:
+        result, elapsed = _timed(divide, board, args.depth)
+        for move, nodes in sorted(result, key=lambda item: str(item[0])):
+            print('%s: %i' % (move, nodes))
+        nodes = sum(nodes for _, nodes in result)
+        print('moves %i' % len(result))
+    else:
+        nodes, elapsed = _timed(perft, board, args.depth)
+    _report(nodes, elapsed)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,329 @@
+"""
+Streaming reader of games in Portable Game Notation and bulk replayer.
+Usage: python pgn.py [--workers N] [--backend NAME] [--skip-illegal] FILE
+"""
+
+import argparse
+import codecs
+import multiprocessing
+import os
+import re
+import time
+from collections import namedtuple
+
+from board import BoardManager, BOARD_BACKENDS
+from exceptions import IllegalMoveError, InvalidFenError
+from locals import *
+from moves import FILE_NAMES
+
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+CHUNK_SIZE = 1 << 16
+
+_HEADER_RE = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# comment and variation delimiters, NAGs, move numbers and other tokens
+_TOKEN_RE = re.compile(r'[{}();]|\$\d+|\d+\.+|[^\s{}();]+')
+_SAN_RE = re.compile(
+    r'^([NBRQK])?([a-h])?([1-8])?x?([a-h])([1-8])(?:=?([NBRQ]))?$'
+)
+_CASTLING_SAN = {'O-O': 6, '0-0': 6, 'O-O-O': 2, '0-0-0': 2}
+
+PgnGame = namedtuple('PgnGame', 'headers moves result')
+
+ReplayedGame = namedtuple('ReplayedGame', 'game plies error')
+
+
+class ReplayStats(namedtuple('ReplayStats', 'games plies illegal elapsed')):
+    """
+    Summary of replayed games.
+    :type games: int
+    :type plies: int
+    :type illegal: int
+    :type elapsed: float
+    """
+
+    __slots__ = ()
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+
+def _read_lines(handle, chunk_size):
+    """
+    Reads the lines of the handle in chunks of the given size.
+    """
+    rest = ''
+    while True:
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            break
+        lines = (rest + chunk).split('\n')
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
+
+
+def read_games(handle, chunk_size=CHUNK_SIZE):
+    """
+    Lazily reads games from the PGN text, one at a time. Comments,
+    variations, NAGs and move numbers are dropped.
+    :param handle: object with a ``read(size)`` method returning text
+    :param chunk_size: number of characters read at once
+    :rtype: collections.Iterable[PgnGame]
+    """
+    headers, moves = {}, []
+    in_comment, depth = False, 0
+    for line in _read_lines(handle, chunk_size):
+        stripped = line.strip()
+        if not in_comment and stripped.startswith('['):
+            if moves:
+                # a game without a result ended
+                yield PgnGame(headers, moves, headers.get('Result', '*'))
+                headers, moves, depth = {}, [], 0
+            match = _HEADER_RE.match(stripped)
+            if match:
+                headers[match.group(1)] = re.sub(r'\\(.)', r'\1',
+                                                 match.group(2))
+            continue
+        if stripped.startswith('%'):
+            continue
+        for token in _TOKEN_RE.findall(line):
+            if in_comment:
+                in_comment = token != '}'
+            elif token == '{':
+                in_comment = True
+            elif token == ';':
+                break
+            elif token == '(':
+                depth += 1
+            elif token == ')':
+                depth = max(depth - 1, 0)
+            elif depth or token[0] == '$' or token[-1] == '.':
+                continue
+            elif token in RESULTS:
+                yield PgnGame(headers, moves, token)
+                headers, moves = {}, []
+            else:
+                moves.append(token)
+    if moves or headers:
+        yield PgnGame(headers, moves, headers.get('Result', '*'))
+
+
+def parse_san(board, san):
+    """
+    Finds the legal move of the side to move written in Standard Algebraic
+    Notation.
+    :param board: position the move is played in
+    :type board: board.Board
+    :param san: move such as e4, Nbd7, exd8=Q+ or O-O
+    :rtype: moves.Move
+    :raises IllegalMoveError: there is no such legal move or it is ambiguous
+    """
+    text = san.rstrip('+#!?')
+    color = board.side_to_move
+    fields = board.fields
+    if text in _CASTLING_SAN:
+        king = board.get_king(color)
+        to_x = _CASTLING_SAN[text]
+        candidates = [
+            move for move in board.generate_legal_moves(color)
+            if (move.from_x, move.from_y) == (king.x, king.y) and
+            move.to_x == to_x and abs(move.from_x - to_x) == 2
+        ]
+    else:
+        match = _SAN_RE.match(text)
+        if match is None:
+            raise IllegalMoveError("Invalid move %s" % san)
+        piece_type, from_file, from_rank, to_file, to_rank, promotion = \
+            match.groups()
+        piece_type = piece_type or PAWN
+        to_x, to_y = FILE_NAMES.index(to_file), int(to_rank) - 1
+        from_x = FILE_NAMES.index(from_file) if from_file else None
+        from_y = int(from_rank) - 1 if from_rank else None
+        candidates = [
+            move for move in board.generate_legal_moves(color)
+            if move.to_x == to_x and move.to_y == to_y and
+            move.promotion == promotion and
+            fields[move.from_y][move.from_x].type == piece_type and
+            from_x in (None, move.from_x) and from_y in (None, move.from_y)
+        ]
+    if len(candidates) != 1:
+        raise IllegalMoveError(
+            "%s move %s" % ('Ambiguous' if candidates else 'Illegal', san)
+        )
+    return candidates[0]
+
+
+def replay_game(game, backend='list'):
+    """
+    Replays the game through ``BoardManager.move_piece``, starting from the
+    position of its FEN header if it has one.
+    :type game: PgnGame
+    :param backend: name of the board implementation
+    :return: generator of the board after every move, changed in place
+    :raises IllegalMoveError: one of the moves can't be played
+    """
+    manager = BoardManager(backend, game.headers.get('FEN'))
+    for san in game.moves:
+        move = parse_san(manager.board, san)
+        manager.move_piece(move.from_x, move.from_y, move.to_x, move.to_y,
+                           move.promotion or QUEEN)
+        yield manager.board
+
+
+def replay_games(games, backend='list', skip_illegal=False):
+    """
+    Replays every game to its end or to its first illegal move.
+    :param games: games to replay
+    :param backend: name of the board implementation
+    :param skip_illegal: whether to go on with the next game after an
+        illegal move instead of raising
+    :rtype: collections.Iterable[ReplayedGame]
+    :raises IllegalMoveError: a move can't be played and skip_illegal is
+        false
+    """
+    for number, game in enumerate(games, 1):
+        plies, error = 0, None
+        try:
+            for _ in replay_game(game, backend):
+                plies += 1
+        except (IllegalMoveError, InvalidFenError) as exc:
+            error = '%s at ply %i of game %i' % (
+                getattr(exc, 'message', 'Invalid FEN'), plies + 1, number
+            )
+            if not skip_illegal:
+                raise IllegalMoveError(error)
+        yield ReplayedGame(game, plies, error)
+
+
+def replay_stream(handle, backend='list', skip_illegal=False,
+                  chunk_size=CHUNK_SIZE):
+    """
+    Reads and replays all games of the PGN text.
+    :param handle: object with a ``read(size)`` method returning text
+    :rtype: ReplayStats
+    """
+    start = time.perf_counter()
+    games, plies, illegal = 0, 0, 0
+    for replayed in replay_games(read_games(handle, chunk_size), backend,
+                                 skip_illegal):
+        games += 1
+        plies += replayed.plies
+        illegal += replayed.error is not None
+    return ReplayStats(games, plies, illegal, time.perf_counter() - start)
+
+
+class _FileRange(object):
+    """
+    Text reader of a byte range of a binary file.
+    """
+
+    def __init__(self, handle, start, end):
+        handle.seek(start)
+        self._handle = handle
+        self._left = end - start
+        self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    def read(self, size):
+        data = self._handle.read(min(size, self._left))
+        self._left -= len(data)
+        return self._decoder.decode(data, final=not data)
+
+
+def split_file(path, parts):
+    """
+    Splits the PGN file into byte ranges which start at game boundaries,
+    that is at a header line following an empty line.
+    :param path: path of the file
+    :param parts: number of ranges wanted, fewer are returned for files
+        with fewer games
+    :return: list of (start, end) offsets
+    """
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, 'rb') as handle:
+        for part in range(1, parts):
+            handle.seek(max(size * part // parts, offsets[-1]))
+            # skip the rest of the line the offset falls into
+            handle.readline()
+            after_blank = False
+            while True:
+                offset = handle.tell()
+                line = handle.readline()
+                if not line:
+                    offset = size
+                    break
+                if line.startswith(b'[') and after_blank:
+                    break
+                after_blank = not line.strip()
+            offsets.append(offset)
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:])
+            if end > start]
+
+
+def _replay_range(path, start, end, backend, skip_illegal, chunk_size):
+    with open(path, 'rb') as handle:
+        try:
+            return replay_stream(_FileRange(handle, start, end), backend,
+                                 skip_illegal, chunk_size)
+        except IllegalMoveError as exc:
+            raise IllegalMoveError('%s from byte %i' % (exc.message, start))
+
+
+def replay_file(path, backend='list', skip_illegal=False, workers=1,
+                chunk_size=CHUNK_SIZE):
+    """
+    Replays all games of the PGN file, in a pool of worker processes if
+    more than one worker is asked for. Each worker replays whole byte
+    ranges of the file split at game boundaries.
+    :param path: path of the file
+    :param workers: number of worker processes
+    :rtype: ReplayStats
+    :raises IllegalMoveError: a move can't be played and skip_illegal is
+        false
+    """
+    if workers <= 1:
+        with open(path, encoding='utf-8', errors='replace') as handle:
+            return replay_stream(handle, backend, skip_illegal, chunk_size)
+    start = time.perf_counter()
+    # more ranges than workers, so that the work is balanced
+    tasks = [(path, range_start, range_end, backend, skip_illegal,
+              chunk_size)
+             for range_start, range_end in split_file(path, workers * 4)]
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.starmap(_replay_range, tasks)
+    return ReplayStats(sum(result.games for result in results),
+                       sum(result.plies for result in results),
+                       sum(result.illegal for result in results),
+                       time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('file')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes')
+    parser.add_argument('--backend', default='list',
+                        choices=sorted(BOARD_BACKENDS))
+    parser.add_argument('--skip-illegal', action='store_true',
+                        help='go on with the next game after an illegal '
+                             'move instead of stopping')
+    args = parser.parse_args(argv)
+    try:
+        stats = replay_file(args.file, args.backend, args.skip_illegal,
+                            args.workers)
+    except IllegalMoveError as exc:
+        print(exc.message)
+        return 1
+    print('games %i  plies %i  illegal %i  time %.2f s  games/s %.1f' % (
+        stats.games, stats.plies, stats.illegal, stats.elapsed,
+        stats.games_per_second
+    ))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,8 +1,12 @@
-import itertools
-import math
-
+from bitboard import square
 from exceptions import InvalidFieldError, IllegalMoveError
 from locals import *
+from moves import Move, PROMOTION_TYPES
+from tables import (
+    KNIGHT_ATTACKS, KING_ATTACKS, ROOK_RAYS, BISHOP_RAYS, QUEEN_RAYS,
+    BETWEEN_FIELDS, KNIGHT_FIELDS, KING_FIELDS, RAY_FIELDS,
+    ROOK_DIRECTIONS, BISHOP_DIRECTIONS, QUEEN_DIRECTIONS
+)
 
 
 class Piece(object):
@@ -14,6 +18,8 @@ class Piece(object):
     :type type: str
     """
 
+    __slots__ = ('board', 'x', 'y', 'color', 'type')
+
     def __init__(self, board, x, y, color, piece_type):
         """
         :param board: board the piece is placed on
@@ -62,6 +68,30 @@ class Piece(object):
         """
         return self.can_reach(x, y)
 
+    def generate_moves(self, captures):
+        """
+        Yields pseudo-legal moves of the piece, which follow its movement
+        pattern but may leave its own king in check.
+        :param captures: True to generate captures and promotions only,
+            False to generate remaining (quiet) moves only
+        """
+        raise NotImplementedError
+
+    def _step_moves(self, targets, captures):
+        """
+        Generates moves of a piece jumping straight to its target fields.
+        :param targets: table of target fields for each square
+        :param captures: whether to generate captures or quiet moves
+        """
+        fields = self.board.fields
+        for to_x, to_y in targets[square(self.x, self.y)]:
+            target = fields[to_y][to_x]
+            if target is None:
+                if not captures:
+                    yield Move(self.x, self.y, to_x, to_y)
+            elif captures and target.color != self.color:
+                yield Move(self.x, self.y, to_x, to_y)
+
     def move_piece(self, to_x, to_y):
         """
         Basic piece movement algorithm, picks the piece from the board and
@@ -99,6 +129,8 @@ class Piece(object):
 
 class King(Piece):
 
+    __slots__ = ()
+
     def __init__(self, board, x, y, color):
         super().__init__(board, x, y, color, KING)
 
@@ -130,9 +162,39 @@ class King(Piece):
             rook = self.board.get_piece(7, y)
             assert isinstance(rook, Rook)
             return rook.can_reach(x - 1, y)
-        return (abs(self.x - x) <= 1 and
-                abs(self.y - y) <= 1 and
-                not self.board.is_field_attacked(self.opp_color, x, y))
+        return bool(
+            KING_ATTACKS[square(self.x, self.y)] >> square(x, y) & 1 and
+            not self.board.is_field_attacked(self.opp_color, x, y)
+        )
+
+    def generate_moves(self, captures):
+        yield from self._step_moves(KING_FIELDS, captures)
+        if not captures:
+            yield from self._castling_moves()
+
+    def _castling_moves(self):
+        """
+        Generates castling moves allowed by the castling rights with no
+        pieces standing between the king and the rook. Whether the king
+        passes through attacked fields is not checked.
+        """
+        board = self.board
+        y = self.y
+        if self.x != 4 or y != (0 if self.color == WHITE else 7):
+            return
+        if (board.long_castle_allowed[self.color] and
+                self._is_castling_rook(0) and
+                not board.any_piece_between(4, y, 0, y)):
+            yield Move(4, y, 2, y)
+        if (board.short_castle_allowed[self.color] and
+                self._is_castling_rook(7) and
+                not board.any_piece_between(4, y, 7, y)):
+            yield Move(4, y, 6, y)
+
+    def _is_castling_rook(self, x):
+        rook = self.board.fields[self.y][x]
+        return (rook is not None and rook.type == ROOK and
+                rook.color == self.color)
 
     def move_piece(self, to_x, to_y):
         target_field = self.board.get_piece(to_x, to_y)
@@ -165,6 +227,25 @@ class King(Piece):
 
 class LineMovingPiece(Piece):
 
+    __slots__ = ()
+
+    # indices of the directions in tables.DIRECTIONS the piece moves along
+    _directions = ()
+
+    def generate_moves(self, captures):
+        fields = self.board.fields
+        rays = RAY_FIELDS[square(self.x, self.y)]
+        for direction in self._directions:
+            for to_x, to_y in rays[direction]:
+                target = fields[to_y][to_x]
+                if target is None:
+                    if not captures:
+                        yield Move(self.x, self.y, to_x, to_y)
+                else:
+                    if captures and target.color != self.color:
+                        yield Move(self.x, self.y, to_x, to_y)
+                    break
+
     def find_obstacles(self, x, y):
         """
         Finds if any piece is blocking the way to the point (x, y) in a
@@ -173,24 +254,29 @@ class LineMovingPiece(Piece):
         :param y: destination y coordinate (exclusive)
         :return: whether the obstacle was find on the way
         """
-        dx = x - self.x
-        dy = y - self.y
-        if dx == 0 and dy == 0:
-            return False
-        dir_x = int(math.copysign(1, dx))
-        x_list = (range(self.x + dir_x, x, dir_x)
-                  if dx else itertools.repeat(x))
-        dir_y = int(math.copysign(1, dy))
-        y_list = (range(self.y + dir_y, y, dir_y)
-                  if dy else itertools.repeat(y))
-        for check_x, check_y in zip(x_list, y_list):
+        fields = BETWEEN_FIELDS[square(self.x, self.y)][square(x, y)]
+        for check_x, check_y in fields:
             if self.board.get_piece(check_x, check_y):
                 return True
         return False
 
+    def _can_slide(self, rays, x, y):
+        """
+        Checks if the target field lies on one of the piece's empty-board
+        rays and nothing stands in the way.
+        :param rays: table of the rays the piece moves along
+        """
+        if not rays[square(self.x, self.y)] >> square(x, y) & 1:
+            return False
+        return not self.find_obstacles(x, y)
+
 
 class Queen(LineMovingPiece):
 
+    __slots__ = ()
+
+    _directions = QUEEN_DIRECTIONS
+
     def __init__(self, board, x, y, color):
         super().__init__(board, x, y, color, QUEEN)
 
@@ -200,18 +286,13 @@ class Queen(LineMovingPiece):
         """
         if not super().can_reach(x, y):
             return False
-        dx = x - self.x
-        dy = y - self.y
-        if dx == 0 or dy == 0 or abs(dx) == abs(dy):
-            if self.find_obstacles(x, y):
-                return False
-        else:
-            return False
-        return True
+        return self._can_slide(QUEEN_RAYS, x, y)
 
 
 class Knight(Piece):
 
+    __slots__ = ()
+
     def __init__(self, board, x, y, color):
         super().__init__(board, x, y, color, KNIGHT)
 
@@ -220,14 +301,21 @@ class Knight(Piece):
         Check if the piece moved two forward and one to the side.
         One coordinate displacement must be 1 while the other must be 2
         """
-        return (
+        return bool(
             super().can_reach(x, y) and
-            {abs(self.x - x), abs(self.y - y)} == {1, 2}
+            KNIGHT_ATTACKS[square(self.x, self.y)] >> square(x, y) & 1
         )
 
+    def generate_moves(self, captures):
+        return self._step_moves(KNIGHT_FIELDS, captures)
+
 
 class Rook(LineMovingPiece):
 
+    __slots__ = ('_initial_x',)
+
+    _directions = ROOK_DIRECTIONS
+
     def __init__(self, board, x, y, color):
         super().__init__(board, x, y, color, ROOK)
         self._initial_x = x
@@ -239,14 +327,7 @@ class Rook(LineMovingPiece):
         """
         if not super().can_reach(x, y):
             return False
-        dx = x - self.x
-        dy = y - self.y
-        if dx == 0 or dy == 0:
-            if self.find_obstacles(x, y):
-                return False
-        else:
-            return False
-        return True
+        return self._can_slide(ROOK_RAYS, x, y)
 
     def move_piece(self, to_x, to_y):
         super().move_piece(to_x, to_y)
@@ -258,6 +339,10 @@ class Rook(LineMovingPiece):
 
 class Bishop(LineMovingPiece):
 
+    __slots__ = ()
+
+    _directions = BISHOP_DIRECTIONS
+
     def __init__(self, board, x, y, color):
         super().__init__(board, x, y, color, BISHOP)
 
@@ -268,18 +353,13 @@ class Bishop(LineMovingPiece):
         """
         if not super().can_reach(x, y):
             return False
-        dx = x - self.x
-        dy = y - self.y
-        if abs(dx) == abs(dy):
-            if self.find_obstacles(x, y):
-                return False
-        else:
-            return False
-        return True
+        return self._can_slide(BISHOP_RAYS, x, y)
 
 
 class Pawn(Piece):
 
+    __slots__ = ('_starting_rank', '_forward')
+
     def __init__(self, board, x, y, color):
         super().__init__(board, x, y, color, PAWN)
         self._starting_rank = 1 if self.color == WHITE else 6
@@ -317,9 +397,54 @@ class Pawn(Piece):
         else:
             return False
 
+    def generate_moves(self, captures):
+        fields = self.board.fields
+        x, y = self.x, self.y
+        to_y = y + self._forward
+        promotes = to_y == 0 or to_y == 7
+        if captures:
+            en_passant = self.board.en_passant
+            for to_x in (x - 1, x + 1):
+                if not 0 <= to_x < 8:
+                    continue
+                target = fields[to_y][to_x]
+                if target is not None:
+                    if target.color != self.color:
+                        yield from self._pawn_moves(to_x, to_y, promotes)
+                elif (en_passant is not None and
+                        en_passant.color != self.color and
+                        en_passant.x == to_x and en_passant.y == to_y):
+                    yield Move(x, y, to_x, to_y)
+            if promotes and fields[to_y][x] is None:
+                yield from self._pawn_moves(x, to_y, promotes)
+        elif not promotes and fields[to_y][x] is None:
+            yield Move(x, y, x, to_y)
+            if (y == self._starting_rank and
+                    fields[to_y + self._forward][x] is None):
+                yield Move(x, y, x, to_y + self._forward)
+
+    def _pawn_moves(self, to_x, to_y, promotes):
+        if promotes:
+            for piece_type in PROMOTION_TYPES:
+                yield Move(self.x, self.y, to_x, to_y, piece_type)
+        else:
+            yield Move(self.x, self.y, to_x, to_y)
+
 
 class PhantomPawn(Piece):
 
+    __slots__ = ('linked_pawn',)
+
     def __init__(self, board, x, y, color, pawn):
         super().__init__(board, x, y, color, None)
         self.linked_pawn = pawn
+
+
+PIECE_CLASSES = {
+    KING: King,
+    QUEEN: Queen,
+    ROOK: Rook,
+    BISHOP: Bishop,
+    KNIGHT: Knight,
+    PAWN: Pawn
+}
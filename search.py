@@ -0,0 +1,385 @@
+"""
+Alpha-beta search engine with iterative deepening.
+Usage: python search.py [--fen FEN] [--depth N] [--time SECONDS]
+                        [--nodes N] [--hash MB] [--workers N]
+"""
+
+import argparse
+import time
+from collections import namedtuple
+
+from evaluation import PIECE_VALUES, evaluate
+from locals import *
+from transposition import (
+    TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+)
+
+
+MATE_SCORE = 30000
+INFINITY = 32000
+MAX_PLY = 128
+# score above which a mate is found, whatever the distance
+MATE_BOUND = MATE_SCORE - MAX_PLY
+
+SearchInfo = namedtuple(
+    'SearchInfo', 'depth score nodes elapsed nps pv'
+)
+
+SearchResult = namedtuple(
+    'SearchResult', 'best_move score depth nodes elapsed nps pv'
+)
+
+# how often the clock is read, in nodes
+_CLOCK_INTERVAL = 512
+
+
+class SearchAborted(Exception):
+    """
+    Raised inside the search when the time or node budget runs out.
+    """
+
+
+def _to_table_score(score, ply):
+    # mate scores are stored relative to the position, not to the root
+    if score > MATE_BOUND:
+        return score + ply
+    if score < -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def _from_table_score(score, ply):
+    if score > MATE_BOUND:
+        return score - ply
+    if score < -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class Search(object):
+    """
+    Negamax alpha-beta search of the position on the board, with iterative
+    deepening, quiescence search of captures, a transposition table and
+    move ordering by the table move, MVV-LVA, killer moves and history.
+    The board is searched in place with make_move/unmake_move and is left
+    in its original position.
+    """
+
+    def __init__(self, board, table=None, history_keys=(), info=None,
+                 stop_flag=None):
+        """
+        :param board: position to search
+        :type board: board.Board
+        :param table: transposition table shared between searches
+        :type table: TranspositionTable
+        :param history_keys: position keys of the game before the searched
+            position, used to score repetitions as draws
+        :param info: function called with a SearchInfo after every
+            completed iteration
+        :param stop_flag: object whose ``value`` becomes true when the
+            search should stop, e.g. a shared ``multiprocessing.Value``;
+            it is polled along with the clock
+        """
+        self.board = board
+        self.table = table if table is not None else TranspositionTable()
+        self.history_keys = list(history_keys)
+        self.info = info
+        self.nodes = 0
+        self._deadline = None
+        self._node_limit = None
+        self._killers = [[None, None] for _ in range(MAX_PLY)]
+        self._history = {}
+        self._pv = [[] for _ in range(MAX_PLY + 1)]
+        self._path_keys = []
+        self._root_best = None
+        self.stop_flag = stop_flag
+        self.stopped = False
+
+    def stop(self):
+        """
+        Asks the running search to return as soon as possible. If no search
+        is running yet, the next one returns at once, so that a stop asked
+        for by another thread is not lost.
+        """
+        self.stopped = True
+
+    def search(self, max_depth=MAX_PLY - 1, time_limit=None,
+               node_limit=None, root_moves=None):
+        """
+        Searches the position deeper and deeper until the depth or the
+        budget is exhausted.
+        :param max_depth: depth of the last iteration
+        :param time_limit: hard limit of the search time in seconds
+        :param node_limit: hard limit of the number of nodes searched
+        :param root_moves: moves to consider at the root, all legal moves
+            if not given
+        :return: best move found in the deepest (possibly partial)
+            iteration, with the depth of the last completed iteration
+        :rtype: SearchResult
+        """
+        try:
+            return self._iterate(max_depth, time_limit, node_limit,
+                                 root_moves)
+        finally:
+            self.stopped = False
+
+    def _iterate(self, max_depth, time_limit, node_limit, root_moves):
+        board = self.board
+        start = time.perf_counter()
+        self.nodes = 0
+        self._deadline = start + time_limit if time_limit else None
+        self._node_limit = node_limit
+        self._path_keys = self.history_keys + [board.hash_key]
+        self.table.new_search()
+        if root_moves is None:
+            root_moves = list(board.generate_legal_moves(board.side_to_move))
+        else:
+            root_moves = list(root_moves)
+        result = SearchResult(root_moves[0] if root_moves else None,
+                              0, 0, 0, 0, 0, [])
+        if not root_moves:
+            score = -MATE_SCORE if self._in_check() else 0
+            return result._replace(score=score)
+        root_stack = len(board.undo_stack)
+        for depth in range(1, max_depth + 1):
+            self._root_best = None
+            try:
+                score = self._search_root(root_moves, depth)
+            except SearchAborted:
+                while len(board.undo_stack) > root_stack:
+                    board.unmake_move()
+                self._path_keys = self.history_keys + [board.hash_key]
+                if self._root_best is not None:
+                    move, score, pv = self._root_best
+                    # the iteration did not finish, so it does not count
+                    # as searched to its depth
+                    result = self._result(move, score, depth - 1, pv,
+                                          start)
+                break
+            result = self._result(root_moves[0], score, depth,
+                                  self._pv[0], start)
+            if self.info is not None:
+                self.info(SearchInfo(depth, score, result.nodes,
+                                     result.elapsed, result.nps, result.pv))
+            if abs(score) > MATE_BOUND and depth > MATE_SCORE - abs(score):
+                break
+        return result
+
+    def _result(self, move, score, depth, pv, start):
+        elapsed = time.perf_counter() - start
+        nps = int(self.nodes / elapsed) if elapsed else 0
+        return SearchResult(move, score, depth, self.nodes, elapsed, nps,
+                            list(pv))
+
+    def _search_root(self, root_moves, depth):
+        """
+        Searches every root move, moving the best one to the front so that
+        it is searched first in the next iteration.
+        """
+        board = self.board
+        alpha, beta = -INFINITY, INFINITY
+        entry = self.table.probe(board.hash_key)
+        if entry is not None and entry.move in root_moves:
+            root_moves.remove(entry.move)
+            root_moves.insert(0, entry.move)
+        for i, move in enumerate(root_moves):
+            board.make_move(move)
+            self._path_keys.append(board.hash_key)
+            if i == 0:
+                score = -self._negamax(depth - 1, -beta, -alpha, 1)
+            else:
+                # null window first, the first move is usually the best
+                score = -self._negamax(depth - 1, -alpha - 1, -alpha, 1)
+                if score > alpha:
+                    score = -self._negamax(depth - 1, -beta, -alpha, 1)
+            self._path_keys.pop()
+            board.unmake_move()
+            if score > alpha:
+                alpha = score
+                self._pv[0] = [move] + self._pv[1]
+                root_moves.insert(0, root_moves.pop(i))
+                self._root_best = (move, score, self._pv[0])
+        self.table.store(board.hash_key, root_moves[0], depth,
+                         BOUND_EXACT, alpha)
+        return alpha
+
+    def _check_budget(self):
+        if self.stopped:
+            raise SearchAborted
+        if self._node_limit is not None and self.nodes >= self._node_limit:
+            raise SearchAborted
+        if self.nodes % _CLOCK_INTERVAL == 0:
+            if self.stop_flag is not None and self.stop_flag.value:
+                raise SearchAborted
+            if (self._deadline is not None and
+                    time.perf_counter() >= self._deadline):
+                raise SearchAborted
+
+    def _in_check(self):
+        return self.board.is_king_in_check(self.board.side_to_move)
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        self._check_budget()
+        board = self.board
+        key = board.hash_key
+        self._pv[ply] = []
+        # the key of this position is the last one on the path, so an
+        # earlier first occurrence is a repetition on the board or in the
+        # game, found without copying the path
+        if self._path_keys.index(key) < len(self._path_keys) - 1:
+            return 0
+        if ply >= MAX_PLY - 1:
+            return evaluate(board)
+        entry = self.table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move = entry.move
+            if entry.depth >= depth:
+                score = _from_table_score(entry.score, ply)
+                if (entry.bound == BOUND_EXACT or
+                        entry.bound == BOUND_LOWER and score >= beta or
+                        entry.bound == BOUND_UPPER and score <= alpha):
+                    return score
+        if depth <= 0:
+            return self._quiescence(alpha, beta, ply)
+        color = board.side_to_move
+        moves = list(board.generate_legal_moves(color))
+        if not moves:
+            return -MATE_SCORE + ply if self._in_check() else 0
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, None
+        for move in self._order_moves(moves, table_move, ply):
+            capture = board.fields[move.to_y][move.to_x] is not None
+            board.make_move(move)
+            self._path_keys.append(board.hash_key)
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            self._path_keys.pop()
+            board.unmake_move()
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if alpha >= beta:
+                        if not capture and move.promotion is None:
+                            self._store_killer(move, ply)
+                            self._history[move] = (
+                                self._history.get(move, 0) + depth * depth
+                            )
+                        break
+        if best_score <= original_alpha:
+            bound = BOUND_UPPER
+        elif best_score >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.table.store(key, best_move, depth, bound,
+                         _to_table_score(best_score, ply))
+        return best_score
+
+    def _quiescence(self, alpha, beta, ply):
+        """
+        Searches captures only, until the position is quiet, so that the
+        static evaluation is not taken in the middle of an exchange.
+        """
+        self.nodes += 1
+        self._check_budget()
+        board = self.board
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or ply >= MAX_PLY - 1:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        moves = list(board.generate_legal_moves(board.side_to_move,
+                                                quiet=False))
+        for move in self._order_moves(moves, None, ply):
+            board.make_move(move)
+            score = -self._quiescence(-beta, -alpha, ply + 1)
+            board.unmake_move()
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+    def _order_moves(self, moves, table_move, ply):
+        """
+        Sorts the moves: table move, captures by the most valuable victim
+        and the least valuable attacker, killer moves and then the quiet
+        moves by their history score.
+        """
+        fields = self.board.fields
+        killers = self._killers[ply]
+        history = self._history
+
+        def priority(move):
+            if move == table_move:
+                return 1 << 30
+            victim = fields[move.to_y][move.to_x]
+            attacker = fields[move.from_y][move.from_x]
+            if victim is not None or move.promotion is not None:
+                gain = PIECE_VALUES[victim.type] if victim else 0
+                if move.promotion is not None:
+                    gain += PIECE_VALUES[move.promotion]
+                return (1 << 24) + gain * 16 - PIECE_VALUES[attacker.type] // 8
+            if attacker.type == PAWN and move.from_x != move.to_x:
+                # en passant
+                return (1 << 24) + PIECE_VALUES[PAWN] * 16
+            if move == killers[0]:
+                return 1 << 22
+            if move == killers[1]:
+                return (1 << 22) - 1
+            return history.get(move, 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def _store_killer(self, move, ply):
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+
+def format_info(info):
+    """
+    Formats a search report as one line.
+    :type info: SearchInfo or SearchResult
+    """
+    return 'depth %i score %i nodes %i time %.2f nps %i pv %s' % (
+        info.depth, info.score, info.nodes, info.elapsed, info.nps,
+        ' '.join(str(move) for move in info.pv)
+    )
+
+
+def main(argv=None):
+    from board import Board
+    from perft import START_FEN
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fen', default=START_FEN)
+    parser.add_argument('--depth', type=int, default=MAX_PLY - 1)
+    parser.add_argument('--time', type=float, default=5.0,
+                        help='time budget in seconds')
+    parser.add_argument('--nodes', type=int, help='node budget')
+    parser.add_argument('--hash', type=int, default=16,
+                        help='transposition table size in MB')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes')
+    args = parser.parse_args(argv)
+    board = Board.from_fen(args.fen)
+    if args.workers > 1:
+        from parallel import ParallelSearch
+
+        with ParallelSearch(args.workers, args.hash) as search:
+            result = search.search(board, args.depth, args.time, args.nodes)
+        print(format_info(result))
+    else:
+        search = Search(board, TranspositionTable(args.hash),
+                        info=lambda info: print(format_info(info)))
+        result = search.search(args.depth, args.time, args.nodes)
+    print('bestmove %s' % (result.best_move,))
+
+
+if __name__ == '__main__':
+    main()
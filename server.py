@@ -0,0 +1,268 @@
+"""
+Asyncio server hosting many games at once over a line protocol.
+Usage: python server.py [--host HOST] [--port PORT] [--idle SECONDS]
+                        [--max-games N] [--backend NAME]
+
+Every request is one line of words, answered in order by one line
+starting with OK or ERR:
+    NEW game [fen]    start a game, from the position if given
+    MOVE game move    play a move in coordinate notation, e.g. e7e8q
+    MOVES game        list the legal moves
+    FEN game          describe the position
+    SUB game          receive the moves of the game
+    UNSUB game        stop receiving the moves
+    QUIT              close the connection
+Subscribers receive an "UPDATE game move fen" line after every move and
+an "EXPIRED game" line when the game is removed for being idle.
+"""
+
+import argparse
+import asyncio
+import time
+
+from board import BoardManager, BOARD_BACKENDS
+from exceptions import (
+    InvalidFenError, IllegalMoveError, InvalidFieldError, NoPieceError,
+    InvalidPieceError
+)
+from locals import *
+from moves import parse_move
+
+
+# bytes waiting to be sent to a subscriber after which it is dropped
+MAX_SUBSCRIBER_BUFFER = 1 << 20
+# longest request line accepted, in bytes
+MAX_LINE_LENGTH = 4096
+
+
+class ProtocolError(Exception):
+    """
+    Raised when a request can't be carried out, answered with ERR.
+    """
+
+
+class _Game(object):
+
+    __slots__ = ('manager', 'subscribers', 'last_active')
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.subscribers = set()
+        self.last_active = time.monotonic()
+
+
+class GameServer(object):
+    """
+    Keeps a BoardManager for every game id and serves requests of any
+    number of connections. Games idle for longer than the timeout are
+    removed, so the memory used is bounded by the number of active games.
+    """
+
+    def __init__(self, backend='list', idle_timeout=300.0, max_games=100000):
+        """
+        :param backend: name of the board implementation of the games
+        :param idle_timeout: seconds after the last request of a game when
+            it is removed
+        :param max_games: number of games hosted at once, new games are
+            refused above it
+        """
+        self.backend = backend
+        self.idle_timeout = idle_timeout
+        self.max_games = max_games
+        self.games = {}
+        self._server = None
+        self._sweeper = None
+        self._commands = {
+            'NEW': self._new,
+            'MOVE': self._move,
+            'MOVES': self._moves,
+            'FEN': self._fen,
+            'SUB': self._subscribe,
+            'UNSUB': self._unsubscribe,
+        }
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Starts listening for connections.
+        :param port: port to listen on, any free port if 0
+        :return: the port listened on
+        """
+        self._server = await asyncio.start_server(
+            self._handle_client, host, port, limit=MAX_LINE_LENGTH
+        )
+        self._sweeper = asyncio.ensure_future(self._expire_games())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening and removes all games.
+        """
+        self._sweeper.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+        self.games.clear()
+
+    def execute(self, words, writer=None, subscriptions=None):
+        """
+        Carries out one request.
+        :param words: words of the request line
+        :param writer: stream of the connection, needed to subscribe
+        :param subscriptions: set of the game ids the connection subscribed
+        :return: reply line without the line end
+        """
+        command = words[0].upper()
+        if command not in self._commands or len(words) < 2:
+            return 'ERR Unknown request %s' % ' '.join(words)
+        try:
+            return 'OK ' + self._commands[command](
+                words[1], words[2:], writer, subscriptions
+            )
+        except ProtocolError as exc:
+            return 'ERR %s' % exc
+
+    def expire_idle(self, now=None):
+        """
+        Removes the games idle for longer than the timeout and tells their
+        subscribers.
+        :param now: current ``time.monotonic()``
+        :return: number of games removed
+        """
+        if now is None:
+            now = time.monotonic()
+        expired = [game_id for game_id, game in self.games.items()
+                   if now - game.last_active > self.idle_timeout]
+        for game_id in expired:
+            self._publish(self.games.pop(game_id), 'EXPIRED %s' % game_id)
+        return len(expired)
+
+    async def _expire_games(self):
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            self.expire_idle()
+
+    async def _handle_client(self, reader, writer):
+        subscriptions = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # the line doesn't fit in the buffer of the stream
+                    writer.write(b'ERR Line too long\n')
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                words = line.decode('utf-8', 'replace').split()
+                if not words:
+                    continue
+                if words[0].upper() == 'QUIT':
+                    break
+                reply = self.execute(words, writer, subscriptions)
+                writer.write(reply.encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in subscriptions:
+                game = self.games.get(game_id)
+                if game is not None:
+                    game.subscribers.discard(writer)
+            writer.close()
+
+    def _game(self, game_id):
+        game = self.games.get(game_id)
+        if game is None:
+            raise ProtocolError('No game %s' % game_id)
+        game.last_active = time.monotonic()
+        return game
+
+    @staticmethod
+    def _publish(game, line):
+        data = line.encode() + b'\n'
+        for writer in list(game.subscribers):
+            # subscribers which don't read their updates are dropped
+            if (writer.is_closing() or
+                    writer.transport.get_write_buffer_size() >
+                    MAX_SUBSCRIBER_BUFFER):
+                game.subscribers.discard(writer)
+            else:
+                writer.write(data)
+
+    def _new(self, game_id, args, writer, subscriptions):
+        if game_id in self.games:
+            raise ProtocolError('Game %s exists' % game_id)
+        if len(self.games) >= self.max_games:
+            raise ProtocolError('Too many games')
+        try:
+            manager = BoardManager(self.backend, ' '.join(args) or None)
+        except InvalidFenError:
+            raise ProtocolError('Invalid FEN %s' % ' '.join(args))
+        self.games[game_id] = _Game(manager)
+        return manager.board.to_fen()
+
+    def _move(self, game_id, args, writer, subscriptions):
+        game = self._game(game_id)
+        if len(args) != 1:
+            raise ProtocolError('Expected one move')
+        try:
+            move = parse_move(args[0])
+            move = game.manager.move_piece(move.from_x, move.from_y,
+                                           move.to_x, move.to_y,
+                                           move.promotion or QUEEN)
+        except (IllegalMoveError, InvalidFieldError, NoPieceError,
+                InvalidPieceError) as exc:
+            raise ProtocolError('Illegal move %s: %s' % (args[0], exc))
+        fen = game.manager.board.to_fen()
+        self._publish(game, 'UPDATE %s %s %s' % (game_id, move, fen))
+        return '%s %s' % (move, fen)
+
+    def _moves(self, game_id, args, writer, subscriptions):
+        manager = self._game(game_id).manager
+        return ' '.join(str(move) for move in manager.generate_legal_moves())
+
+    def _fen(self, game_id, args, writer, subscriptions):
+        return self._game(game_id).manager.board.to_fen()
+
+    def _subscribe(self, game_id, args, writer, subscriptions):
+        game = self._game(game_id)
+        if writer is None:
+            raise ProtocolError('Not a connection')
+        game.subscribers.add(writer)
+        subscriptions.add(game_id)
+        return game.manager.board.to_fen()
+
+    def _unsubscribe(self, game_id, args, writer, subscriptions):
+        self._game(game_id).subscribers.discard(writer)
+        subscriptions.discard(game_id)
+        return game_id
+
+
+async def _serve(args):
+    server = GameServer(args.backend, args.idle, args.max_games)
+    port = await server.start(args.host, args.port)
+    print('listening on %s:%i' % (args.host, port))
+    await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7000)
+    parser.add_argument('--idle', type=float, default=300.0,
+                        help='seconds after which idle games are removed')
+    parser.add_argument('--max-games', type=int, default=100000)
+    parser.add_argument('--backend', default='list',
+                        choices=sorted(BOARD_BACKENDS))
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Images of the pieces, cut out of the sprite sheet once and scaled to the
+size of the fields on demand.
+"""
+
+import os
+from collections import OrderedDict
+
+import pygame
+from pygame import Rect
+
+from locals import *
+
+
+SPRITE_SHEET = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'ChessPiecesSprite.png')
+# size of a piece on the sprite sheet
+SPRITE_SIZE = 48
+# order of the pieces in the columns and rows of the sprite sheet
+_SHEET_COLUMNS = [KING, QUEEN, BISHOP, KNIGHT, ROOK, PAWN]
+_SHEET_ROWS = [WHITE, BLACK]
+
+
+class SpriteCache(object):
+    """
+    Holds a surface of every piece and its scaled variants. The sheet is
+    loaded on the first request, since converting the surfaces needs an
+    open display. The least recently used scaled variants are dropped when
+    there are more than max_size of them.
+    """
+
+    def __init__(self, path=SPRITE_SHEET, max_size=48):
+        """
+        :param path: path of the sprite sheet
+        :param max_size: number of scaled sprites kept
+        """
+        self.path = path
+        self.max_size = max_size
+        self._pieces = None
+        self._scaled = OrderedDict()
+
+    def _slice(self):
+        sheet = pygame.image.load(self.path)
+        return {
+            (piece_type, color): sheet.subsurface(Rect(
+                column * SPRITE_SIZE, row * SPRITE_SIZE,
+                SPRITE_SIZE, SPRITE_SIZE
+            )).convert_alpha()
+            for row, color in enumerate(_SHEET_ROWS)
+            for column, piece_type in enumerate(_SHEET_COLUMNS)
+        }
+
+    def get(self, piece_type, color, size):
+        """
+        Returns the image of the piece.
+        :param size: width and height of the image in pixels
+        :rtype: pygame.Surface
+        """
+        key = (piece_type, color, size)
+        sprite = self._scaled.get(key)
+        if sprite is not None:
+            self._scaled.move_to_end(key)
+            return sprite
+        if self._pieces is None:
+            self._pieces = self._slice()
+        sprite = self._pieces[(piece_type, color)]
+        if size != SPRITE_SIZE:
+            sprite = pygame.transform.smoothscale(sprite, (size, size))
+        self._scaled[key] = sprite
+        if len(self._scaled) > self.max_size:
+            self._scaled.popitem(last=False)
+        return sprite
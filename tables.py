@@ -0,0 +1,119 @@
+"""
+Lookup tables of the board geometry, built once at import.
+Tables are indexed with square numbers (see ``bitboard.square``) and hold
+bitboards unless stated otherwise.
+"""
+
+from bitboard import (
+    square, square_coords, iter_squares, between, knight_attacks,
+    king_attacks, pawn_attacks, KING_OFFSETS
+)
+from locals import *
+
+
+# Ray directions, in the same order as the king offsets. Straight
+# directions have even indices and diagonal ones odd indices.
+DIRECTIONS = KING_OFFSETS
+ROOK_DIRECTIONS = (0, 2, 4, 6)
+BISHOP_DIRECTIONS = (1, 3, 5, 7)
+QUEEN_DIRECTIONS = tuple(range(8))
+SLIDER_DIRECTIONS = {
+    ROOK: ROOK_DIRECTIONS,
+    BISHOP: BISHOP_DIRECTIONS,
+    QUEEN: QUEEN_DIRECTIONS
+}
+# Types of the pieces sliding along each of the directions.
+DIRECTION_SLIDERS = tuple(
+    frozenset((ROOK, QUEEN) if d in ROOK_DIRECTIONS else (BISHOP, QUEEN))
+    for d in range(8)
+)
+# Directions along which square numbers grow.
+POSITIVE_DIRECTIONS = frozenset(
+    d for d, (dx, dy) in enumerate(DIRECTIONS) if dy * 8 + dx > 0
+)
+
+KNIGHT_ATTACKS = [knight_attacks(sq) for sq in range(64)]
+KING_ATTACKS = [king_attacks(sq) for sq in range(64)]
+PAWN_ATTACKS = {
+    color: [pawn_attacks(color, sq) for sq in range(64)]
+    for color in (WHITE, BLACK)
+}
+
+
+def _ray(sq, dx, dy):
+    x, y = square_coords(sq)
+    squares = []
+    x, y = x + dx, y + dy
+    while 0 <= x < 8 and 0 <= y < 8:
+        squares.append(square(x, y))
+        x, y = x + dx, y + dy
+    return tuple(squares)
+
+
+# Squares met when walking from a square in a direction, nearest first.
+RAYS = [[_ray(sq, dx, dy) for dx, dy in DIRECTIONS] for sq in range(64)]
+RAY_MASKS = [
+    [sum(1 << target for target in ray) for ray in rays] for rays in RAYS
+]
+ROOK_RAYS = [
+    sum(masks[d] for d in ROOK_DIRECTIONS) for masks in RAY_MASKS
+]
+BISHOP_RAYS = [
+    sum(masks[d] for d in BISHOP_DIRECTIONS) for masks in RAY_MASKS
+]
+QUEEN_RAYS = [rook | bishop for rook, bishop in zip(ROOK_RAYS, BISHOP_RAYS)]
+
+# Direction leading from the first square to the second one, or None if
+# the squares don't share a rank, file or diagonal.
+DIRECTION = [[None] * 64 for _ in range(64)]
+for _sq, _masks in enumerate(RAY_MASKS):
+    for _d, _mask in enumerate(_masks):
+        for _target in iter_squares(_mask):
+            DIRECTION[_sq][_target] = _d
+
+# The same tables with coordinates of the fields as tuples of (x, y),
+# for walking the board fields directly.
+KNIGHT_FIELDS = [
+    tuple(square_coords(target) for target in iter_squares(mask))
+    for mask in KNIGHT_ATTACKS
+]
+KING_FIELDS = [
+    tuple(square_coords(target) for target in iter_squares(mask))
+    for mask in KING_ATTACKS
+]
+PAWN_FIELDS = {
+    color: [
+        tuple(square_coords(target) for target in iter_squares(mask))
+        for mask in masks
+    ]
+    for color, masks in PAWN_ATTACKS.items()
+}
+RAY_FIELDS = [
+    [tuple(square_coords(target) for target in ray) for ray in rays]
+    for rays in RAYS
+]
+
+BETWEEN = [[between(sq1, sq2) for sq2 in range(64)] for sq1 in range(64)]
+# Coordinates of the fields between two squares as tuples of (x, y).
+BETWEEN_FIELDS = [
+    [tuple(square_coords(sq) for sq in iter_squares(mask)) for mask in row]
+    for row in BETWEEN
+]
+
+del _sq, _masks, _d, _mask, _target
+
+
+def first_blocker(sq, direction, occupancy):
+    """
+    Finds the nearest occupied square from the square in the direction.
+    :param sq: square the ray starts from (exclusive)
+    :param direction: index of the direction in ``DIRECTIONS``
+    :param occupancy: bitboard of occupied squares
+    :return: number of the blocking square or None if the ray is empty
+    """
+    blockers = RAY_MASKS[sq][direction] & occupancy
+    if not blockers:
+        return None
+    if direction in POSITIVE_DIRECTIONS:
+        return (blockers & -blockers).bit_length() - 1
+    return blockers.bit_length() - 1
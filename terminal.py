@@ -0,0 +1,219 @@
+"""
+Terminal view of many boards at once. Every frame is built in memory and
+only the characters which changed since the previous frame are written,
+with ANSI cursor positioning, in a single write.
+Usage: python terminal.py [--boards N] [--rate N] [--plies N] [--seed N]
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import time
+
+from board import BoardManager
+from locals import *
+from moves import FILE_NAMES
+
+
+ESCAPE = '\x1b['
+RESET = ESCAPE + '0m'
+CLEAR_SCREEN = ESCAPE + '2J'
+
+# SGR color codes of the fields and pieces
+DARK_FIELD = '41'
+LIGHT_FIELD = '103'
+PIECE_COLORS = {WHITE: '37', BLACK: '30'}
+
+# every field takes two characters, the rank number two more
+BOARD_WIDTH = 18
+# title, eight ranks and the file names
+BOARD_HEIGHT = 10
+# space between the tiled boards
+GAP = 2
+
+_BLANK = (' ', '')
+
+
+def _text_cells(text, width=BOARD_WIDTH):
+    return [(char, '') for char in text[:width].ljust(width)]
+
+
+def board_cells(board, title=''):
+    """
+    Draws the board as cells, the eighth rank at the top.
+    :type board: board.Board
+    :param title: text shown above the board
+    :return: BOARD_HEIGHT rows of BOARD_WIDTH cells, every cell a tuple of
+        a character and its SGR style
+    :rtype: list[list[tuple]]
+    """
+    rows = [_text_cells(title)]
+    for y in range(7, -1, -1):
+        row = _text_cells('%i ' % (y + 1), 2)
+        for x, piece in enumerate(board.fields[y]):
+            background = DARK_FIELD if (x + y) % 2 == 0 else LIGHT_FIELD
+            if piece is None:
+                row += [(' ', background), (' ', background)]
+            else:
+                style = '%s;%s' % (PIECE_COLORS[piece.color], background)
+                row += [(piece.type, style), (' ', style)]
+        rows.append(row)
+    rows.append(_text_cells('  ' + ' '.join(FILE_NAMES)))
+    return rows
+
+
+def tile(tiles, columns):
+    """
+    Places the tiles in rows which fit in the width of the screen.
+    :param tiles: tiles of BOARD_HEIGHT rows of BOARD_WIDTH cells
+    :param columns: width of the screen in characters
+    :return: rows of cells of the whole screen
+    """
+    per_row = max(1, (columns + GAP) // (BOARD_WIDTH + GAP))
+    width = per_row * (BOARD_WIDTH + GAP) - GAP
+    frame = []
+    for start in range(0, len(tiles), per_row):
+        if frame:
+            frame.append([_BLANK] * width)
+        for line in range(BOARD_HEIGHT):
+            row = []
+            for cells in tiles[start:start + per_row]:
+                if row:
+                    row += [_BLANK] * GAP
+                row += cells[line]
+            frame.append(row + [_BLANK] * (width - len(row)))
+    return frame
+
+
+class TerminalRenderer(object):
+    """
+    Draws frames of cells on a terminal understanding ANSI escape codes,
+    writing only the cells which differ from the previous frame.
+    """
+
+    def __init__(self, stream=None, columns=None):
+        """
+        :param stream: stream of the terminal, the standard output if not
+            given
+        :param columns: width of the screen, the width of the terminal if
+            not given
+        """
+        self.stream = stream or sys.stdout
+        self.columns = columns or shutil.get_terminal_size().columns
+        self._previous = None
+        # characters written so far, escape codes included
+        self.written = 0
+
+    def reset(self):
+        """
+        Clears the screen and draws the whole next frame.
+        """
+        self._previous = None
+
+    def draw_boards(self, boards, titles=None):
+        """
+        Draws the boards tiled over the screen.
+        :type boards: list[board.Board]
+        :param titles: texts shown above the boards
+        :return: number of changed cells
+        """
+        titles = titles or [''] * len(boards)
+        tiles = [board_cells(board, title)
+                 for board, title in zip(boards, titles)]
+        return self.draw(tile(tiles, self.columns))
+
+    def draw(self, frame):
+        """
+        Writes the cells of the frame which changed since the previous one.
+        :param frame: rows of cells, every cell a tuple of a character and
+            its SGR style
+        :return: number of changed cells
+        """
+        output = []
+        previous = self._previous
+        if previous is None:
+            output.append(RESET + CLEAR_SCREEN)
+            previous = []
+        # cells of the previous frame outside of this one are blanked
+        height = max(len(frame), len(previous))
+        padded = []
+        changed = 0
+        style = None
+        for y in range(height):
+            row = frame[y] if y < len(frame) else []
+            old = previous[y] if y < len(previous) else []
+            if len(row) < len(old):
+                row = row + [_BLANK] * (len(old) - len(row))
+            padded.append(row)
+            if row == old:
+                continue
+            cursor = None
+            for x, cell in enumerate(row):
+                if x < len(old) and old[x] == cell:
+                    continue
+                if cursor != x:
+                    output.append('%s%i;%iH' % (ESCAPE, y + 1, x + 1))
+                if cell[1] != style:
+                    style = cell[1]
+                    output.append('%s0;%sm' % (ESCAPE, style)
+                                  if style else RESET)
+                output.append(cell[0])
+                cursor = x + 1
+                changed += 1
+        self._previous = padded
+        if output:
+            # leaves the cursor below the boards
+            output.append('%s%s%i;1H' % (RESET, ESCAPE, height + 1))
+            text = ''.join(output)
+            self.stream.write(text)
+            self.stream.flush()
+            self.written += len(text)
+        return changed
+
+
+def _title(game, manager):
+    outcome = manager.outcome()
+    if outcome is not None:
+        return '%i %s %s' % (game, outcome.result, outcome.reason)
+    return '%i ply %i' % (game, len(manager.board.undo_stack))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--boards', type=int, default=12)
+    parser.add_argument('--rate', type=float, default=5,
+                        help='moves per second on every board')
+    parser.add_argument('--plies', type=int, default=200,
+                        help='maximal length of the games')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+    managers = [BoardManager() for _ in range(args.boards)]
+    renderer = TerminalRenderer()
+    frames, drawing = 0, 0.0
+    playing = True
+    while playing:
+        playing = False
+        for manager in managers:
+            if (manager.outcome() is None and
+                    len(manager.board.undo_stack) < args.plies):
+                move = rng.choice(sorted(manager.generate_legal_moves()))
+                manager.move_piece(move.from_x, move.from_y, move.to_x,
+                                   move.to_y, move.promotion or QUEEN)
+                playing = True
+        start = time.perf_counter()
+        renderer.draw_boards(
+            [manager.board for manager in managers],
+            [_title(game, manager) for game, manager in enumerate(managers)]
+        )
+        drawing += time.perf_counter() - start
+        frames += 1
+        time.sleep(1 / args.rate)
+    print('frames %i  %.2f ms/frame  %.0f bytes/frame' % (
+        frames, drawing * 1000 / frames, renderer.written / frames
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import random
+
+from bitboard import iter_squares
+from board import AttackMapBoard, BitBoard
+from locals import *
+
+
+def expected_counts(board):
+    counts = {WHITE: [0] * 64, BLACK: [0] * 64}
+    for piece in board.white_pieces | board.black_pieces:
+        for sq in iter_squares(board._compute_attacks(piece)):
+            counts[piece.color][sq] += 1
+    return counts
+
+
+def test_starting_counts():
+    board = AttackMapBoard()
+    assert board.attack_counts == expected_counts(board)
+    # f3 is covered by the g1 knight and the e2 and g2 pawns
+    assert board.attack_counts[WHITE][5 + 2 * 8] == 3
+    assert board.is_field_attacked(WHITE, 5, 2)
+    assert not board.is_field_attacked(WHITE, 4, 3)
+
+
+def test_counts_follow_moves():
+    board = AttackMapBoard()
+    reference = BitBoard()
+    rng = random.Random(11)
+    for _ in range(100):
+        moves = list(board.generate_legal_moves(board.side_to_move))
+        if not moves:
+            break
+        move = rng.choice(moves)
+        board.make_move(move)
+        reference.make_move(move)
+        assert board.attack_counts == expected_counts(board)
+        for color in (WHITE, BLACK):
+            assert board.attack_mask(color) == reference.attack_mask(color)
+            king = reference.get_king(WHITE if color == BLACK else BLACK)
+            ignored = board.get_piece(king.x, king.y)
+            assert (board.attack_mask(color, ignore=ignored) ==
+                    reference.attack_mask(color, ignore=king))
+    while board.undo_stack:
+        board.unmake_move()
+    assert board.attack_counts == AttackMapBoard().attack_counts
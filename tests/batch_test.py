@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from batch import (
+    COLOR_INDEX, attacks, evaluate, evaluate_batch, from_boards, in_check,
+    material, piece_square, to_boards
+)
+from board import Board, BitBoard
+from compact import SIGNS
+from evaluation import evaluate as scalar_evaluate
+from locals import *
+from perft import REFERENCE_POSITIONS
+
+
+def random_boards(count, seed=16):
+    rng = random.Random(seed)
+    boards = []
+    for _, fen, _ in REFERENCE_POSITIONS:
+        board = BitBoard.from_fen(fen)
+        for _ in range(count):
+            moves = list(board.generate_legal_moves(board.side_to_move))
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+            boards.append(BitBoard.from_fen(board.to_fen()))
+    return boards
+
+
+def test_encoding():
+    squares = from_boards([Board()])
+    assert squares.shape == (1, 64)
+    assert squares.dtype == np.int8
+    assert squares[0, 3] == 5 and squares[0, 59] == -5
+    assert material(squares)[0] == 0
+    assert piece_square(squares)[0] == 0
+
+
+def test_round_trip():
+    boards = random_boards(10)
+    squares = from_boards(boards)
+    sides = [SIGNS[board.side_to_move] for board in boards]
+    rebuilt = to_boards(squares, sides)
+    assert (from_boards(rebuilt) == squares).all()
+    assert [board.side_to_move for board in rebuilt] == \
+        [board.side_to_move for board in boards]
+
+
+def test_matches_scalar_evaluation():
+    boards = random_boards(30)
+    sides = [SIGNS[board.side_to_move] for board in boards]
+    scores = evaluate(from_boards(boards), sides)
+    assert scores.tolist() == [scalar_evaluate(board) for board in boards]
+
+
+def test_matches_scalar_attacks_and_checks():
+    boards = random_boards(30)
+    result = evaluate_batch(from_boards(boards))
+    assert result.attacked.shape == (len(boards), 2, 64)
+    for i, board in enumerate(boards):
+        for color in (WHITE, BLACK):
+            mask = board.attack_mask(color)
+            expected = [bool(mask >> sq & 1) for sq in range(64)]
+            assert result.attacked[i, COLOR_INDEX[color]].tolist() == expected
+            assert (result.in_check[i, COLOR_INDEX[color]] ==
+                    board.is_king_in_check(color))
+
+
+def test_sliders_are_blocked():
+    board = Board.from_fen('4k3/8/8/8/n7/8/8/R3K3 w - - 0 1')
+    squares = from_boards([board])
+    attacked = attacks(squares, WHITE)[0]
+    assert attacked[8 * 3] and not attacked[8 * 4]
+    assert not in_check(squares, BLACK)[0]
+    assert in_check(from_boards([Board.from_fen(
+        '4k3/8/8/8/8/8/8/4RK2 b - - 0 1'
+    )]), BLACK)[0]
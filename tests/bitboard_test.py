@@ -0,0 +1,77 @@
+import itertools
+
+import pytest
+
+from bitboard import square, between, iter_squares
+from board import Board, BitBoard, BoardManager
+from locals import *
+
+
+def test_between_squares():
+    assert between(square(0, 0), square(3, 3)) == (
+        1 << square(1, 1) | 1 << square(2, 2))
+    assert between(square(4, 0), square(4, 2)) == 1 << square(4, 1)
+    assert between(square(0, 0), square(1, 2)) == 0
+    assert between(square(0, 0), square(1, 1)) == 0
+
+
+def test_iter_squares():
+    assert list(iter_squares(0b1010001)) == [0, 4, 6]
+
+
+class TestBitBoard:
+
+    @pytest.fixture()
+    def board(self):
+        return BitBoard()
+
+    def test_starting_occupancy(self, board):
+        assert board.occupied[WHITE] == 0xFFFF
+        assert board.occupied[BLACK] == 0xFFFF << 48
+        assert board.bitboards[WHITE][KING] == 1 << square(4, 0)
+        assert board.bitboards[BLACK][PAWN] == 0xFF << 48
+
+    def test_fields_match_bitboards(self, board):
+        for x, y in itertools.product(range(8), repeat=2):
+            piece = board.get_piece(x, y)
+            assert board.is_occupied(x, y) == (piece is not None)
+            if piece is not None:
+                assert board.bitboards[piece.color][piece.type] >> \
+                    square(x, y) & 1
+
+    def test_move_updates_bitboards(self, board):
+        pawn = board.get_piece(4, 1)
+        board.pick_piece(pawn)
+        board.put_piece(pawn, 4, 3)
+        assert not board.is_occupied(4, 1)
+        assert board.is_occupied(4, 3)
+        assert board.get_piece(4, 3) is pawn
+
+    def test_remove_piece(self, board):
+        knight = board.get_piece(1, 7)
+        board.remove_piece(knight)
+        assert board.bitboards[BLACK][KNIGHT] == 1 << square(6, 7)
+        assert knight not in board.black_pieces
+
+    def test_any_piece_between(self, board):
+        assert board.any_piece_between(0, 0, 0, 7)
+        assert not board.any_piece_between(0, 2, 7, 2)
+        assert not board.any_piece_between(0, 0, 0, 1)
+
+    def test_field_attacked(self, board):
+        assert board.is_field_attacked(WHITE, 5, 2)
+        assert board.is_field_attacked(BLACK, 0, 5)
+        assert not board.is_field_attacked(WHITE, 4, 3)
+        board.pick_piece(board.get_piece(4, 1))
+        assert board.is_field_attacked(WHITE, 7, 4)
+
+    def test_same_between_as_list_board(self, board):
+        list_board = Board()
+        for x, y in itertools.product(range(8), repeat=2):
+            assert (board.any_piece_between(3, 0, x, y) ==
+                    list_board.any_piece_between(3, 0, x, y))
+
+
+def test_manager_backend_selection():
+    assert type(BoardManager().board) is Board
+    assert type(BoardManager(backend='bitboard').board) is BitBoard
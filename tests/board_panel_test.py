@@ -0,0 +1,45 @@
+import pytest
+
+pygame = pytest.importorskip('pygame')
+
+import chess
+from board import BoardManager
+
+
+@pytest.fixture
+def window(monkeypatch):
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    monkeypatch.setattr(chess, 'bm', BoardManager())
+    chess.open_window()
+    yield chess.board_panel
+    pygame.quit()
+
+
+def field_rect(panel, x, y):
+    size = panel._field_size
+    return pygame.Rect(x * size, (7 - y) * size, size, size)
+
+
+def test_paint_redraws_changed_fields(window):
+    assert len(window.paint(window.surface)) == 64
+    assert window.paint(window.surface) == []
+    chess.bm.move_piece(4, 1, 4, 3)
+    rects = window.paint(window.surface)
+    assert sorted(map(tuple, rects)) == sorted(
+        map(tuple, [field_rect(window, 4, 1), field_rect(window, 4, 3)])
+    )
+
+
+def test_selection_redraws_its_field(window):
+    window.paint(window.surface)
+    window.on_click(*field_rect(window, 6, 0).center)
+    assert window.paint(window.surface) == [field_rect(window, 6, 0)]
+
+
+def test_expose_draws_everything(window):
+    chess.window_panel.repaint()
+    chess.handle_event(pygame.event.Event(pygame.VIDEOEXPOSE))
+    assert window._drawn == {}
+    rects = chess.window_panel.repaint()
+    assert rects == [chess.window_panel.surface.get_rect()]
+    assert len(window._drawn) == 64
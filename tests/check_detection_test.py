@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from board import BOARD_BACKENDS
+from locals import *
+
+
+@pytest.fixture(params=sorted(BOARD_BACKENDS))
+def backend(request):
+    return request.param
+
+
+@pytest.mark.parametrize('fen,color,in_check', [
+    ('rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1', BLACK,
+     False),
+    ('4k3/8/8/8/8/8/3n4/4K3 w - - 0 1', WHITE, False),
+    ('4k3/8/8/8/8/5n2/8/4K3 w - - 0 1', WHITE, True),
+    ('4k3/8/8/8/8/8/5p2/4K3 w - - 0 1', WHITE, True),
+    ('4k3/8/8/8/8/8/4p3/4K3 w - - 0 1', WHITE, False),
+    ('4k3/8/8/8/1b6/8/8/4K3 w - - 0 1', WHITE, True),
+    ('4k3/8/8/8/1b6/8/3P4/4K3 w - - 0 1', WHITE, False),
+    ('4k3/4r3/8/8/8/8/8/4K3 w - - 0 1', WHITE, True),
+    ('4k3/4b3/8/8/8/8/8/4K3 w - - 0 1', WHITE, False),
+    ('4k3/8/8/8/8/8/8/Q3K3 b - - 0 1', BLACK, False),
+    ('4k3/3P4/8/8/8/8/8/4K3 b - - 0 1', BLACK, True),
+])
+def test_king_in_check(backend, fen, color, in_check):
+    board = BOARD_BACKENDS[backend].from_fen(fen)
+    assert board.is_king_in_check(color) == in_check
+
+
+def test_matches_check_detection_of_move_generator(backend):
+    board = BOARD_BACKENDS[backend].from_fen(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    rng = random.Random(5)
+    for _ in range(80):
+        for color in (WHITE, BLACK):
+            checkers = board.find_checks_and_pins(color)[0]
+            assert board.is_king_in_check(color) == bool(checkers)
+        moves = list(board.generate_legal_moves(board.side_to_move))
+        if not moves:
+            break
+        board.make_move(rng.choice(moves))
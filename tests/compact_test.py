@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from board import Board
+from compact import (
+    CompactPosition, MOVEMENTS, TYPE_CODES, ALL_CASTLING, WHITE_LONG,
+    BLACK_LONG, perft, piece_code
+)
+from locals import *
+from moves import Move, decode_move, encode_move
+from perft import REFERENCE_POSITIONS
+from pieces import Pawn, Rook, PhantomPawn
+
+
+def test_piece_codes():
+    assert piece_code(WHITE, PAWN) == 1
+    assert piece_code(BLACK, KING) == -6
+    assert sorted(TYPE_CODES.values()) == [1, 2, 3, 4, 5, 6]
+
+
+def test_starting_position():
+    position = CompactPosition.from_board(Board())
+    assert position.squares[4] == piece_code(WHITE, KING)
+    assert position.squares[59] == piece_code(BLACK, QUEEN)
+    assert list(position.squares[16:48]) == [0] * 32
+    assert position.side == 1
+    assert position.castling == ALL_CASTLING
+    assert position.en_passant == -1
+
+
+def test_movements_are_shared():
+    first = CompactPosition.from_board(Board())
+    second = first.play(encode_move(Move(4, 1, 4, 3)))
+    assert first.squares is not second.squares
+    assert all(not hasattr(movement, '__dict__')
+               for movement in MOVEMENTS[1:])
+
+
+@pytest.mark.parametrize('name,fen,counts', REFERENCE_POSITIONS)
+def test_perft(name, fen, counts):
+    position = CompactPosition.from_board(Board.from_fen(fen))
+    for depth, expected in enumerate(counts[:2], 1):
+        assert perft(position, depth) == expected
+
+
+@pytest.mark.parametrize('name,fen,counts', REFERENCE_POSITIONS)
+def test_board_round_trip(name, fen, counts):
+    board = Board.from_fen(fen)
+    position = CompactPosition.from_board(board)
+    rebuilt = position.to_board()
+    assert rebuilt.hash_key == board.hash_key
+    assert CompactPosition.from_board(rebuilt).squares == position.squares
+
+
+def test_moves_match_board():
+    board = Board()
+    rng = random.Random(13)
+    for _ in range(80):
+        position = CompactPosition.from_board(board)
+        moves = list(board.generate_legal_moves(board.side_to_move))
+        assert (sorted(decode_move(code) for code in position.legal_moves())
+                == sorted(moves))
+        if not moves:
+            break
+        board.make_move(rng.choice(moves))
+
+
+def test_en_passant_and_castling_rights():
+    board = Board.from_fen('r3k2r/8/8/8/5p2/8/4P3/R3K2R w KQkq - 0 1')
+    position = CompactPosition.from_board(board)
+    position = position.play(encode_move(Move(4, 1, 4, 3)))
+    assert position.en_passant == 20
+    assert encode_move(Move(5, 3, 4, 2)) in position.legal_moves()
+    position = position.play(encode_move(Move(7, 7, 7, 0)))
+    assert position.castling == WHITE_LONG | BLACK_LONG
+    assert position.squares[7] == piece_code(BLACK, ROOK)
+
+
+def test_pieces_have_no_dict():
+    board = Board()
+    for piece in board.white_pieces | board.black_pieces:
+        assert not hasattr(piece, '__dict__')
+    pawn = Pawn(board, 0, 1, WHITE)
+    assert not hasattr(PhantomPawn(board, 0, 2, WHITE, pawn), '__dict__')
+    assert not hasattr(Rook(board, 0, 0, WHITE), '__dict__')
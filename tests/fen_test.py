@@ -0,0 +1,99 @@
+import pytest
+
+from board import Board, BOARD_BACKENDS
+from compact import CompactPosition
+from exceptions import InvalidFenError
+from locals import *
+from moves import Move
+from perft import START_FEN, REFERENCE_POSITIONS
+from zobrist import compute_hash
+
+
+@pytest.fixture(params=sorted(BOARD_BACKENDS))
+def board_cls(request):
+    return BOARD_BACKENDS[request.param]
+
+
+def test_starting_position(board_cls):
+    board = board_cls.from_fen(START_FEN)
+    assert board.to_fen() == START_FEN
+    assert board.hash_key == Board().hash_key
+    assert Board().to_fen() == START_FEN
+
+
+@pytest.mark.parametrize('name,fen,counts', REFERENCE_POSITIONS)
+def test_round_trip(board_cls, name, fen, counts):
+    board = board_cls.from_fen(fen)
+    assert board.to_fen() == fen
+    assert board.hash_key == compute_hash(board)
+    pieces = sum(char.isalpha() for char in fen.split()[0])
+    assert len(board.white_pieces) + len(board.black_pieces) == pieces
+
+
+def test_empty_board():
+    board = Board(fill=False)
+    assert not board.white_pieces and not board.black_pieces
+    assert not any(board.long_castle_allowed.values())
+    assert board.hash_key == compute_hash(board)
+
+
+def test_side_castling_and_en_passant():
+    board = Board.from_fen(
+        'rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b Kq e3 0 3'
+    )
+    assert board.side_to_move == BLACK
+    assert board.short_castle_allowed == {WHITE: True, BLACK: False}
+    assert board.long_castle_allowed == {WHITE: False, BLACK: True}
+    phantom = board.en_passant
+    assert (phantom.x, phantom.y, phantom.color) == (4, 2, WHITE)
+    assert phantom.linked_pawn is board.get_piece(4, 3)
+    assert Move(3, 3, 4, 2) in board.generate_legal_moves(BLACK)
+
+
+def test_castling_without_king_or_rook_is_dropped(board_cls):
+    board = board_cls.from_fen('4k3/8/8/8/8/8/8/R3K3 w KQkq - 0 1')
+    assert board.short_castle_allowed == {WHITE: False, BLACK: False}
+    assert board.long_castle_allowed == {WHITE: True, BLACK: False}
+    assert board.to_fen() == '4k3/8/8/8/8/8/8/R3K3 w Q - 0 1'
+    assert board.hash_key == compute_hash(board)
+    assert Move(4, 0, 6, 0) not in board.generate_legal_moves(WHITE)
+
+    position = CompactPosition.from_board(
+        board_cls.from_fen('4k3/8/8/8/8/8/8/R3K3 w K - 0 1')
+    )
+    assert not position.castling
+    assert all(move >> 6 & 63 != 6 for move in position.legal_moves())
+
+
+def test_move_counters():
+    board = Board()
+    board.make_move(Move(6, 0, 5, 2))
+    assert board.to_fen().endswith(' 1 1')
+    board.make_move(Move(6, 7, 5, 5))
+    assert board.to_fen().endswith(' 2 2')
+    board.make_move(Move(4, 1, 4, 3))
+    assert board.to_fen().endswith(' 0 2')
+    for fen_end in [' 2 2', ' 1 1', ' 0 1']:
+        board.unmake_move()
+        assert board.to_fen().endswith(fen_end)
+
+
+def test_counters_are_optional():
+    board = Board.from_fen('4k3/8/8/8/8/8/8/4K3 b - -')
+    assert board.to_fen() == '4k3/8/8/8/8/8/8/4K3 b - - 0 1'
+
+
+@pytest.mark.parametrize('fen', [
+    '',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQxq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e3 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQ1BNR w kq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1',
+])
+def test_invalid_fen(fen):
+    with pytest.raises(InvalidFenError):
+        Board.from_fen(fen)
@@ -0,0 +1,127 @@
+import pytest
+
+from board import Board, BitBoard
+from locals import *
+from moves import Move
+from pieces import King, Queen, Knight, Rook, Bishop, Pawn, PhantomPawn
+
+
+@pytest.fixture(params=[Board, BitBoard])
+def empty_board(request):
+    board = request.param()
+    for piece in list(board.white_pieces | board.black_pieces):
+        board.remove_piece(piece)
+    board.long_castle_allowed = {WHITE: False, BLACK: False}
+    board.short_castle_allowed = {WHITE: False, BLACK: False}
+    return board
+
+
+def place(board, piece_cls, x, y, color):
+    piece = piece_cls(board, x, y, color)
+    (board.white_pieces if color == WHITE else board.black_pieces).add(piece)
+    board.put_piece(piece, x, y)
+    if piece_cls is King:
+        if color == WHITE:
+            board.white_king = piece
+        else:
+            board.black_king = piece
+    return piece
+
+
+def legal_moves(board, color):
+    return set(board.generate_legal_moves(color))
+
+
+def test_starting_position():
+    board = Board()
+    assert len(legal_moves(board, WHITE)) == 20
+    assert len(legal_moves(board, BLACK)) == 20
+
+
+def test_pinned_piece_moves_along_pin(empty_board):
+    place(empty_board, King, 4, 0, WHITE)
+    place(empty_board, King, 4, 7, BLACK)
+    place(empty_board, Rook, 4, 2, WHITE)
+    place(empty_board, Queen, 4, 5, BLACK)
+    rook_moves = {m for m in legal_moves(empty_board, WHITE)
+                  if (m.from_x, m.from_y) == (4, 2)}
+    assert rook_moves == {Move(4, 2, 4, 1), Move(4, 2, 4, 3),
+                          Move(4, 2, 4, 4), Move(4, 2, 4, 5)}
+
+
+def test_check_evasions(empty_board):
+    place(empty_board, King, 4, 0, WHITE)
+    place(empty_board, King, 7, 7, BLACK)
+    place(empty_board, Knight, 2, 3, WHITE)
+    place(empty_board, Rook, 4, 5, BLACK)
+    moves = legal_moves(empty_board, WHITE)
+    knight_moves = {m for m in moves if m.from_x == 2}
+    assert knight_moves == {Move(2, 3, 4, 2), Move(2, 3, 4, 4)}
+    assert Move(4, 0, 4, 1) not in moves
+    assert Move(4, 0, 3, 0) in moves
+
+
+def test_block_or_capture_checker(empty_board):
+    place(empty_board, King, 4, 0, WHITE)
+    place(empty_board, King, 7, 7, BLACK)
+    place(empty_board, Bishop, 2, 3, WHITE)
+    place(empty_board, Rook, 4, 5, BLACK)
+    bishop_moves = {m for m in legal_moves(empty_board, WHITE)
+                    if m.from_x == 2}
+    assert bishop_moves == {Move(2, 3, 4, 1), Move(2, 3, 4, 5)}
+
+
+def test_double_check_only_king_moves(empty_board):
+    place(empty_board, King, 4, 0, WHITE)
+    place(empty_board, King, 7, 7, BLACK)
+    place(empty_board, Queen, 0, 4, WHITE)
+    place(empty_board, Rook, 4, 5, BLACK)
+    place(empty_board, Knight, 3, 2, BLACK)
+    assert all(m.from_x == 4 and m.from_y == 0
+               for m in legal_moves(empty_board, WHITE))
+
+
+def test_king_cannot_retreat_along_check_ray(empty_board):
+    place(empty_board, King, 4, 3, WHITE)
+    place(empty_board, King, 7, 7, BLACK)
+    place(empty_board, Rook, 0, 3, BLACK)
+    moves = legal_moves(empty_board, WHITE)
+    assert Move(4, 3, 5, 3) not in moves
+    assert Move(4, 3, 4, 4) in moves
+
+
+def test_castling_through_check(empty_board):
+    place(empty_board, King, 4, 0, WHITE)
+    place(empty_board, Rook, 7, 0, WHITE)
+    place(empty_board, Rook, 0, 0, WHITE)
+    place(empty_board, King, 4, 7, BLACK)
+    place(empty_board, Rook, 5, 5, BLACK)
+    empty_board.long_castle_allowed[WHITE] = True
+    empty_board.short_castle_allowed[WHITE] = True
+    moves = legal_moves(empty_board, WHITE)
+    assert Move(4, 0, 6, 0) not in moves
+    assert Move(4, 0, 2, 0) in moves
+
+
+def test_no_castling_out_of_check(empty_board):
+    place(empty_board, King, 4, 0, WHITE)
+    place(empty_board, Rook, 7, 0, WHITE)
+    place(empty_board, King, 4, 7, BLACK)
+    place(empty_board, Rook, 4, 5, BLACK)
+    empty_board.short_castle_allowed[WHITE] = True
+    assert Move(4, 0, 6, 0) not in legal_moves(empty_board, WHITE)
+
+
+def test_en_passant_discovers_check_on_rank(empty_board):
+    place(empty_board, King, 0, 4, WHITE)
+    place(empty_board, King, 7, 7, BLACK)
+    pawn = place(empty_board, Pawn, 1, 4, WHITE)
+    black_pawn = place(empty_board, Pawn, 2, 4, BLACK)
+    place(empty_board, Rook, 7, 4, BLACK)
+    empty_board.en_passant = PhantomPawn(empty_board, 2, 5, BLACK,
+                                         black_pawn)
+    moves = legal_moves(empty_board, WHITE)
+    assert Move(1, 4, 2, 5) not in moves
+    assert Move(1, 4, 1, 5) in moves
+    assert empty_board.get_piece(1, 4) is pawn
+    assert empty_board.get_piece(2, 4) is black_pawn
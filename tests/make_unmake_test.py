@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from board import Board, BitBoard, BoardManager
+from exceptions import IllegalMoveError
+from locals import *
+from moves import Move
+
+
+def snapshot(board):
+    fields = tuple(
+        (piece.type, piece.color, piece.x, piece.y) if piece else None
+        for rank in board.fields for piece in rank
+    )
+    en_passant = board.en_passant and (board.en_passant.x,
+                                       board.en_passant.y)
+    return (fields, dict(board.long_castle_allowed),
+            dict(board.short_castle_allowed), en_passant,
+            board.side_to_move, len(board.white_pieces),
+            len(board.black_pieces), getattr(board, 'bitboards', None))
+
+
+@pytest.fixture(params=[Board, BitBoard])
+def board(request):
+    return request.param()
+
+
+def test_random_games_unwind(board):
+    rng = random.Random(7)
+    for _ in range(3):
+        snapshots = []
+        for _ in range(120):
+            moves = list(board.generate_legal_moves(board.side_to_move))
+            if not moves:
+                break
+            snapshots.append(snapshot(board))
+            board.make_move(rng.choice(moves))
+        while snapshots:
+            board.unmake_move()
+            assert snapshot(board) == snapshots.pop()
+
+
+def test_castling_moves_rook(board):
+    for x in (5, 6):
+        board.remove_piece(board.get_piece(x, 0))
+    rook = board.get_piece(7, 0)
+    board.make_move(Move(4, 0, 6, 0))
+    assert board.get_piece(5, 0) is rook
+    assert not board.short_castle_allowed[WHITE]
+    assert not board.long_castle_allowed[WHITE]
+    assert board.side_to_move == BLACK
+    board.unmake_move()
+    assert board.get_piece(7, 0) is rook
+    assert board.get_piece(4, 0).type == KING
+    assert board.short_castle_allowed[WHITE]
+
+
+def test_promotion(board):
+    board.remove_piece(board.get_piece(0, 6))
+    board.remove_piece(board.get_piece(0, 7))
+    pawn = board.get_piece(0, 1)
+    board.pick_piece(pawn)
+    board.put_piece(pawn, 0, 6)
+    board.make_move(Move(0, 6, 1, 7, KNIGHT))
+    knight = board.get_piece(1, 7)
+    assert knight.type == KNIGHT and knight.color == WHITE
+    assert pawn not in board.white_pieces
+    board.unmake_move()
+    assert board.get_piece(0, 6) is pawn
+    assert board.get_piece(1, 7).color == BLACK
+
+
+def test_en_passant(board):
+    board.make_move(Move(4, 1, 4, 3))
+    assert (board.en_passant.x, board.en_passant.y) == (4, 2)
+    board.make_move(Move(0, 6, 0, 5))
+    board.make_move(Move(4, 3, 4, 4))
+    board.make_move(Move(3, 6, 3, 4))
+    black_pawn = board.get_piece(3, 4)
+    assert Move(4, 4, 3, 5) in set(board.generate_legal_moves(WHITE))
+    board.make_move(Move(4, 4, 3, 5))
+    assert board.get_piece(3, 4) is None
+    assert black_pawn not in board.black_pieces
+    board.unmake_move()
+    assert board.get_piece(3, 4) is black_pawn
+
+
+def test_manager_undo():
+    manager = BoardManager()
+    manager.move_piece(6, 0, 5, 2)
+    assert manager.player_to_move == BLACK
+    assert manager.undo() == Move(6, 0, 5, 2)
+    assert manager.player_to_move == WHITE
+    assert manager.board.get_piece(6, 0).type == KNIGHT
+    with pytest.raises(IllegalMoveError):
+        manager.undo()
+
+
+def test_manager_rejects_illegal_move():
+    manager = BoardManager()
+    with pytest.raises(IllegalMoveError):
+        manager.move_piece(4, 1, 4, 4)
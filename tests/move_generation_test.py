@@ -0,0 +1,86 @@
+import pytest
+
+from board import Board, BitBoard, BoardManager
+from locals import *
+from moves import Move
+from pieces import Knight, PhantomPawn
+
+
+@pytest.fixture(params=[Board, BitBoard])
+def board(request):
+    return request.param()
+
+
+def test_starting_moves(board):
+    moves = list(board.generate_moves(WHITE))
+    assert len(moves) == 20
+    assert len(set(moves)) == 20
+    assert Move(6, 0, 5, 2) in moves
+    assert Move(4, 1, 4, 3) in moves
+    assert not list(board.generate_captures(BLACK))
+
+
+def test_captures_come_first(board):
+    knight = Knight(board, 3, 5, WHITE)
+    board.white_pieces.add(knight)
+    board.put_piece(knight, 3, 5)
+    moves = list(board.generate_moves(WHITE))
+    captures = list(board.generate_captures(WHITE))
+    assert moves[:len(captures)] == captures
+    assert Move(3, 5, 4, 7) in captures
+    assert Move(3, 1, 3, 2) not in captures
+
+
+def test_generation_is_lazy(board):
+    moves = board.generate_moves(WHITE)
+    first = next(moves)
+    assert isinstance(first, Move)
+
+
+def test_sliders_stop_at_blockers(board):
+    board.remove_piece(board.get_piece(0, 1))
+    moves = set(board.generate_moves(WHITE))
+    assert Move(0, 0, 0, 5) in moves
+    assert Move(0, 0, 0, 6) in moves
+    assert Move(0, 0, 0, 7) not in moves
+
+
+def test_promotions(board):
+    board.remove_piece(board.get_piece(0, 7))
+    board.remove_piece(board.get_piece(0, 6))
+    pawn = board.get_piece(0, 1)
+    board.pick_piece(pawn)
+    board.put_piece(pawn, 0, 6)
+    captures = set(board.generate_captures(WHITE))
+    assert {Move(0, 6, 0, 7, QUEEN), Move(0, 6, 1, 7, KNIGHT)} <= captures
+    assert len([m for m in captures if m.from_x == 0]) == 8
+
+
+def test_en_passant(board):
+    black_pawn = board.get_piece(3, 6)
+    board.pick_piece(black_pawn)
+    board.put_piece(black_pawn, 3, 4)
+    white_pawn = board.get_piece(4, 1)
+    board.pick_piece(white_pawn)
+    board.put_piece(white_pawn, 4, 4)
+    board.en_passant = PhantomPawn(board, 3, 5, BLACK, black_pawn)
+    assert Move(4, 4, 3, 5) in set(board.generate_captures(WHITE))
+
+
+def test_castling(board):
+    for x in (5, 6):
+        board.remove_piece(board.get_piece(x, 0))
+    assert Move(4, 0, 6, 0) in set(board.generate_quiet_moves(WHITE))
+    board.short_castle_allowed[WHITE] = False
+    assert Move(4, 0, 6, 0) not in set(board.generate_quiet_moves(WHITE))
+
+
+def test_manager_generates_for_player_to_move():
+    manager = BoardManager()
+    manager.switch_player()
+    assert all(move.from_y in (6, 7) for move in manager.generate_moves())
+
+
+def test_move_notation():
+    assert str(Move(4, 1, 4, 3)) == 'e2e4'
+    assert str(Move(0, 6, 0, 7, QUEEN)) == 'a7a8Q'
@@ -0,0 +1,54 @@
+import pytest
+
+from board import Board, BoardManager, Outcome
+from moves import Move
+
+
+KNIGHT_SHUFFLE = [Move(6, 0, 5, 2), Move(6, 7, 5, 5),
+                  Move(5, 2, 6, 0), Move(5, 5, 6, 7)]
+
+
+def test_game_goes_on():
+    assert BoardManager().outcome() is None
+
+
+@pytest.mark.parametrize('fen,outcome', [
+    ('R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1', Outcome('1-0', 'checkmate')),
+    ('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1', Outcome('1/2-1/2', 'stalemate')),
+    ('4k3/8/8/8/8/8/8/R3K3 w - - 100 80', Outcome('1/2-1/2', 'fifty moves')),
+    ('4k3/8/8/8/8/8/8/4KN2 w - - 0 1',
+     Outcome('1/2-1/2', 'insufficient material')),
+    ('2b1k3/8/8/8/8/8/8/4KB2 w - - 0 1',
+     Outcome('1/2-1/2', 'insufficient material')),
+    ('3bk3/8/8/8/8/8/8/4KB2 w - - 0 1', None),
+    ('4k3/8/8/8/8/8/8/3NKN2 w - - 0 1', None),
+])
+def test_outcome(fen, outcome):
+    manager = BoardManager(fen=fen)
+    assert manager.outcome() == outcome
+
+
+def test_threefold_repetition():
+    manager = BoardManager()
+    board = manager.board
+    for move in KNIGHT_SHUFFLE:
+        board.make_move(move)
+    assert board.repetition_count() == 2
+    assert manager.outcome() is None
+    for move in KNIGHT_SHUFFLE:
+        board.make_move(move)
+    assert board.repetition_count() == 3
+    assert manager.outcome() == Outcome('1/2-1/2', 'repetition')
+    board.unmake_move()
+    assert board.repetition_count() == 2
+
+
+def test_irreversible_move_resets_repetitions():
+    board = Board()
+    board.make_move(Move(4, 1, 4, 2))
+    for move in [KNIGHT_SHUFFLE[1], KNIGHT_SHUFFLE[0],
+                 KNIGHT_SHUFFLE[3], KNIGHT_SHUFFLE[2]]:
+        board.make_move(move)
+    assert board.repetition_count() == 2
+    board.make_move(Move(3, 6, 3, 4))
+    assert board.repetition_count() == 1
@@ -0,0 +1,84 @@
+import pytest
+
+pygame = pytest.importorskip('pygame')
+from pygame import Rect
+
+from panel import Panel
+
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+class Recorder(Panel):
+    """
+    Panel filling the given rects, or the whole surface, on every paint.
+    """
+
+    def __init__(self, rect, color, painted_rects=None):
+        super(Recorder, self).__init__(rect)
+        self.color = color
+        self.painted_rects = painted_rects
+        self.paints = 0
+
+    def paint(self, surface):
+        self.paints += 1
+        if self.painted_rects is None:
+            surface.fill(self.color)
+            return None
+        for rect in self.painted_rects:
+            surface.fill(self.color, rect)
+        return self.painted_rects
+
+
+@pytest.fixture(autouse=True)
+def headless(monkeypatch):
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+
+
+def test_clean_subtrees_are_skipped():
+    root = Recorder(Rect(0, 0, 100, 100), BLUE)
+    child = Recorder(Rect(10, 10, 20, 20), RED)
+    root.add_component(child)
+    assert root.repaint() == [Rect(0, 0, 100, 100)]
+    assert (root.paints, child.paints) == (1, 1)
+    assert root.repaint() == []
+    assert (root.paints, child.paints) == (1, 1)
+
+
+def test_child_rects_are_moved_to_the_parent():
+    root = Recorder(Rect(0, 0, 100, 100), BLUE)
+    child = Recorder(Rect(10, 20, 20, 20), RED, [Rect(2, 3, 4, 5)])
+    root.add_component(child)
+    root.repaint()
+    child.invalidate()
+    assert root.repaint() == [Rect(12, 23, 4, 5)]
+    assert root.paints == 1
+    assert root.surface.get_at((12, 23)) == RED
+
+
+def test_invalidate_marks_the_ancestors():
+    root = Recorder(Rect(0, 0, 100, 100), BLUE)
+    middle = Recorder(Rect(10, 10, 50, 50), BLUE)
+    leaf = Recorder(Rect(5, 5, 10, 10), RED, [Rect(0, 0, 1, 1)])
+    root.add_component(middle)
+    middle.add_component(leaf)
+    root.repaint()
+    assert not (root._dirty_children or middle._dirty_children)
+    leaf.invalidate()
+    assert root._dirty_children and middle._dirty_children
+    assert not (root._dirty or middle._dirty)
+    assert root.repaint() == [Rect(15, 15, 1, 1)]
+    assert (root.paints, middle.paints, leaf.paints) == (1, 1, 2)
+
+
+def test_partial_paint_keeps_children_on_top():
+    root = Recorder(Rect(0, 0, 100, 100), BLUE, [Rect(0, 0, 100, 100)])
+    child = Recorder(Rect(10, 10, 20, 20), RED)
+    root.add_component(child)
+    root.repaint()
+    root.invalidate()
+    assert root.repaint() == [Rect(0, 0, 100, 100)]
+    assert child.paints == 1
+    assert root.surface.get_at((15, 15)) == RED
+    assert root.surface.get_at((50, 50)) == BLUE
@@ -0,0 +1,23 @@
+from board import Board
+from moves import Move
+from parallel import ParallelSearch
+from perft import START_FEN
+from search import MATE_BOUND
+
+
+def test_parallel_search_finds_mate():
+    board = Board.from_fen('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+    with ParallelSearch(workers=2, hash_mb=1) as search:
+        result = search.search(board, max_depth=3)
+    assert result.best_move == Move(0, 0, 0, 7)
+    assert result.score > MATE_BOUND
+
+
+def test_workers_share_table():
+    board = Board.from_fen(START_FEN)
+    with ParallelSearch(workers=2, hash_mb=1) as search:
+        result = search.search(board, max_depth=3)
+        assert search.table.probe(board.hash_key) is not None
+    assert result.depth >= 3
+    assert result.nodes > 0
+    assert board.to_fen() == START_FEN
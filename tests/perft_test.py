@@ -0,0 +1,29 @@
+import pytest
+
+from board import BOARD_BACKENDS
+from perft import REFERENCE_POSITIONS, perft, divide
+
+# deeper counts are left to ``python perft.py --suite``
+MAX_NODES = 20000
+
+
+def reference_cases():
+    for name, fen, counts in REFERENCE_POSITIONS:
+        depth = max(d for d, count in enumerate(counts, 1)
+                    if count <= MAX_NODES)
+        yield pytest.param(fen, depth, counts[depth - 1], id=name)
+
+
+@pytest.mark.parametrize('backend', sorted(BOARD_BACKENDS))
+@pytest.mark.parametrize('fen,depth,expected', list(reference_cases()))
+def test_reference_positions(fen, depth, expected, backend):
+    board = BOARD_BACKENDS[backend].from_fen(fen)
+    assert perft(board, depth) == expected
+    assert not board.undo_stack
+
+
+def test_divide_sums_to_perft():
+    name, fen, counts = REFERENCE_POSITIONS[1]
+    result = divide(BOARD_BACKENDS['list'].from_fen(fen), 2)
+    assert len(result) == counts[0]
+    assert sum(nodes for _, nodes in result) == counts[1]
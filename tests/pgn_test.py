@@ -0,0 +1,125 @@
+import io
+
+import pytest
+
+from board import Board
+from exceptions import IllegalMoveError
+from locals import *
+from moves import Move
+from pgn import (
+    read_games, parse_san, replay_game, replay_games, replay_stream,
+    replay_file, split_file
+)
+
+
+GAMES = '''[Event "Opera \\"Game\\""]
+[White "Morphy"]
+[Black "Duke of Brunswick and Count Isouard"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 d6 3. d4 Bg4 {This is a weak move
+already.} 4. dxe5 Bxf3 5. Qxf3 dxe5 6. Bc4 Nf6 7. Qb3 Qe7
+8. Nc3 c6 9. Bg5 b5 10. Nxb5 cxb5 11. Bxb5+ Nbd7 12. O-O-O Rd8
+13. Rxd7 Rxd7 14. Rd1 Qe6 15. Bxd7+ Nxd7 16. Qb8+ Nxb8 17. Rd8# 1-0
+
+[Event "Variations"]
+[Result "*"]
+
+1. e4 (1. d4 d5 (1... Nf6) 2. c4) 1... c5 $1 2. Nf3 ; rest of the line
+2... d6 *
+
+[Event "Promotion"]
+[FEN "8/P6k/8/8/8/8/8/K7 w - - 0 1"]
+[Result "1-0"]
+
+1. a8=Q Kg6 2. Qa6+ 1-0
+'''
+
+ILLEGAL = '''[Event "Illegal"]
+
+1. e4 e5 2. Ke3 *
+
+[Event "Legal"]
+
+1. d4 d5 *
+'''
+
+
+def test_read_games():
+    games = list(read_games(io.StringIO(GAMES)))
+    assert [game.result for game in games] == ['1-0', '*', '1-0']
+    assert games[0].headers['Event'] == 'Opera "Game"'
+    assert games[0].moves[:6] == ['e4', 'e5', 'Nf3', 'd6', 'd4', 'Bg4']
+    assert games[0].moves[-1] == 'Rd8#'
+    assert len(games[0].moves) == 33
+    assert games[1].moves == ['e4', 'c5', 'Nf3', 'd6']
+
+
+def test_reading_in_small_chunks():
+    assert (list(read_games(io.StringIO(GAMES), chunk_size=7)) ==
+            list(read_games(io.StringIO(GAMES))))
+
+
+def test_game_without_result():
+    games = list(read_games(io.StringIO('1. e4 e5\n\n[Event "x"]\n\n1. d4')))
+    assert [game.moves for game in games] == [['e4', 'e5'], ['d4']]
+
+
+@pytest.mark.parametrize('fen,san,move', [
+    ('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'O-O', Move(4, 0, 6, 0)),
+    ('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'O-O-O+', Move(4, 0, 2, 0)),
+    ('4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1', 'Rab1', Move(0, 0, 1, 0)),
+    ('4k3/8/8/8/8/2N5/8/2N1K3 w - - 0 1', 'N3e2', Move(2, 2, 4, 1)),
+    ('4k3/8/8/8/8/8/1p6/R3K3 b - - 0 1', 'bxa1=N', Move(1, 1, 0, 0, KNIGHT)),
+    ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1', 'exd6', Move(4, 4, 3, 5)),
+])
+def test_parse_san(fen, san, move):
+    assert parse_san(Board.from_fen(fen), san) == move
+
+
+@pytest.mark.parametrize('san', ['Re1', 'Nc2', 'Qh4', 'e5', 'Zz9'])
+def test_parse_san_rejects(san):
+    board = Board.from_fen('4k3/8/8/8/8/2N5/8/2N1K2R w - - 0 1')
+    with pytest.raises(IllegalMoveError):
+        parse_san(board, san)
+
+
+def test_replay_game():
+    game = list(read_games(io.StringIO(GAMES)))[2]
+    boards = list(replay_game(game))
+    assert len(boards) == 3
+    assert boards[-1].to_fen() == '8/8/Q5k1/8/8/8/8/K7 b - - 2 2'
+
+
+def test_stop_on_illegal_move():
+    games = read_games(io.StringIO(ILLEGAL))
+    with pytest.raises(IllegalMoveError) as info:
+        list(replay_games(games))
+    assert info.value.message == 'Illegal move Ke3 at ply 3 of game 1'
+
+
+def test_skip_illegal_move():
+    replayed = list(replay_games(read_games(io.StringIO(ILLEGAL)),
+                                 skip_illegal=True))
+    assert [game.plies for game in replayed] == [2, 2]
+    assert replayed[0].error is not None
+    assert replayed[1].error is None
+
+
+def test_replay_stream():
+    stats = replay_stream(io.StringIO(GAMES))
+    assert (stats.games, stats.plies, stats.illegal) == (3, 40, 0)
+
+
+def test_parallel_replay(tmp_path):
+    path = tmp_path / 'games.pgn'
+    path.write_text((GAMES + '\n') * 6 + ILLEGAL)
+    ranges = split_file(str(path), 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert len(ranges) > 1
+    assert all(end == start for (_, end), (start, _)
+               in zip(ranges, ranges[1:]))
+    stats = replay_file(str(path), skip_illegal=True, workers=2)
+    assert (stats.games, stats.plies, stats.illegal) == (20, 244, 1)
+    with pytest.raises(IllegalMoveError):
+        replay_file(str(path), workers=2)
@@ -0,0 +1,74 @@
+import time
+
+from board import Board
+from evaluation import evaluate
+from locals import *
+from moves import Move
+from perft import START_FEN
+from search import Search, MATE_SCORE, MATE_BOUND
+
+
+def test_evaluation_is_symmetric():
+    board = Board.from_fen(START_FEN)
+    assert evaluate(board) == 0
+    board.switch_side()
+    assert evaluate(board) == 0
+
+
+def test_finds_mate_in_one():
+    board = Board.from_fen('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+    result = Search(board).search(max_depth=3)
+    assert result.best_move == Move(0, 0, 0, 7)
+    assert result.score > MATE_BOUND
+
+
+def test_wins_hanging_queen():
+    board = Board.from_fen('4k3/8/8/3q4/8/2N5/8/4K3 w - - 0 1')
+    result = Search(board).search(max_depth=2)
+    assert result.best_move == Move(2, 2, 3, 4)
+
+
+def test_reports_iterations():
+    reports = []
+    board = Board.from_fen(START_FEN)
+    result = Search(board, info=reports.append).search(max_depth=3)
+    assert [info.depth for info in reports] == [1, 2, 3]
+    assert result.pv[0] == result.best_move
+    assert result.nodes == reports[-1].nodes
+
+
+def test_node_budget_restores_board():
+    board = Board.from_fen(
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'
+    )
+    key = board.hash_key
+    result = Search(board).search(node_limit=3000)
+    assert result.best_move is not None
+    assert result.nodes <= 3000
+    assert board.hash_key == key
+    assert not board.undo_stack
+
+
+def test_aborted_iteration_keeps_completed_depth():
+    reports = []
+    board = Board.from_fen(START_FEN)
+    result = Search(board, info=reports.append).search(node_limit=1000)
+    assert result.depth == reports[-1].depth
+    assert result.best_move is not None
+
+
+def test_time_budget():
+    board = Board.from_fen(START_FEN)
+    start = time.perf_counter()
+    result = Search(board).search(time_limit=0.3)
+    assert time.perf_counter() - start < 1.0
+    assert result.best_move is not None
+
+
+def test_stalemate_and_mate_at_root():
+    board = Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')
+    assert Search(board).search(max_depth=2).score == 0
+    board = Board.from_fen('R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1')
+    result = Search(board).search(max_depth=2)
+    assert result.best_move is None
+    assert result.score == -MATE_SCORE
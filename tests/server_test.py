@@ -0,0 +1,169 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from loadtest import run_load, percentile
+from moves import Move, parse_move
+from exceptions import IllegalMoveError
+from server import GameServer
+
+
+class Client(object):
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port):
+        return cls(*await asyncio.open_connection('127.0.0.1', port))
+
+    async def request(self, line):
+        self.writer.write(line.encode() + b'\n')
+        await self.writer.drain()
+        return await self.read()
+
+    async def read(self):
+        line = await asyncio.wait_for(self.reader.readline(), 5)
+        return line.decode().rstrip('\n')
+
+    def close(self):
+        self.writer.close()
+
+
+def run_with_server(test, **kwargs):
+    async def main():
+        server = GameServer(**kwargs)
+        port = await server.start()
+        try:
+            await test(server, port)
+        finally:
+            await server.close()
+
+    asyncio.run(main())
+
+
+def test_parse_move():
+    assert parse_move('e2e4') == Move(4, 1, 4, 3)
+    assert parse_move('a7a8n') == Move(0, 6, 0, 7, 'N')
+    with pytest.raises(IllegalMoveError):
+        parse_move('e2e9')
+
+
+def test_play_game():
+    async def test(server, port):
+        client = await Client.connect(port)
+        assert (await client.request('NEW g1')).startswith('OK rnbqkbnr/')
+        assert (await client.request('NEW g1')) == 'ERR Game g1 exists'
+        reply = await client.request('MOVE g1 e2e4')
+        assert reply == ('OK e2e4 rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/'
+                         'RNBQKBNR b KQkq e3 0 1')
+        assert (await client.request('MOVE g1 e2e4')).startswith('ERR')
+        assert (await client.request('MOVE g2 e7e5')) == 'ERR No game g2'
+        moves = (await client.request('MOVES g1')).split()[1:]
+        assert len(moves) == 20 and 'g8f6' in moves
+        assert (await client.request('JUMP g1')).startswith('ERR')
+        client.close()
+
+    run_with_server(test)
+
+
+def test_new_game_from_fen():
+    async def test(server, port):
+        client = await Client.connect(port)
+        fen = '4k3/P7/8/8/8/8/8/4K3 w - - 0 1'
+        assert (await client.request('NEW g %s' % fen)) == 'OK ' + fen
+        reply = await client.request('MOVE g a7a8r')
+        assert reply.startswith('OK a7a8R R3k3/')
+        assert (await client.request('NEW h 8/8 w')).startswith('ERR')
+        client.close()
+
+    run_with_server(test, max_games=2)
+
+
+def test_subscribers_receive_updates():
+    async def test(server, port):
+        player = await Client.connect(port)
+        watcher = await Client.connect(port)
+        await player.request('NEW g')
+        assert (await watcher.request('SUB g')).startswith('OK rnbqkbnr/')
+        await player.request('MOVE g g1f3')
+        assert (await watcher.read()).startswith('UPDATE g g1f3 ')
+        await watcher.request('UNSUB g')
+        await player.request('MOVE g g8f6')
+        assert (await watcher.request('FEN g')).startswith('OK ')
+        player.close()
+        watcher.close()
+
+    run_with_server(test)
+
+
+def test_idle_games_expire():
+    async def test(server, port):
+        client = await Client.connect(port)
+        await client.request('NEW old')
+        await client.request('SUB old')
+        await client.request('NEW new')
+        server.games['old'].last_active -= 100
+        assert server.expire_idle() == 1
+        assert sorted(server.games) == ['new']
+        assert (await client.read()) == 'EXPIRED old'
+        assert (await client.request('FEN old')) == 'ERR No game old'
+        client.close()
+
+    run_with_server(test, idle_timeout=50)
+
+
+def test_game_limit():
+    async def test(server, port):
+        client = await Client.connect(port)
+        assert (await client.request('NEW a')).startswith('OK')
+        assert (await client.request('NEW b')) == 'ERR Too many games'
+        client.close()
+
+    run_with_server(test, max_games=1)
+
+
+def test_long_line_is_refused():
+    async def test(server, port):
+        client = await Client.connect(port)
+        await client.request('NEW g')
+        await client.request('SUB g')
+        reply = await client.request('MOVES ' + 'x' * 10000)
+        assert reply == 'ERR Line too long'
+        assert (await client.read()) == ''
+        assert not server.games['g'].subscribers
+        client.close()
+
+    run_with_server(test)
+
+
+def test_load_client():
+    results = []
+
+    async def test(server, port):
+        results.append(await run_load('127.0.0.1', port, connections=3,
+                                      games=2, plies=5, watch=True))
+
+    run_with_server(test)
+    result = results[0]
+    assert result.moves == 30
+    assert 0 < result.p50 <= result.p99
+
+
+def test_percentile():
+    values = list(range(100))
+    assert percentile(values, 0.99) == 99
+    assert percentile(values, 0.5) == 50
+    assert percentile([], 0.99) == 0.0
+
+
+def test_server_imports_no_gui_modules():
+    code = ('import sys, server, loadtest; '
+            'print(sorted({"pygame", "colorama"} & set(sys.modules)))')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=root)
+    assert output.strip() == b'[]'
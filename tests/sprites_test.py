@@ -0,0 +1,53 @@
+import pytest
+
+pygame = pytest.importorskip('pygame')
+
+from locals import *
+from sprites import SpriteCache, SPRITE_SIZE
+
+
+@pytest.fixture
+def scaled(monkeypatch):
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    calls = []
+    smoothscale = pygame.transform.smoothscale
+
+    def counting_smoothscale(surface, size):
+        calls.append(size)
+        return smoothscale(surface, size)
+
+    monkeypatch.setattr(pygame.transform, 'smoothscale',
+                        counting_smoothscale)
+    yield calls
+    pygame.display.quit()
+
+
+def test_sprites_are_scaled_once_per_size(scaled):
+    cache = SpriteCache(max_size=4)
+    sprite = cache.get(KING, WHITE, 30)
+    assert sprite.get_size() == (30, 30)
+    assert cache.get(KING, WHITE, 30) is sprite
+    assert cache.get(KING, WHITE, SPRITE_SIZE).get_size() == (48, 48)
+    assert scaled == [(30, 30)]
+    # a new size is a miss, the other sizes stay cached
+    assert cache.get(KING, WHITE, 60).get_size() == (60, 60)
+    assert scaled == [(30, 30), (60, 60)]
+    assert cache.get(KING, BLACK, 30) is not sprite
+
+
+def test_least_recently_used_sprite_is_evicted(scaled):
+    cache = SpriteCache(max_size=3)
+    first = cache.get(PAWN, WHITE, 20)
+    cache.get(PAWN, BLACK, 20)
+    cache.get(ROOK, WHITE, 20)
+    assert cache.get(PAWN, WHITE, 20) is first
+    cache.get(QUEEN, WHITE, 20)
+    assert list(cache._scaled) == [
+        (ROOK, WHITE, 20), (PAWN, WHITE, 20), (QUEEN, WHITE, 20)
+    ]
+    del scaled[:]
+    assert cache.get(PAWN, WHITE, 20) is first
+    cache.get(PAWN, BLACK, 20)
+    assert scaled == [(20, 20)]
@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    environment = dict(os.environ, SDL_VIDEODRIVER='dummy',
+                       PYGAME_HIDE_SUPPORT_PROMPT='1')
+    return subprocess.check_output([sys.executable, '-c', code], cwd=ROOT,
+                                   env=environment)
+
+
+def test_rules_core_imports_quietly():
+    output = run_python(
+        'import sys, board, pieces, locals, exceptions; '
+        'print(sorted({"pygame", "colorama"} & set(sys.modules)))'
+    )
+    assert output == b'[]\n'
+
+
+def test_gui_import_opens_no_window():
+    pytest.importorskip('pygame')
+    output = run_python(
+        'import chess, pygame; '
+        'print(pygame.display.get_init(), chess.window_panel, '
+        'chess.BoardPanel._sprites._pieces)'
+    )
+    assert output == b'False None None\n'
@@ -0,0 +1,37 @@
+from bitboard import square, popcount
+from locals import *
+from tables import (
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, RAYS, DIRECTION,
+    BETWEEN_FIELDS, first_blocker
+)
+
+
+def test_knight_targets():
+    assert popcount(KNIGHT_ATTACKS[square(0, 0)]) == 2
+    assert popcount(KNIGHT_ATTACKS[square(4, 4)]) == 8
+    assert KNIGHT_ATTACKS[square(1, 0)] >> square(2, 2) & 1
+
+
+def test_king_targets():
+    assert popcount(KING_ATTACKS[square(7, 7)]) == 3
+    assert popcount(KING_ATTACKS[square(3, 3)]) == 8
+
+
+def test_pawn_attacks():
+    assert PAWN_ATTACKS[WHITE][square(0, 1)] == 1 << square(1, 2)
+    assert PAWN_ATTACKS[BLACK][square(4, 6)] == (
+        1 << square(3, 5) | 1 << square(5, 5))
+
+
+def test_rays_and_directions():
+    assert RAYS[square(0, 0)][1] == tuple(square(i, i) for i in range(1, 8))
+    assert DIRECTION[square(0, 0)][square(0, 5)] == 2
+    assert DIRECTION[square(0, 0)][square(1, 2)] is None
+    assert BETWEEN_FIELDS[square(2, 2)][square(5, 5)] == ((3, 3), (4, 4))
+
+
+def test_first_blocker():
+    occupancy = 1 << square(0, 3) | 1 << square(0, 6)
+    assert first_blocker(square(0, 0), 2, occupancy) == square(0, 3)
+    assert first_blocker(square(0, 7), 6, occupancy) == square(0, 6)
+    assert first_blocker(square(0, 0), 0, occupancy) is None
@@ -0,0 +1,78 @@
+import io
+
+from board import Board, BoardManager
+from locals import *
+from terminal import (
+    BOARD_HEIGHT, BOARD_WIDTH, CLEAR_SCREEN, DARK_FIELD, PIECE_COLORS,
+    TerminalRenderer, board_cells, tile
+)
+
+
+def test_board_cells():
+    rows = board_cells(Board(), 'game 1')
+    assert len(rows) == BOARD_HEIGHT
+    assert all(len(row) == BOARD_WIDTH for row in rows)
+    assert ''.join(char for char, _ in rows[0]).rstrip() == 'game 1'
+    # a1 is the first field of the rank at the bottom
+    assert rows[8][:3] == [('1', ''), (' ', ''),
+                           (ROOK, PIECE_COLORS[WHITE] + ';' + DARK_FIELD)]
+    assert ''.join(char for char, _ in rows[1]) == '8 R N B Q K B N R '
+
+
+def test_tile():
+    tiles = [board_cells(Board()) for _ in range(3)]
+    frame = tile(tiles, columns=40)
+    assert len(frame) == 2 * BOARD_HEIGHT + 1
+    assert all(len(row) == 2 * BOARD_WIDTH + 2 for row in frame)
+    assert tile(tiles, columns=10) == tile(tiles, columns=BOARD_WIDTH)
+
+
+def test_renderer_writes_only_changes():
+    stream = io.StringIO()
+    renderer = TerminalRenderer(stream, columns=BOARD_WIDTH)
+    manager = BoardManager()
+    assert renderer.draw_boards([manager.board]) == (
+        BOARD_HEIGHT * BOARD_WIDTH
+    )
+    assert stream.getvalue().startswith('\x1b[0m' + CLEAR_SCREEN)
+    written = renderer.written
+    assert renderer.draw_boards([manager.board]) == 0
+    assert renderer.written == written
+
+    manager.move_piece(4, 1, 4, 3)
+    stream.seek(0)
+    stream.truncate()
+    # both characters of e2 and e4
+    assert renderer.draw_boards([manager.board]) == 4
+    output = stream.getvalue()
+    assert '\x1b[8;11H' in output and '\x1b[6;11H' in output
+    assert CLEAR_SCREEN not in output
+
+
+def test_renderer_blanks_removed_boards():
+    stream = io.StringIO()
+    renderer = TerminalRenderer(stream, columns=40)
+    renderer.draw_boards([Board(), Board()])
+    changed = renderer.draw_boards([Board()])
+    # the cells of the second board which were not blank
+    assert 0 < changed <= BOARD_HEIGHT * BOARD_WIDTH
+    renderer.reset()
+    renderer.draw_boards([Board()])
+    assert stream.getvalue().count(CLEAR_SCREEN) == 2
+
+
+def test_board_print_writes_once(monkeypatch):
+    writes = []
+
+    class Stream(object):
+        def write(self, text):
+            writes.append(text)
+
+        def flush(self):
+            pass
+
+    Board().print()
+    monkeypatch.setattr('sys.stdout', Stream())
+    Board().print()
+    assert len(writes) == 1
+    assert writes[0].count('\n') == 10
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from tournament import parse_player, play_game, run_tournament, score
+
+
+def test_parse_player():
+    player = parse_player('search:depth=2,nodes=500')
+    assert (player.kind, player.depth, player.node_limit) == \
+        ('search', 2, 500)
+    assert player.time_limit is None
+    assert parse_player('random').kind == 'random'
+    with pytest.raises(ValueError):
+        parse_player('human')
+    with pytest.raises(ValueError):
+        parse_player('search:width=3')
+
+
+def test_random_game_ends():
+    random_player = parse_player('random')
+    record = play_game(0, random_player, random_player, seed=3)
+    assert record.result in ('1-0', '0-1', '1/2-1/2')
+    assert record.plies == len(record.moves) == len(record.move_times)
+    assert play_game(0, random_player, random_player, seed=3) \
+        ._replace(move_times=None) == record._replace(move_times=None)
+
+
+def test_tournament_streams_results(tmp_path):
+    engine = parse_player('search:depth=1')
+    random_player = parse_player('random')
+    output = tmp_path / 'games.jsonl'
+    records = run_tournament(engine, random_player, 4, str(output),
+                             workers=2, random_plies=2)
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(line['game'] for line in lines) == [0, 1, 2, 3]
+    assert [line['white'] for line in sorted(lines, key=lambda l: l['game'])] \
+        == ['search:depth=1', 'random'] * 2
+    assert sum(score(records, engine.name)) == 4
@@ -0,0 +1,63 @@
+from moves import Move, encode_move, decode_move
+from locals import *
+from transposition import (
+    TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, buffer_size
+)
+
+
+def test_move_encoding():
+    for move in [Move(4, 1, 4, 3), Move(0, 6, 1, 7, KNIGHT),
+                 Move(7, 7, 0, 0), None]:
+        assert decode_move(encode_move(move)) == move
+    assert encode_move(Move(7, 6, 7, 7, QUEEN)) < 1 << 16
+
+
+def test_size_is_fixed():
+    table = TranspositionTable(1)
+    assert table.size_bytes == buffer_size(1) == 1 << 20
+    for key in range(100000):
+        table.store(key * 0x9E3779B97F4A7C15 & (1 << 64) - 1,
+                    None, 1, BOUND_EXACT, 0)
+    assert table.size_bytes == 1 << 20
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    key = 0x123456789ABCDEF0
+    assert table.probe(key) is None
+    table.store(key, Move(6, 0, 5, 2), 5, BOUND_LOWER, -120)
+    entry = table.probe(key)
+    assert entry.move == Move(6, 0, 5, 2)
+    assert (entry.depth, entry.bound, entry.score) == (5, BOUND_LOWER, -120)
+    assert table.probe(key ^ 1 << 63) is None
+
+
+def test_keeps_move_when_storing_without_one():
+    table = TranspositionTable(1)
+    table.store(42, Move(1, 0, 2, 2), 3, BOUND_EXACT, 10)
+    table.store(42, None, 4, BOUND_UPPER, 5)
+    assert table.probe(42) == (Move(1, 0, 2, 2), 4, BOUND_UPPER, 5)
+
+
+def test_depth_preferred_replacement():
+    table = TranspositionTable(1)
+    buckets = table.size_bytes // 32
+    deep, shallow, other = 7, 7 + buckets, 7 + 2 * buckets
+    table.store(deep, None, 10, BOUND_EXACT, 1)
+    table.store(shallow, None, 2, BOUND_EXACT, 2)
+    table.store(other, None, 3, BOUND_EXACT, 3)
+    assert table.probe(deep).score == 1
+    assert table.probe(shallow) is None
+    assert table.probe(other).score == 3
+    table.new_search()
+    table.store(shallow, None, 1, BOUND_EXACT, 4)
+    assert table.probe(deep) is None
+    assert table.probe(shallow).score == 4
+
+
+def test_clear():
+    table = TranspositionTable(1)
+    table.store(99, None, 1, BOUND_EXACT, 0)
+    assert table.hashfull() >= 0
+    table.clear()
+    assert table.probe(99) is None
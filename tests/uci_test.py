@@ -0,0 +1,104 @@
+import io
+import time
+
+import pytest
+
+from locals import *
+from search import MATE_SCORE
+from uci import UciEngine, format_score, time_budget
+
+
+class Output(io.StringIO):
+
+    def lines(self):
+        return self.getvalue().splitlines()
+
+    def wait_for(self, prefix, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            for line in self.lines():
+                if line.startswith(prefix):
+                    return line
+            time.sleep(0.01)
+        raise AssertionError('No %s in %r' % (prefix, self.lines()))
+
+
+@pytest.fixture
+def engine():
+    engine = UciEngine(Output(), hash_mb=1)
+    yield engine
+    engine.handle('quit')
+
+
+def test_handshake(engine):
+    engine.handle('uci')
+    engine.handle('isready')
+    lines = engine.output.lines()
+    assert lines[0] == 'id name PyChess'
+    assert lines[-2:] == ['uciok', 'readyok']
+
+
+def test_finds_mate(engine):
+    engine.handle('position fen 6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+    engine.handle('go depth 2')
+    assert engine.output.wait_for('bestmove') == 'bestmove a1a8'
+    assert any('score mate 1' in line for line in engine.output.lines())
+
+
+def test_position_with_moves(engine):
+    engine.handle('position startpos moves e2e4 e7e5 g1f3')
+    assert engine.manager.board.to_fen() == (
+        'rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2'
+    )
+    engine.handle('position startpos moves e2e5')
+    assert engine.output.lines()[-1].startswith('info string Invalid')
+    assert engine.manager.board.fullmove_number == 2
+
+
+def test_stop_and_isready_during_search(engine):
+    engine.handle('position startpos')
+    engine.handle('go infinite')
+    engine.handle('isready')
+    assert 'readyok' in engine.output.lines()
+    assert not any(line.startswith('bestmove')
+                   for line in engine.output.lines())
+    engine.handle('stop')
+    assert engine.output.lines()[-1].startswith('bestmove ')
+
+
+def test_ponder_waits_for_ponderhit(engine):
+    engine.handle('position startpos moves e2e4')
+    engine.handle('go ponder depth 1 wtime 1000 btime 1000')
+    engine.output.wait_for('info depth 1')
+    time.sleep(0.05)
+    assert not any(line.startswith('bestmove')
+                   for line in engine.output.lines())
+    engine.handle('ponderhit')
+    assert engine.output.wait_for('bestmove').startswith('bestmove ')
+
+
+def test_ponderhit_starts_the_clock(engine):
+    engine.handle('position startpos moves e2e4')
+    engine.handle('go ponder wtime 3000 btime 3000')
+    time.sleep(0.1)
+    start = time.monotonic()
+    engine.handle('ponderhit')
+    engine.output.wait_for('bestmove')
+    assert time.monotonic() - start < 2
+
+
+def test_format_score():
+    assert format_score(35) == 'cp 35'
+    assert format_score(MATE_SCORE - 1) == 'mate 1'
+    assert format_score(MATE_SCORE - 3) == 'mate 2'
+    assert format_score(-MATE_SCORE + 2) == 'mate -1'
+
+
+def test_time_budget():
+    assert time_budget({}, WHITE) is None
+    assert time_budget({'movetime': 1000}, WHITE) == pytest.approx(0.95)
+    assert time_budget({'wtime': 60000, 'btime': 1000}, WHITE) == \
+        pytest.approx(1.95)
+    assert time_budget({'wtime': 60000, 'btime': 1000}, BLACK) == 0.01
+    assert time_budget({'wtime': 1000, 'movestogo': 1}, WHITE) == \
+        pytest.approx(0.45)
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from board import Board, BitBoard, BoardManager
+from locals import *
+from moves import Move
+from zobrist import compute_hash
+
+
+@pytest.fixture(params=[Board, BitBoard])
+def board(request):
+    return request.param()
+
+
+def test_starting_key(board):
+    assert board.hash_key == compute_hash(board)
+    assert board.hash_key == Board().hash_key
+
+
+def test_incremental_key_matches_full_computation(board):
+    rng = random.Random(3)
+    keys = []
+    for _ in range(150):
+        moves = list(board.generate_legal_moves(board.side_to_move))
+        if not moves:
+            break
+        keys.append(board.hash_key)
+        board.make_move(rng.choice(moves))
+        assert board.hash_key == compute_hash(board)
+    while keys:
+        board.unmake_move()
+        assert board.hash_key == keys.pop()
+
+
+def test_transpositions_share_key(board):
+    start = board.hash_key
+    for move in [Move(6, 0, 5, 2), Move(6, 7, 5, 5),
+                 Move(5, 2, 6, 0), Move(5, 5, 6, 7)]:
+        board.make_move(move)
+    assert board.hash_key == start
+
+
+def test_castling_rights_change_key(board):
+    key = board.hash_key
+    board.long_castle_allowed[WHITE] = False
+    assert board.hash_key != key
+    assert board.hash_key == compute_hash(board)
+    board.long_castle_allowed[WHITE] = True
+    assert board.hash_key == key
+
+
+def test_switch_player_changes_key():
+    manager = BoardManager()
+    key = manager.board.hash_key
+    manager.switch_player()
+    assert manager.board.hash_key != key
+    manager.switch_player()
+    assert manager.board.hash_key == key
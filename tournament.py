@@ -0,0 +1,192 @@
+"""
+Plays games between engine configurations on a pool of processes.
+Usage: python tournament.py [--games N] [--workers N] [--output FILE]
+                            [--random-plies N] [--seed N] PLAYER PLAYER
+
+A player is "random" or "search" with options, e.g.
+"search:depth=3,time=0.5,nodes=20000,hash=4". Every finished game is
+appended to the output file as one line of JSON.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import namedtuple
+
+from board import BoardManager
+from locals import *
+from search import Search
+from transposition import TranspositionTable
+
+
+Player = namedtuple('Player', 'name kind depth time_limit node_limit hash_mb')
+
+GameRecord = namedtuple(
+    'GameRecord', 'game white black result reason plies moves move_times'
+)
+
+_PLAYER_OPTIONS = {'depth', 'time', 'nodes', 'hash'}
+
+
+def parse_player(spec):
+    """
+    Reads a player description such as "random" or "search:depth=3".
+    :rtype: Player
+    :raises ValueError: the description is not valid
+    """
+    kind, _, options = spec.partition(':')
+    if kind not in ('random', 'search'):
+        raise ValueError('Unknown player %s' % spec)
+    values = dict(option.split('=', 1) if '=' in option else (option, '')
+                  for option in options.split(',') if option)
+    if set(values) - _PLAYER_OPTIONS:
+        raise ValueError('Unknown options of player %s' % spec)
+    return Player(
+        spec, kind, int(values.get('depth', 3)),
+        float(values['time']) if 'time' in values else None,
+        int(values['nodes']) if 'nodes' in values else None,
+        int(values.get('hash', 4))
+    )
+
+
+def _random_move(manager, rng):
+    # sorted, since the order of the generated moves depends on the order
+    # of the piece sets, which is not the same in every process
+    return rng.choice(sorted(manager.generate_legal_moves()))
+
+
+def _choose_move(manager, player, table, rng):
+    board = manager.board
+    if player.kind == 'random':
+        return _random_move(manager, rng)
+    history_keys = [undo.hash_key for undo in board.undo_stack]
+    result = Search(board, table, history_keys).search(
+        player.depth, player.time_limit, player.node_limit
+    )
+    return result.best_move
+
+
+def play_game(game, white, black, random_plies=0, seed=0):
+    """
+    Plays one game through BoardManager to its end.
+    :param game: number of the game
+    :type white: Player
+    :type black: Player
+    :param random_plies: number of random moves played first, so that
+        games between deterministic engines differ
+    :param seed: seed of the random moves
+    :rtype: GameRecord
+    """
+    rng = random.Random(seed)
+    manager = BoardManager()
+    players = {WHITE: white, BLACK: black}
+    tables = {
+        color: TranspositionTable(player.hash_mb)
+        if player.kind == 'search' else None
+        for color, player in players.items()
+    }
+    moves, move_times = [], []
+    outcome = manager.outcome()
+    while outcome is None:
+        color = manager.player_to_move
+        start = time.perf_counter()
+        if len(moves) < random_plies:
+            move = _random_move(manager, rng)
+        else:
+            move = _choose_move(manager, players[color], tables[color], rng)
+        move_times.append(time.perf_counter() - start)
+        manager.move_piece(move.from_x, move.from_y, move.to_x, move.to_y,
+                           move.promotion or QUEEN)
+        moves.append(str(move))
+        outcome = manager.outcome()
+    return GameRecord(game, white.name, black.name, outcome.result,
+                      outcome.reason, len(moves), moves, move_times)
+
+
+def _play_task(args):
+    return play_game(*args)
+
+
+def run_tournament(first, second, games, output, workers=None,
+                   random_plies=4, seed=0):
+    """
+    Plays the games on a pool of processes, alternating colors, and
+    appends every game to the output file as soon as it finishes.
+    :type first: Player
+    :type second: Player
+    :param games: number of games
+    :param output: path of the JSON lines file
+    :param workers: number of processes, the number of CPUs if not given
+    :return: records of the games in the order they finished
+    :rtype: list[GameRecord]
+    """
+    tasks = [
+        (game, first, second, random_plies, seed + game) if game % 2 == 0
+        else (game, second, first, random_plies, seed + game)
+        for game in range(games)
+    ]
+    records = []
+    with open(output, 'a') as stream, \
+            multiprocessing.Pool(workers or os.cpu_count()) as pool:
+        for record in pool.imap_unordered(_play_task, tasks):
+            record_dict = record._asdict()
+            record_dict['move_times'] = [round(elapsed, 6)
+                                         for elapsed in record.move_times]
+            stream.write(json.dumps(record_dict) + '\n')
+            stream.flush()
+            records.append(record)
+    return records
+
+
+def score(records, name):
+    """
+    Counts the wins, draws and losses of the player.
+    :return: tuple of the three counts
+    """
+    wins = draws = losses = 0
+    for record in records:
+        if record.result == '1/2-1/2':
+            draws += 1
+        elif (record.result == '1-0') == (record.white == name):
+            wins += 1
+        else:
+            losses += 1
+    return wins, draws, losses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('players', type=parse_player, nargs=2)
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--workers', type=int,
+                        help='number of processes, all CPUs by default')
+    parser.add_argument('--output', default='tournament.jsonl')
+    parser.add_argument('--random-plies', type=int, default=4,
+                        help='random moves at the start of every game')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    first, second = args.players
+    if first.name == second.name:
+        second = second._replace(name=second.name + '#2')
+    start = time.perf_counter()
+    records = run_tournament(first, second, args.games, args.output,
+                             args.workers, args.random_plies, args.seed)
+    elapsed = time.perf_counter() - start
+    for player in (first, second):
+        times = [move_time for record in records
+                 for ply, move_time in enumerate(record.move_times)
+                 if (record.white == player.name) == (ply % 2 == 0)]
+        print('%-30s +%i =%i -%i  %.1f ms/move' % (
+            (player.name,) + score(records, player.name) +
+            (1000 * sum(times) / len(times) if times else 0,)
+        ))
+    print('games %i  time %.2f s  games/s %.2f' % (
+        len(records), elapsed, len(records) / elapsed if elapsed else 0
+    ))
+
+
+if __name__ == '__main__':
+    main()
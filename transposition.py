@@ -0,0 +1,156 @@
+"""
+Fixed-size transposition table keyed by the Zobrist keys of positions.
+"""
+
+from collections import namedtuple
+
+from moves import encode_move, decode_move
+
+
+BOUND_EXACT = 1
+BOUND_LOWER = 2
+BOUND_UPPER = 3
+
+TableEntry = namedtuple('TableEntry', 'move depth bound score')
+
+# Every entry takes two 64-bit words, the key and the packed data, and
+# every bucket holds two entries: the first one is replaced only by
+# results of deeper (or newer) searches, the second one always.
+ENTRY_WORDS = 2
+BUCKET_WORDS = 2 * ENTRY_WORDS
+BUCKET_BYTES = BUCKET_WORDS * 8
+
+_SCORE_OFFSET = 1 << 15
+
+
+def _pack(move, depth, bound, score, generation):
+    return (encode_move(move) |
+            max(0, min(depth, 255)) << 16 |
+            bound << 24 |
+            (score + _SCORE_OFFSET) << 26 |
+            generation << 42)
+
+
+def _unpack(data):
+    return TableEntry(
+        decode_move(data & 0xFFFF),
+        data >> 16 & 0xFF,
+        data >> 24 & 3,
+        (data >> 26 & 0xFFFF) - _SCORE_OFFSET
+    )
+
+
+def buffer_size(size_mb):
+    """
+    Computes the number of bytes of the table buffer for the size in MB.
+    The number of buckets is rounded down to a power of two.
+    """
+    buckets = max(1, size_mb * (1 << 20) // BUCKET_BYTES)
+    return (1 << (buckets.bit_length() - 1)) * BUCKET_BYTES
+
+
+class TranspositionTable(object):
+    """
+    Hash table of search results kept in a flat, preallocated buffer of
+    64-bit words, so memory use is fixed whatever the number of positions
+    stored. The key word of an entry holds the position key XORed with the
+    data word, which lets a torn write from another process be detected
+    when the buffer is shared.
+    """
+
+    def __init__(self, size_mb=16, buffer=None):
+        """
+        :param size_mb: size of the table in megabytes
+        :param buffer: writable buffer to keep the table in instead of
+            allocating a new one, e.g. a shared memory block; its size
+            should come from ``buffer_size``
+        """
+        if buffer is None:
+            buffer = bytearray(buffer_size(size_mb))
+        self._bytes = memoryview(buffer).cast('B')
+        self._table = self._bytes.cast('Q')
+        self._mask = len(self._table) // BUCKET_WORDS - 1
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def size_bytes(self):
+        return len(self._table) * 8
+
+    def new_search(self):
+        """
+        Marks entries stored so far as older, so that they are replaced in
+        favour of the results of the new search.
+        """
+        self.generation = (self.generation + 1) & 0xFF
+
+    def release(self):
+        """
+        Releases the views of the buffer, which is needed before a shared
+        memory block holding the table can be closed.
+        """
+        self._table.release()
+        self._bytes.release()
+
+    def clear(self):
+        self._bytes[:] = bytes(len(self._bytes))
+        self.generation = 0
+
+    def probe(self, key):
+        """
+        Looks the position up.
+        :param key: Zobrist key of the position
+        :return: stored entry or None if the position is not in the table
+        :rtype: TableEntry
+        """
+        self.probes += 1
+        table = self._table
+        index = (key & self._mask) * BUCKET_WORDS
+        for slot in (index, index + ENTRY_WORDS):
+            data = table[slot + 1]
+            if data and table[slot] ^ data == key:
+                self.hits += 1
+                return _unpack(data)
+        return None
+
+    def store(self, key, move, depth, bound, score):
+        """
+        Stores a search result of the position.
+        :param key: Zobrist key of the position
+        :param move: best move found or None
+        :type move: moves.Move
+        :param depth: depth the position was searched to
+        :param bound: one of BOUND_EXACT, BOUND_LOWER and BOUND_UPPER
+        :param score: score of the position, within a signed 16-bit range
+        """
+        table = self._table
+        index = (key & self._mask) * BUCKET_WORDS
+        data = table[index + 1]
+        old_key = table[index] ^ data
+        if (not data or old_key == key or
+                depth >= (data >> 16 & 0xFF) or
+                data >> 42 != self.generation):
+            slot = index
+        else:
+            slot = index + ENTRY_WORDS
+            data = table[slot + 1]
+            old_key = table[slot] ^ data
+        if move is None and data and old_key == key:
+            # keep the best move of an earlier search of the position
+            move = decode_move(data & 0xFFFF)
+        data = _pack(move, depth, bound, score, self.generation)
+        table[slot] = key ^ data
+        table[slot + 1] = data
+
+    def hashfull(self):
+        """
+        Estimates the use of the table in permille from its first entries.
+        """
+        sample = min(len(self._table) // ENTRY_WORDS, 1000)
+        used = 0
+        for i in range(sample):
+            data = self._table[i * ENTRY_WORDS + 1]
+            if data and data >> 42 == self.generation:
+                used += 1
+        return used * 1000 // sample
@@ -0,0 +1,259 @@
+"""
+Front end speaking the Universal Chess Interface on the standard input and
+output, for chess GUIs and match runners.
+Usage: python uci.py
+"""
+
+import sys
+import threading
+
+from board import BoardManager
+from exceptions import (
+    InvalidFenError, IllegalMoveError, InvalidFieldError, NoPieceError,
+    InvalidPieceError
+)
+from locals import *
+from moves import parse_move
+from search import Search, MATE_SCORE, MATE_BOUND, MAX_PLY
+from transposition import TranspositionTable
+
+
+ENGINE_NAME = 'PyChess'
+ENGINE_AUTHOR = 'PyChess authors'
+
+# moves left to the time control assumed when the GUI doesn't tell
+_MOVES_TO_GO = 30
+# seconds kept in reserve for the communication with the GUI
+_MOVE_OVERHEAD = 0.05
+_MIN_TIME = 0.01
+
+_INT_PARAMETERS = {'wtime', 'btime', 'winc', 'binc', 'movestogo', 'depth',
+                   'nodes', 'movetime'}
+
+
+def format_move(move):
+    """
+    Writes the move in UCI notation, 0000 for no move.
+    :type move: moves.Move
+    """
+    return str(move).lower() if move is not None else '0000'
+
+
+def format_score(score):
+    """
+    Writes the score as centipawns, or as moves to mate.
+    """
+    if score > MATE_BOUND:
+        return 'mate %i' % ((MATE_SCORE - score + 1) // 2)
+    if score < -MATE_BOUND:
+        return 'mate %i' % -((MATE_SCORE + score) // 2)
+    return 'cp %i' % score
+
+
+def time_budget(parameters, color):
+    """
+    Decides how long to think about a move.
+    :param parameters: integer parameters of the go command
+    :param color: side to move
+    :return: time in seconds, None when there is no time limit
+    """
+    if 'movetime' in parameters:
+        return max(parameters['movetime'] / 1000 - _MOVE_OVERHEAD, _MIN_TIME)
+    remaining = parameters.get('wtime' if color == WHITE else 'btime')
+    if remaining is None:
+        return None
+    increment = parameters.get('winc' if color == WHITE else 'binc', 0)
+    budget = (remaining / parameters.get('movestogo', _MOVES_TO_GO) +
+              increment * 0.8)
+    budget = min(budget, remaining / 2)
+    return max(budget / 1000 - _MOVE_OVERHEAD, _MIN_TIME)
+
+
+class UciEngine(object):
+    """
+    Carries out UCI commands. Searches run in a worker thread, so that
+    commands such as isready, stop and ponderhit are answered at once.
+    A ponder search goes on after ponderhit with a time limit, keeping
+    what it has searched so far.
+    """
+
+    def __init__(self, output=None, hash_mb=16):
+        """
+        :param output: stream the responses are written to, the standard
+            output if not given
+        :param hash_mb: size of the transposition table in MB
+        """
+        self.output = output or sys.stdout
+        self.manager = BoardManager()
+        self.table = TranspositionTable(hash_mb)
+        self._output_lock = threading.Lock()
+        self._search = None
+        self._thread = None
+        self._timer = None
+        # set when the best move may be sent, after stop or ponderhit for
+        # ponder and infinite searches
+        self._report = threading.Event()
+        self._ponder_budget = None
+        self._commands = {
+            'uci': self._uci,
+            'isready': self._isready,
+            'ucinewgame': self._new_game,
+            'setoption': self._set_option,
+            'position': self._position,
+            'go': self._go,
+            'stop': self._stop,
+            'ponderhit': self._ponderhit,
+            'quit': self._quit,
+        }
+
+    def send(self, line):
+        with self._output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line):
+        """
+        Carries out one command line.
+        :return: False after the quit command
+        """
+        words = line.split()
+        if not words:
+            return True
+        command = self._commands.get(words[0])
+        if command is None:
+            self.send('info string Unknown command %s' % words[0])
+            return True
+        return command(words[1:]) is not False
+
+    def run(self, input_stream=None):
+        """
+        Reads commands until quit or the end of the input.
+        """
+        for line in input_stream or sys.stdin:
+            if not self.handle(line):
+                break
+        self._stop()
+
+    def _uci(self, args):
+        self.send('id name %s' % ENGINE_NAME)
+        self.send('id author %s' % ENGINE_AUTHOR)
+        self.send('option name Hash type spin default %i min 1 max 1024' %
+                  (self.table.size_bytes >> 20))
+        self.send('option name Ponder type check default true')
+        self.send('uciok')
+
+    def _isready(self, args):
+        self.send('readyok')
+
+    def _new_game(self, args):
+        self._stop()
+        self.table.clear()
+
+    def _set_option(self, args):
+        # setoption name <name> value <value>
+        if 'value' not in args:
+            return
+        split = args.index('value')
+        name = ' '.join(args[1:split]).lower()
+        value = ' '.join(args[split + 1:])
+        if name == 'hash' and value.isdigit():
+            self._stop()
+            self.table.release()
+            self.table = TranspositionTable(max(int(value), 1))
+
+    def _position(self, args):
+        self._stop()
+        split = args.index('moves') if 'moves' in args else len(args)
+        if args[:1] == ['startpos']:
+            fen = None
+        elif args[:1] == ['fen']:
+            fen = ' '.join(args[1:split])
+        else:
+            self.send('info string Invalid position')
+            return
+        try:
+            manager = BoardManager(fen=fen)
+            for text in args[split + 1:]:
+                move = parse_move(text)
+                manager.move_piece(move.from_x, move.from_y, move.to_x,
+                                   move.to_y, move.promotion or QUEEN)
+        except (InvalidFenError, IllegalMoveError, InvalidFieldError,
+                NoPieceError, InvalidPieceError) as exc:
+            self.send('info string Invalid position %s' % exc)
+            return
+        self.manager = manager
+
+    def _go(self, args):
+        self._stop()
+        parameters = {}
+        for name, value in zip(args, args[1:]):
+            if name in _INT_PARAMETERS and value.lstrip('-').isdigit():
+                parameters[name] = int(value)
+        waiting = 'ponder' in args or 'infinite' in args
+        board = self.manager.board
+        budget = time_budget(parameters, board.side_to_move)
+        self._search = Search(
+            board, self.table, [undo.hash_key for undo in board.undo_stack],
+            info=self._info
+        )
+        self._report.clear()
+        if waiting:
+            # the clock starts on ponderhit
+            self._ponder_budget, budget = budget, None
+        else:
+            self._report.set()
+        self._thread = threading.Thread(
+            target=self._run_search,
+            args=(self._search, parameters.get('depth', MAX_PLY - 1), budget,
+                  parameters.get('nodes')),
+            daemon=True
+        )
+        self._thread.start()
+
+    def _run_search(self, search, depth, time_limit, node_limit):
+        result = search.search(depth, time_limit, node_limit)
+        self._report.wait()
+        ponder = ''
+        if len(result.pv) > 1:
+            ponder = ' ponder %s' % format_move(result.pv[1])
+        self.send('bestmove %s%s' % (format_move(result.best_move), ponder))
+
+    def _info(self, info):
+        self.send('info depth %i score %s nodes %i time %i nps %i pv %s' % (
+            info.depth, format_score(info.score), info.nodes,
+            info.elapsed * 1000, info.nps,
+            ' '.join(format_move(move) for move in info.pv)
+        ))
+
+    def _stop(self, args=()):
+        if self._thread is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._search.stop()
+        self._report.set()
+        self._thread.join()
+        self._thread = None
+
+    def _ponderhit(self, args):
+        if self._thread is None:
+            return
+        if self._ponder_budget is not None:
+            self._timer = threading.Timer(self._ponder_budget,
+                                          self._search.stop)
+            self._timer.daemon = True
+            self._timer.start()
+        self._report.set()
+
+    def _quit(self, args):
+        self._stop()
+        return False
+
+
+def main():
+    UciEngine().run()
+
+
+if __name__ == '__main__':
+    main()
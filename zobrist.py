@@ -0,0 +1,55 @@
+"""
+Random keys for Zobrist hashing of positions. The key of a position is
+the XOR of the keys of every piece on its square, of the castling rights
+still available, of the en passant file and of the side to move if it is
+black. The keys are generated from a fixed seed, so position keys are
+the same in every process.
+"""
+
+import random
+
+from locals import *
+
+
+_random = random.Random(0x5EED)
+
+PIECE_KEYS = {
+    color: {
+        piece_type: [_random.getrandbits(64) for _ in range(64)]
+        for piece_type in PIECE_TYPES
+    }
+    for color in (WHITE, BLACK)
+}
+LONG_CASTLE_KEYS = {WHITE: _random.getrandbits(64),
+                    BLACK: _random.getrandbits(64)}
+SHORT_CASTLE_KEYS = {WHITE: _random.getrandbits(64),
+                     BLACK: _random.getrandbits(64)}
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+
+del _random
+
+
+def compute_hash(board):
+    """
+    Computes the key of the position from scratch. Boards keep their key
+    up to date incrementally, this is meant for verification.
+    :param board: position to compute the key of
+    :type board: board.Board
+    :return: 64-bit key of the position
+    """
+    key = 0
+    for y, rank in enumerate(board.fields):
+        for x, piece in enumerate(rank):
+            if piece is not None:
+                key ^= PIECE_KEYS[piece.color][piece.type][y * 8 + x]
+    for color in (WHITE, BLACK):
+        if board.long_castle_allowed[color]:
+            key ^= LONG_CASTLE_KEYS[color]
+        if board.short_castle_allowed[color]:
+            key ^= SHORT_CASTLE_KEYS[color]
+    if board.en_passant is not None:
+        key ^= EN_PASSANT_KEYS[board.en_passant.x]
+    if board.side_to_move == BLACK:
+        key ^= BLACK_TO_MOVE_KEY
+    return key